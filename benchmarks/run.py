@@ -0,0 +1,414 @@
+"""Benchmark suite of parsing, query and end-to-end hot paths.
+
+Usage:
+    python benchmarks/run.py                       # run, compare with baseline
+    python benchmarks/run.py --save-baseline       # store results as new baseline
+    python benchmarks/run.py -k marks --rounds 5   # subset, fewer rounds
+
+Results are written as JSON (``--output``), and medians are compared with
+``benchmarks/baseline.json``. The exit status is 1 when a case got slower
+(or a measured footprint bigger) than ``--threshold``. Baselines are only comparable on the same machine.
+End-to-end cases run client and local mock server in one event loop.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import atexit
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+import gc
+from importlib import metadata
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from async_bakalari_api.bakalari import Bakalari
+from async_bakalari_api.const import EndPoint
+from async_bakalari_api.datastructure import Schools
+from async_bakalari_api.komens import Komens
+from async_bakalari_api.marks import Marks
+from async_bakalari_api.mock_server import (
+    MockBakalariServer,
+    MockData,
+    generate_marks,
+    generate_messages,
+    generate_timetable,
+    generate_town,
+    generate_towns,
+)
+from async_bakalari_api.snapshot import SchoolSnapshot, save_snapshot
+from async_bakalari_api.timetable import Timetable
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(HERE, "results.json")
+
+
+class StubBakalari:
+    """Bakalari stand-in returning fixed payload, isolates parsing cost."""
+
+    def __init__(self, payload: Any) -> None:
+        """Return `payload` from every request."""
+        self.payload = payload
+
+    async def send_auth_request(self, *_args: Any, **_kwargs: Any) -> Any:
+        """Return payload."""
+        return self.payload
+
+
+@dataclass(slots=True)
+class Case:
+    """Benchmark case; `setup` runs untimed before every round."""
+
+    name: str
+    setup: Callable[[Env], Awaitable[Any]]
+    run: Callable[[Any], Awaitable[Any]]
+    ops: int = 1
+    rounds: int = 20
+
+
+@dataclass(slots=True)
+class Env:
+    """Shared state of end-to-end cases."""
+
+    server: MockBakalariServer
+    bakalari: Bakalari
+
+
+def marks_parse_case(per_subject: int) -> Case:
+    """Marks._parse_subjects with `per_subject` marks in each of 10 subjects."""
+
+    payload = generate_marks(MockData(subjects=10, marks_per_subject=per_subject))
+
+    async def setup(_env: Env) -> Marks:
+        marks = Marks(StubBakalari(payload))  # type: ignore[arg-type]
+        await marks._parse_marks_options(payload["MarkOptions"])
+        return marks
+
+    async def run(marks: Marks) -> None:
+        for subject in payload["Subjects"]:
+            await marks._parse_subjects(subject)
+
+    return Case(
+        f"marks.parse_subjects[{per_subject}]",
+        setup,
+        run,
+        ops=10 * per_subject,
+        rounds=max(5, 2000 // per_subject),
+    )
+
+
+def marks_query_cases() -> list[Case]:
+    """Marks.get_snapshot and Marks.get_flat over 10 x 100 marks."""
+
+    payload = generate_marks(MockData(subjects=10, marks_per_subject=100))
+
+    async def setup(_env: Env) -> Marks:
+        marks = Marks(StubBakalari(payload))  # type: ignore[arg-type]
+        await marks.fetch_marks()
+        return marks
+
+    async def snapshot(marks: Marks) -> None:
+        await marks.get_snapshot()
+
+    async def flat(marks: Marks) -> None:
+        await marks.get_flat()
+
+    return [
+        Case("marks.get_snapshot[1000]", setup, snapshot, ops=1000),
+        Case("marks.get_flat[1000]", setup, flat, ops=1000),
+    ]
+
+
+def timetable_case() -> Case:
+    """Timetable._parse_timetable of full week (5 days x 10 hours)."""
+
+    payload = generate_timetable(
+        MockData(subjects=15, atoms_per_day=10), date(2024, 9, 2)
+    )
+
+    async def setup(_env: Env) -> Timetable:
+        return Timetable(StubBakalari(payload))  # type: ignore[arg-type]
+
+    async def run(timetable: Timetable) -> None:
+        for _ in range(10):
+            timetable._parse_timetable(payload)
+
+    return Case("timetable.parse_week", setup, run, ops=10, rounds=30)
+
+
+def komens_case() -> Case:
+    """Komens.fetch_messages creating 200 message objects."""
+
+    data = MockData(messages=200, attachments_per_message=2)
+    payload = {"Messages": generate_messages(data, "K", data.messages)}
+
+    async def setup(_env: Env) -> Komens:
+        return Komens(StubBakalari(payload))  # type: ignore[arg-type]
+
+    async def run(komens: Komens) -> None:
+        await komens.fetch_messages()
+
+    return Case("komens.fetch_messages[200]", setup, run, ops=200)
+
+
+def schools_cases() -> list[Case]:
+    """Schools.get_url and search on directory sized like the national one."""
+
+    data = MockData(towns=250, schools_per_town=20)
+    schools = Schools()
+    for town in generate_towns(data):
+        for school in generate_town(data, town["name"], "https://x")["schools"]:
+            schools.append_school(school["name"], school["schoolUrl"], town["name"])
+    step = max(1, len(schools) // 100)
+    names = [school.name or "" for school in schools.school_list[::step]]
+    queries = [name[: 4 + i % 8] for i, name in enumerate(names)]
+
+    async def setup(_env: Env) -> Schools:
+        return schools
+
+    async def run(directory: Schools) -> None:
+        for name in names:
+            directory.get_url(name)
+
+    async def search(directory: Schools) -> None:
+        for query in queries:
+            directory.search(query)
+
+    return [
+        Case(f"schools.get_url[{len(schools)}]", setup, run, ops=len(names)),
+        Case(f"schools.search[{len(schools)}]", setup, search, ops=len(queries)),
+    ]
+
+
+def national_directory() -> bytes:
+    """Return JSON school list sized like the national one."""
+
+    data = MockData(towns=250, schools_per_town=20)
+    return json.dumps(
+        [
+            {"name": school["name"], "api_point": school["schoolUrl"], "town": town}
+            for town in (t["name"] for t in generate_towns(data))
+            for school in generate_town(data, town, "https://x")["schools"]
+        ]
+    ).encode()
+
+
+def memory_usage() -> dict[str, int]:
+    """Return bytes retained by Schools loaded from JSON, per representation."""
+
+    raw = national_directory()
+    usage: dict[str, int] = {}
+    for name, compact in (("schools.memory", False), ("schools.memory_compact", True)):
+        gc.collect()
+        tracemalloc.start()
+        schools = Schools(compact=compact)
+        for item in json.loads(raw):
+            schools.append_school(item["name"], item["api_point"], item["town"])
+        gc.collect()
+        usage[f"{name}[{len(schools)}]"] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del schools
+    return usage
+
+
+def cold_start_cases() -> list[Case]:
+    """Load national directory from JSON file vs. open binary snapshot."""
+
+    directory = tempfile.mkdtemp(prefix="bakalari-bench-")
+    atexit.register(shutil.rmtree, directory, True)
+    json_file = os.path.join(directory, "schools.json")
+    snapshot_file = os.path.join(directory, "schools.bin")
+    with open(json_file, "wb") as file:
+        file.write(national_directory())
+
+    async def setup(_env: Env) -> None:
+        if not os.path.exists(snapshot_file):
+            schools = await Schools().load_from_file(json_file)
+            await save_snapshot(schools, snapshot_file)  # type: ignore[arg-type]
+
+    async def load_json(_state: None) -> None:
+        schools = await Schools().load_from_file(json_file)
+        schools.get_url("Město 249")  # type: ignore[union-attr]
+
+    async def open_snapshot(_state: None) -> None:
+        with SchoolSnapshot.open(snapshot_file) as snapshot:
+            snapshot.get_url("Město 249")
+
+    return [
+        Case("schools.load_json[5000]", setup, load_json),
+        Case("schools.open_snapshot[5000]", setup, open_snapshot),
+    ]
+
+
+def e2e_case(requests: int = 500, concurrency: int = 50) -> Case:
+    """Benchmark authorized marks requests against local mock server."""
+
+    async def setup(env: Env) -> Bakalari:
+        return env.bakalari
+
+    async def run(bakalari: Bakalari) -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one() -> None:
+            async with semaphore:
+                await bakalari.send_auth_request(EndPoint.MARKS)
+
+        await asyncio.gather(*(one() for _ in range(requests)))
+
+    return Case(f"e2e.authorized_marks[{requests}]", setup, run, ops=requests, rounds=5)
+
+
+def all_cases() -> list[Case]:
+    """Return all benchmark cases."""
+
+    return [
+        *(marks_parse_case(n) for n in (10, 100, 1000)),
+        *marks_query_cases(),
+        timetable_case(),
+        komens_case(),
+        *schools_cases(),
+        *cold_start_cases(),
+        e2e_case(),
+    ]
+
+
+async def run_case(case: Case, env: Env, rounds: int | None) -> dict[str, Any]:
+    """Run one warm-up and `rounds` timed rounds, return statistics."""
+
+    timings: list[float] = []
+    for i in range((rounds or case.rounds) + 1):
+        state = await case.setup(env)
+        gc.collect()
+        start = time.perf_counter()
+        await case.run(state)
+        elapsed = time.perf_counter() - start
+        if i:
+            timings.append(elapsed)
+    median = statistics.median(timings)
+    return {
+        "rounds": len(timings),
+        "ops": case.ops,
+        "min": min(timings),
+        "median": median,
+        "mean": statistics.fmean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "ops_per_sec": case.ops / median if median else 0.0,
+    }
+
+
+async def run_all(cases: list[Case], rounds: int | None) -> dict[str, Any]:
+    """Run cases and return results document."""
+
+    results: dict[str, Any] = {}
+    data = MockData(subjects=10, marks_per_subject=20)
+    async with MockBakalariServer(data) as server:
+        bakalari = Bakalari(server.url)
+        await bakalari.first_login("bench", "bench")
+        env = Env(server, bakalari)
+        try:
+            for case in cases:
+                results[case.name] = await run_case(case, env, rounds)
+                print(
+                    f"{case.name:<36} median {results[case.name]['median'] * 1000:9.3f} ms"
+                    f"  {results[case.name]['ops_per_sec']:12.0f} ops/s",
+                    file=sys.stderr,
+                )
+        finally:
+            await bakalari.close()
+    memory = memory_usage()
+    for name, size in memory.items():
+        print(f"{name:<36} {size / 1024:9.0f} KiB", file=sys.stderr)
+    return {
+        "meta": {
+            "created": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "package": metadata.version("async_bakalari_api"),
+        },
+        "results": results,
+        "memory": memory,
+    }
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Print comparison of medians, return names of regressed cases."""
+
+    regressions: list[str] = []
+    for name, current in results["results"].items():
+        if (base := baseline.get("results", {}).get(name)) is None:
+            print(f"{name:<36} (new)", file=sys.stderr)
+            continue
+        ratio = current["median"] / base["median"] if base["median"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<36} {ratio:6.2f}x baseline{flag}", file=sys.stderr)
+    for name, size in results.get("memory", {}).items():
+        if not (base_size := baseline.get("memory", {}).get(name)):
+            continue
+        ratio = size / base_size
+        if ratio > 1 + threshold:
+            regressions.append(name)
+        print(f"{name:<36} {ratio:6.2f}x baseline memory", file=sys.stderr)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="pattern", help="run cases containing pattern")
+    parser.add_argument("--rounds", type=int, help="timed rounds per case")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="results JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown of median before failing (default 0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="write results as baseline"
+    )
+    args = parser.parse_args(argv)
+
+    logging.getLogger("async_bakalari_api").setLevel(logging.ERROR)
+    cases = [c for c in all_cases() if not args.pattern or args.pattern in c.name]
+    results = asyncio.run(run_all(cases, args.rounds))
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with.", file=sys.stderr)
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    return 1 if compare(results, baseline, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
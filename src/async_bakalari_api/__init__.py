@@ -1,22 +1,79 @@
 """Async client to communicate with Bakalari API v3."""
 
+from .api_client import RawResponse
 from .bakalari import Bakalari
 from .bakalari_demo import main
+from .breaker import CircuitBreakerConfig, CircuitBreakerRegistry
+from .cache import (
+    DiskCacheBackend,
+    MemoryCacheBackend,
+    ResponseCache,
+    ValidatorCache,
+)
+from .cassette import Cassette, CassetteMode
+from .credential_store import (
+    CredentialStore,
+    FileCredentialStore,
+    SQLiteCredentialStore,
+)
 from .datastructure import Credentials, Schools
 from .exceptions import Ex
 from .komens import Komens
 from .logger_api import configure_logging
 from .marks import Marks
+from .metrics import InMemoryMetrics, NoopMetrics
+from .mock_server import MockBakalariServer, MockData, MockFaults
+from .persistence import CredentialWriter
+from .pool import AccountResult, BakalariPool, FetchKind
+from .ratelimit import RateLimit, RateLimiter
+from .retry import RetryPolicy
+from .school_cache import SchoolDirectoryCache
+from .snapshot import SchoolSnapshot, save_snapshot
 from .timetable import Timetable
+from .tracing import InMemorySpanExporter, Span, Tracer
+from .transport import PoolStats, SessionRegistry, TransportConfig
 
 __all__ = [
+    "AccountResult",
     "Bakalari",
+    "BakalariPool",
+    "Cassette",
+    "CassetteMode",
+    "CircuitBreakerConfig",
+    "CircuitBreakerRegistry",
+    "CredentialStore",
+    "CredentialWriter",
     "Credentials",
+    "DiskCacheBackend",
     "Ex",
+    "FetchKind",
+    "FileCredentialStore",
     "main",
     "Schools",
     "Komens",
+    "InMemoryMetrics",
+    "InMemorySpanExporter",
     "Marks",
+    "MemoryCacheBackend",
+    "MockBakalariServer",
+    "MockData",
+    "MockFaults",
+    "NoopMetrics",
+    "PoolStats",
+    "RateLimit",
+    "RateLimiter",
+    "RawResponse",
+    "ResponseCache",
+    "RetryPolicy",
+    "SQLiteCredentialStore",
+    "SchoolDirectoryCache",
+    "SchoolSnapshot",
+    "SessionRegistry",
+    "Span",
     "Timetable",
+    "Tracer",
+    "TransportConfig",
+    "ValidatorCache",
     "configure_logging",
+    "save_snapshot",
 ]
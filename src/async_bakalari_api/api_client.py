@@ -3,20 +3,92 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Awaitable, Callable
-from contextlib import AsyncExitStack
+import codecs
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
+from dataclasses import dataclass
+import json
 import logging
+import re
 import time
-from typing import Any, Self
+from typing import Any, Never, Self
 from urllib import parse
 
 import aiohttp
+from multidict import CIMultiDict
+import orjson
 
-from .const import REQUEST_TIMEOUT, Errors
-from .exceptions import Ex
+from .breaker import BreakerState, CircuitBreaker, CircuitBreakerRegistry
+from .cache import ValidatorCache, normalize_params
+from .cassette import Cassette, CassetteMode
+from .const import REQUEST_TIMEOUT, EndPoint, Errors
+from .exceptions import APIException, Ex
+from .metrics import NOOP_METRICS, Metrics
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy, parse_retry_after
+from .tracing import NOOP_TRACER, NoopTracer, Tracer
+from .transport import (
+    HttpResponse,
+    HttpSession,
+    PoolStats,
+    SessionRegistry,
+    TransportConfig,
+    pool_stats,
+)
 
 log = logging.getLogger(__name__)
 
+_JSON_CONTENT_TYPE = re.compile(r"^application/(?:[\w.+-]+?\+)?json")
+_UTF8_CHARSETS = frozenset({"utf-8", "utf8"})
+
+
+_ENDPOINT_PATHS: tuple[str, ...] = tuple(
+    sorted(
+        {parse.urlsplit(endpoint.endpoint).path for endpoint in EndPoint},
+        key=len,
+        reverse=True,
+    )
+)
+
+
+def _metric_target(url: str) -> tuple[str, str]:
+    """Return (host, endpoint) metric labels; ids in paths are dropped."""
+
+    parts = parse.urlsplit(url)
+    path = parts.path
+    for endpoint in _ENDPOINT_PATHS:
+        if path == endpoint or path.startswith(endpoint + "/"):
+            path = endpoint
+            break
+    return parts.hostname or "", path
+
+
+def _credentials_owner(credentials: Any) -> str | None:
+    """Return identifier of the user owning the credentials."""
+
+    return (
+        getattr(credentials, "user_id", None)
+        or getattr(credentials, "username", None)
+        or getattr(credentials, "access_token", None)
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class RawResponse:
+    """Undecoded response returned by requests with `raw=True`."""
+
+    status: int
+    headers: CIMultiDict[str]
+    body: bytes
+
+
+def attachment_filename(content_disposition: str) -> str:
+    """Return filename from `filename*=UTF-8''...` Content-Disposition."""
+
+    return parse.unquote(
+        content_disposition[content_disposition.rindex("filename*=") + 17 :]
+    )
+
 
 class ApiClient:
     """Thin wrapper around :mod:`aiohttp` with structured logging and metrics."""
@@ -26,10 +98,68 @@ class ApiClient:
         *,
         session: aiohttp.ClientSession | None = None,
         timeout: float = REQUEST_TIMEOUT,
+        validator_cache: ValidatorCache | None = None,
+        coalesce_requests: bool = False,
+        transport: TransportConfig | None = None,
+        session_registry: SessionRegistry | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breakers: CircuitBreakerRegistry | None = None,
+        rate_limiter: RateLimiter | None = None,
+        json_decoder: Callable[[bytes | str], Any] = orjson.loads,
+        metrics: Metrics = NOOP_METRICS,
+        tracer: Tracer | NoopTracer = NOOP_TRACER,
+        cassette: Cassette | None = None,
     ) -> None:
-        """Thin wrapper around :mod:`aiohttp` with structured logging and metrics."""
+        """Thin wrapper around :mod:`aiohttp` with structured logging and metrics.
+
+        Args:
+            session (aiohttp.ClientSession, optional): External session. Defaults to None.
+            timeout (float, optional): Request timeout in seconds.
+            validator_cache (ValidatorCache, optional): Enables conditional GET requests
+                (`ETag` / `Last-Modified`). Defaults to None (disabled).
+            coalesce_requests (bool, optional): Share one in-flight request between
+                concurrent identical authorized GETs. Defaults to False.
+            transport (TransportConfig, optional): Connection pool settings of the
+                owned session. Ignored when external session is used.
+            session_registry (SessionRegistry, optional): Acquire sessions shared
+                per host from registry instead of owning one. Defaults to None.
+            retry_policy (RetryPolicy, optional): Retry transient failures of
+                idempotent requests. Defaults to None (no retries).
+            circuit_breakers (CircuitBreakerRegistry, optional): Fail fast on hosts
+                which keep timing out or answer 502/503/504. Defaults to None.
+            rate_limiter (RateLimiter, optional): Queue requests to respect per-host
+                and global request rate. Defaults to None (unlimited).
+            json_decoder (Callable, optional): Decoder of raw JSON body.
+                Defaults to :func:`orjson.loads`.
+            metrics (Metrics, optional): Sink of request counters and latency
+                histograms, e.g. :class:`InMemoryMetrics`. Defaults to no-op.
+            tracer (Tracer, optional): Records spans of request phases; owned
+                sessions get its aiohttp trace config. Defaults to no-op.
+            cassette (Cassette, optional): Record responses to, or replay them
+                from, a cassette instead of plain network access. Defaults to None.
+
+        """
 
         self._timeout = timeout
+        self._validator_cache = validator_cache
+        self._coalesce_requests = coalesce_requests
+        self._transport = transport
+        self._session_registry = session_registry
+        self._retry_policy = retry_policy
+        self._circuit_breakers = circuit_breakers
+        if (
+            circuit_breakers is not None
+            and metrics.enabled
+            and not circuit_breakers.metrics.enabled
+        ):
+            circuit_breakers.metrics = metrics
+        self._rate_limiter = rate_limiter
+        self._json_decoder = json_decoder
+        self._metrics = metrics
+        self._tracer = tracer
+        self._cassette = cassette
+        self._shared_sessions: dict[str, aiohttp.ClientSession] = {}
+        self._inflight: dict[tuple[Any, ...], asyncio.Task[Any]] = {}
         self._external_session = session
         self._session: aiohttp.ClientSession | None = session
         self._session_owner = session is None
@@ -37,7 +167,8 @@ class ApiClient:
 
     async def __aenter__(self) -> Self:
         """Enter the async context manager."""
-        await self._ensure_session()
+        if self._session_registry is None:
+            await self._ensure_session()
         return self
 
     async def __aexit__(self, *_exc_info: object) -> None:
@@ -49,16 +180,80 @@ class ApiClient:
             if not self._session_owner and self._external_session is not None:
                 self._session = self._external_session
             else:
+                trace_config = self._tracer.trace_config()
                 session = aiohttp.ClientSession(
-                    timeout=aiohttp.ClientTimeout(total=self._timeout), trust_env=True
+                    timeout=aiohttp.ClientTimeout(total=self._timeout),
+                    trust_env=True,
+                    connector=(
+                        self._transport.create_connector()
+                        if self._transport is not None
+                        else None
+                    ),
+                    trace_configs=[trace_config] if trace_config is not None else None,
                 )
                 self._session = await self._exit_stack.enter_async_context(session)
                 self._session_owner = True
         return self._session
 
+    async def _session_for(self, url: str) -> HttpSession:
+        """Return session to use for url, wrapped by cassette if configured."""
+
+        match self._cassette.mode if self._cassette is not None else None:
+            case CassetteMode.REPLAY:
+                return self._cassette.session()  # pyright: ignore[reportOptionalMemberAccess]
+            case CassetteMode.RECORD:
+                return self._cassette.session(await self._http_session_for(url))  # pyright: ignore[reportOptionalMemberAccess]
+            case _:
+                return await self._http_session_for(url)
+
+    async def _http_session_for(self, url: str) -> aiohttp.ClientSession:
+        """Return network session to use for url."""
+
+        if self._session_registry is None or self._external_session is not None:
+            return await self._ensure_session()
+
+        host = parse.urlsplit(url).hostname or ""
+        session = self._shared_sessions.get(host)
+        if session is None or session.closed:
+            if session is not None:
+                await self._session_registry.release(host, session, tracer=self._tracer)
+            session = await self._session_registry.acquire(host, tracer=self._tracer)
+            self._shared_sessions[host] = session
+        return session
+
+    def pool_stats(self) -> PoolStats | None:
+        """Return connection pool utilization, None without owned session.
+
+        Clients using :class:`SessionRegistry` report through
+        :meth:`SessionRegistry.pool_stats`.
+        """
+
+        if self._session is None or self._session.closed:
+            return None
+        return pool_stats(self._session.connector)  # pyright: ignore[reportArgumentType]
+
+    def breaker_states(self) -> dict[str, BreakerState]:
+        """Return circuit breaker state per host, empty without breakers."""
+
+        if self._circuit_breakers is None:
+            return {}
+        return self._circuit_breakers.states()
+
+    def rate_limit_wait_times(self) -> dict[str, float]:
+        """Return estimated rate limiter wait of a new request per host."""
+
+        if self._rate_limiter is None:
+            return {}
+        return self._rate_limiter.wait_times()
+
     async def close(self) -> None:
         """Close the managed session."""
 
+        if self._session_registry is not None:
+            for host, session in self._shared_sessions.items():
+                await self._session_registry.release(host, session, tracer=self._tracer)
+            self._shared_sessions.clear()
+
         if self._session_owner:
             await self._exit_stack.aclose()
             # Recreate the exit stack so this client can be reused later
@@ -66,19 +261,155 @@ class ApiClient:
         self._session = None
         self._session_owner = False
 
-    async def request(  # noqa: C901
+    async def request(
+        self,
+        url: str,
+        method: str,
+        headers: dict[str, str] | None = None,
+        *,
+        retry: int = 0,
+        cache_owner: str | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Execute HTTP request and map errors to domain exceptions.
+
+        Transient failures are retried according to the retry policy.
+        `cache_owner` distinguishes users sharing the validator cache.
+        With `raw=True` successful responses are returned undecoded
+        as :class:`RawResponse`.
+        """
+
+        breaker = None
+        if self._circuit_breakers is not None:
+            breaker = self._circuit_breakers.get(parse.urlsplit(url).hostname or "")
+
+        attempt = 0
+        while True:
+            try:
+                with self._tracer.span(
+                    "http.request", method=method, url=url, retry=retry + attempt
+                ):
+                    return await self._guarded_request(
+                        breaker,
+                        url,
+                        method,
+                        headers,
+                        retry=retry + attempt,
+                        cache_owner=cache_owner,
+                        **kwargs,
+                    )
+            except (
+                Ex.TimeoutException,
+                Ex.ServerConnectionError,
+                Ex.TransientServerError,
+            ) as err:
+                if self._retry_policy is None:
+                    raise
+                delay = self._retry_policy.retry_delay(method, attempt, err)
+                if delay is None:
+                    raise
+                attempt += 1
+                log.warning(
+                    "request_retry",
+                    extra={
+                        "event": "request_retry",
+                        "url": url,
+                        "method": method,
+                        "retries": retry + attempt,
+                        "error": err.__class__.__name__,
+                        "delay_s": round(delay, 3),
+                    },
+                )
+                await asyncio.sleep(delay)
+
+    async def _guarded_request(
+        self,
+        breaker: CircuitBreaker | None,
+        url: str,
+        method: str,
+        headers: dict[str, str] | None,
+        **kwargs: Any,
+    ) -> Any:
+        """Execute request attempt through circuit breaker of its host."""
+
+        if breaker is None:
+            return await self._request_once(url, method, headers, **kwargs)
+
+        if not breaker.allow():
+            self._log_metrics(
+                url,
+                method,
+                0.0,
+                retry=kwargs.get("retry", 0),
+                error="circuit_open",
+                breaker=breaker.state,
+            )
+            raise Ex.CircuitOpen(
+                f"Circuit breaker for {breaker.host} is open, request to {url} not sent",
+                retry_after=breaker.retry_in(),
+            )
+        try:
+            result = await self._request_once(url, method, headers, **kwargs)
+        except (
+            Ex.TimeoutException,
+            Ex.ServerConnectionError,
+            Ex.ServiceUnavailable,
+        ):
+            breaker.record_failure()
+            raise
+        except APIException:
+            # Server answered; client side errors say nothing about its health.
+            breaker.record_success()
+            raise
+        except BaseException:
+            breaker.record_ignored()
+            raise
+        breaker.record_success()
+        return result
+
+    async def _throttle(self, url: str, method: str) -> None:
+        """Wait for rate limiter token of url host."""
+
+        if self._rate_limiter is None:
+            return
+        waited = await self._rate_limiter.acquire(parse.urlsplit(url).hostname or "")
+        if waited > 0:
+            log.debug(
+                "rate_limited",
+                extra={
+                    "event": "rate_limited",
+                    "url": url,
+                    "method": method,
+                    "wait_ms": round(waited * 1000, 2),
+                },
+            )
+
+    async def _request_once(  # noqa: C901
         self,
         url: str,
         method: str,
         headers: dict[str, str] | None = None,
         *,
         retry: int = 0,
+        cache_owner: str | None = None,
+        raw: bool = False,
         **kwargs: Any,
     ) -> Any:
-        """Execute HTTP request and map errors to domain exceptions."""
+        """Execute single HTTP request attempt."""
 
-        session = await self._ensure_session()
-        headers = headers or {}
+        await self._throttle(url, method)
+        session = await self._session_for(url)
+        headers = dict(headers or {})
+        validator_key = None
+        if (
+            self._validator_cache is not None
+            and method.upper() == aiohttp.hdrs.METH_GET
+            and not raw
+        ):
+            validator_key = self._validator_cache.make_key(
+                method, url, kwargs.get("params"), cache_owner
+            )
+            headers.update(self._validator_cache.conditional_headers(validator_key))
         start = time.perf_counter()
         try:
             async with asyncio.timeout(self._timeout):
@@ -90,25 +421,32 @@ class ApiClient:
                     **kwargs,
                 ) as response:
                     payload: Any
-                    if response.status == 204:
+                    body = b""
+                    if raw:
+                        with self._tracer.span("http.read_body"):
+                            body = await response.read()
+                        # Error payload is still decoded for exception mapping.
+                        payload = None
+                        if response.status >= 400:
+                            with suppress(ValueError):
+                                payload = await self._read_json(response)
+                    elif response.status in (204, 304):
                         # No content; avoid attempting to parse JSON.
                         payload = None
                     elif (
                         response.headers.get(aiohttp.hdrs.CONTENT_TYPE)
                         == "application/octet-stream"
                     ):
-                        filedata = await response.read()
-                        filename = response.headers[aiohttp.hdrs.CONTENT_DISPOSITION]
-                        filename = parse.unquote(
-                            filename[filename.rindex("filename*=") + 17 :]
+                        with self._tracer.span("http.read_body"):
+                            filedata = await response.read()
+                        filename = attachment_filename(
+                            response.headers[aiohttp.hdrs.CONTENT_DISPOSITION]
                         )
                         payload = [filename, filedata]
+                        # Attachments are not kept in the validator cache.
+                        validator_key = None
                     else:
-                        try:
-                            payload = await response.json()
-                        except aiohttp.ContentTypeError:
-                            # Empty body or non-JSON when we expected JSON; treat as None.
-                            payload = None
+                        payload = await self._read_json(response)
                     latency = (time.perf_counter() - start) * 1000
                     self._log_metrics(
                         url,
@@ -128,19 +466,180 @@ class ApiClient:
             self._log_metrics(
                 url, method, latency, retry=retry, error="connection_error"
             )
-            raise Ex.BadRequestException(f"Connection error: {url}") from err
+            raise Ex.ServerConnectionError(f"Connection error: {url}") from err
+
+        if raw and response.status in (200, 204):
+            return RawResponse(
+                status=response.status,
+                headers=CIMultiDict(response.headers),
+                body=body,
+            )
 
         match response.status:
+            case 200:
+                if validator_key is not None:
+                    self._validator_cache.store(  # pyright: ignore[reportOptionalMemberAccess]
+                        validator_key, response.headers, payload
+                    )
+                return payload
+            case 204:
+                # No Content (e.g. mark-as-read). Return None to signal success without payload.
+                return None
+            case 304 if validator_key is not None and (
+                cached := self._validator_cache.get(validator_key)  # pyright: ignore[reportOptionalMemberAccess]
+            ):
+                return cached.payload
+            case _:
+                self._raise_for_status(
+                    url, method, response.status, response.headers, payload
+                )
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        url: str,
+        method: str,
+        headers: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[HttpResponse]:
+        """Open response with unread body for streaming.
+
+        Timeout applies to connecting and to each read, not to the whole
+        body. Streams are never retried.
+        """
+
+        await self._throttle(url, method)
+        session = await self._session_for(url)
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self._timeout):
+                response = await session.request(
+                    method,
+                    url,
+                    ssl=True,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=None, sock_read=self._timeout),
+                    **kwargs,
+                )
+        except TimeoutError as err:
+            latency = (time.perf_counter() - start) * 1000
+            self._log_metrics(url, method, latency, error="timeout")
+            raise Ex.TimeoutException(
+                f"Timeout occurred while connecting to server {url}"
+            ) from err
+        except aiohttp.ClientConnectionError as err:
+            latency = (time.perf_counter() - start) * 1000
+            self._log_metrics(url, method, latency, error="connection_error")
+            raise Ex.ServerConnectionError(f"Connection error: {url}") from err
+
+        try:
+            latency = (time.perf_counter() - start) * 1000
+            self._log_metrics(url, method, latency, status=response.status)
+            if response.status != 200:
+                try:
+                    payload = await self._read_json(response)
+                except ValueError:
+                    payload = None
+                self._raise_for_status(
+                    url, method, response.status, response.headers, payload
+                )
+            yield response
+        finally:
+            response.release()
+
+    @asynccontextmanager
+    async def authorized_stream(
+        self,
+        url: str,
+        method: str,
+        *,
+        credentials: Any,
+        refresh_callback: Callable[[], Awaitable[Any]],
+        headers: dict[str, str] | None = None,
+        max_retries: int = 1,
+        **kwargs: Any,
+    ) -> AsyncIterator[HttpResponse]:
+        """Open authorized response for streaming, refresh token when needed."""
+
+        if not getattr(credentials, "access_token", None) and not getattr(
+            credentials, "refresh_token", None
+        ):
+            raise Ex.TokenMissing("Access token or Refresh token is missing!")
+
+        headers = {**(headers or {})}
+        retries = 0
+        async with AsyncExitStack() as stack:
+            while True:
+                if credentials.access_token:
+                    headers["Authorization"] = f"Bearer {credentials.access_token}"
+                else:
+                    headers.pop("Authorization", None)
+                try:
+                    response = await stack.enter_async_context(
+                        self.stream(url, method, headers, **kwargs)
+                    )
+                except (Ex.AccessTokenExpired, Ex.InvalidToken):
+                    if retries >= max_retries:
+                        raise
+                    retries += 1
+                    log.warning(
+                        "access_token_refresh",
+                        extra={
+                            "event": "token_refresh",
+                            "url": url,
+                            "method": method,
+                            "retry": retries,
+                        },
+                    )
+                    credentials = await refresh_callback()
+                else:
+                    break
+            yield response
+
+    async def _read_json(self, response: HttpResponse) -> Any:
+        """Decode JSON body from raw bytes, None for empty or non-JSON response."""
+
+        if not _JSON_CONTENT_TYPE.match(response.content_type):
+            return None
+        with self._tracer.span("http.read_body"):
+            body: bytes | str = await response.read()
+        if not body.strip():
+            return None
+        with self._tracer.span("json.decode", size=len(body)):
+            charset = response.charset
+            if charset and charset.lower() not in _UTF8_CHARSETS:
+                try:
+                    codecs.lookup(charset)
+                except LookupError:
+                    log.debug(f"Unknown response charset {charset}, using UTF-8.")
+                else:
+                    body = body.decode(charset)
+            try:
+                return self._json_decoder(body)
+            except ValueError:
+                if self._json_decoder is not orjson.loads:
+                    raise
+                # orjson rejects e.g. NaN or integers above 64 bits, stdlib does not.
+                log.debug("Falling back to json module for response decoding.")
+                return json.loads(body)
+
+    def _raise_for_status(  # noqa: C901
+        self,
+        url: str,
+        method: str,
+        status: int,
+        headers: Any,
+        payload: Any,
+    ) -> Never:
+        """Raise domain exception for unsuccessful response."""
+
+        match status:
             case 401:
-                if Errors.ACCESS_TOKEN_EXPIRED in response.headers.get(
-                    "WWW-Authenticate", ""
-                ):
+                if Errors.ACCESS_TOKEN_EXPIRED in headers.get("WWW-Authenticate", ""):
                     raise Ex.AccessTokenExpired("Access token expired.")
-                if Errors.REFRESH_TOKEN_EXPIRED in response.headers.get(
-                    "WWW-Authenticate", ""
-                ):
+                if Errors.REFRESH_TOKEN_EXPIRED in headers.get("WWW-Authenticate", ""):
                     raise Ex.RefreshTokenExpired("Refresh token expired.")
-                if Errors.INVALID_TOKEN in response.headers.get("WWW-Authenticate", ""):
+                if Errors.INVALID_TOKEN in headers.get("WWW-Authenticate", ""):
                     raise Ex.InvalidToken("Invalid token provided.")
                 raise Ex.BadRequestException(f"{url} with message: {payload}")
             case 400:
@@ -159,11 +658,22 @@ class ApiClient:
                         raise Ex.BadRequestException(f"{url} with message: {payload}")
             case 404:
                 raise Ex.BadRequestException(f"Not found! ({url})")
-            case 200:
-                return payload
-            case 204:
-                # No Content (e.g. mark-as-read). Return None to signal success without payload.
-                return None
+            case 429:
+                raise Ex.TooManyRequests(
+                    f"{url} with message: {payload}",
+                    status=status,
+                    retry_after=parse_retry_after(
+                        headers.get(aiohttp.hdrs.RETRY_AFTER)
+                    ),
+                )
+            case 502 | 503 | 504:
+                raise Ex.ServiceUnavailable(
+                    f"{url} with message: {payload}",
+                    status=status,
+                    retry_after=parse_retry_after(
+                        headers.get(aiohttp.hdrs.RETRY_AFTER)
+                    ),
+                )
             case _:
                 raise Ex.BadRequestException(f"{url} with message: {payload}")
 
@@ -178,13 +688,83 @@ class ApiClient:
         max_retries: int = 1,
         **kwargs: Any,
     ) -> Any:
-        """Make authorized request."""
+        """Make authorized request.
+
+        With request coalescing enabled, concurrent identical GET requests of the
+        same user share one in-flight request; result or failure is delivered
+        to every caller. Pass `raw=True` to get undecoded :class:`RawResponse`.
+        """
 
         if not getattr(credentials, "access_token", None) and not getattr(
             credentials, "refresh_token", None
         ):
             raise Ex.TokenMissing("Access token or Refresh token is missing!")
 
+        if (
+            not self._coalesce_requests
+            or method.upper() != aiohttp.hdrs.METH_GET
+            or "json" in kwargs
+            or "data" in kwargs
+        ):
+            return await self._authorized_request(
+                url,
+                method,
+                credentials=credentials,
+                refresh_callback=refresh_callback,
+                headers=headers,
+                max_retries=max_retries,
+                **kwargs,
+            )
+
+        key = (
+            method.upper(),
+            url,
+            normalize_params(kwargs.get("params")),
+            _credentials_owner(credentials),
+            bool(kwargs.get("raw")),
+        )
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._authorized_request(
+                    url,
+                    method,
+                    credentials=credentials,
+                    refresh_callback=refresh_callback,
+                    headers=headers,
+                    max_retries=max_retries,
+                    **kwargs,
+                )
+            )
+            self._inflight[key] = task
+
+            def _done(done: asyncio.Task[Any]) -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+                # Mark exception as retrieved even if every waiter was cancelled.
+                if not done.cancelled():
+                    done.exception()
+
+            task.add_done_callback(_done)
+        else:
+            log.debug(
+                "coalesced_request",
+                extra={"event": "coalesced_request", "url": url, "method": method},
+            )
+
+        return await asyncio.shield(task)
+
+    async def _authorized_request(
+        self,
+        url: str,
+        method: str,
+        *,
+        credentials: Any,
+        refresh_callback: Callable[[], Awaitable[Any]],
+        headers: dict[str, str] | None = None,
+        max_retries: int = 1,
+        **kwargs: Any,
+    ) -> Any:
         headers = {
             **(headers or {}),
         }
@@ -195,11 +775,17 @@ class ApiClient:
 
         retries = 0
         total_start = time.perf_counter()
+        cache_owner = _credentials_owner(credentials)
 
         while True:
             try:
                 result = await self.request(
-                    url, method=method, headers=headers, retry=retries, **kwargs
+                    url,
+                    method=method,
+                    headers=headers,
+                    retry=retries,
+                    cache_owner=cache_owner,
+                    **kwargs,
                 )
                 latency = (time.perf_counter() - total_start) * 1000
                 self._log_request_summary(url, method, latency, retries)
@@ -253,7 +839,33 @@ class ApiClient:
         retry: int = 0,
         status: int | None = None,
         error: str | None = None,
+        breaker: str | None = None,
     ) -> None:
+        if self._metrics.enabled:
+            host, endpoint = _metric_target(url)
+            outcome = str(status) if status is not None else (error or "")
+            self._metrics.observe(
+                "bakalari_request_latency_ms",
+                {
+                    "host": host,
+                    "endpoint": endpoint,
+                    "method": method,
+                    "status": outcome,
+                },
+                latency_ms,
+            )
+            self._metrics.inc(
+                "bakalari_requests_total",
+                {
+                    "host": host,
+                    "endpoint": endpoint,
+                    "method": method,
+                    "status": outcome,
+                    "retries": str(retry),
+                },
+            )
+        if not log.isEnabledFor(logging.DEBUG):
+            return
         extra = {
             "event": "api_request",
             "url": url,
@@ -265,6 +877,8 @@ class ApiClient:
             extra["status"] = status
         if error is not None:
             extra["error"] = error
+        if breaker is not None:
+            extra["breaker"] = breaker
         log.debug("api_request", extra=extra)
 
     def _log_request_summary(
@@ -276,6 +890,25 @@ class ApiClient:
         *,
         error: str | None = None,
     ) -> None:
+        if self._metrics.enabled:
+            host, endpoint = _metric_target(url)
+            self._metrics.observe(
+                "bakalari_authorized_request_latency_ms",
+                {"host": host, "endpoint": endpoint, "method": method},
+                latency_ms,
+            )
+            self._metrics.inc(
+                "bakalari_authorized_requests_total",
+                {
+                    "host": host,
+                    "endpoint": endpoint,
+                    "method": method,
+                    "retries": str(retries),
+                    "error": error or "",
+                },
+            )
+        if not log.isEnabledFor(logging.DEBUG):
+            return
         extra = {
             "event": "authorized_request",
             "url": url,
@@ -4,28 +4,36 @@ from __future__ import annotations
 
 import asyncio
 from asyncio.locks import Lock
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager, suppress
 import logging
-from typing import Any, Never, Self, TypedDict
+from typing import Any, Never, Self
 from urllib import parse
 
+import aiofiles
 import aiohttp
 from aiohttp import hdrs
 import orjson
 
 from .api_client import ApiClient
+from .breaker import BreakerState, CircuitBreakerRegistry
+from .cache import ResponseCache, ValidatorCache
+from .cassette import Cassette
 from .const import REQUEST_TIMEOUT, EndPoint
-from .datastructure import Credentials, Schools
-from .exceptions import Ex
+from .credential_store import CredentialStore
+from .datastructure import Credentials, School, Schools
+from .exceptions import APIException, Ex
+from .metrics import NOOP_METRICS, Metrics
+from .persistence import CredentialWriter, write_atomic
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .school_cache import SchoolDirectoryCache, select_towns
+from .tracing import NOOP_TRACER, NoopTracer, Tracer
+from .transport import HttpResponse, PoolStats, SessionRegistry, TransportConfig
 
 log = logging.getLogger(__name__)
 
 
-class Town(TypedDict):
-    """Town data structure."""
-
-    name: str
-
-
 class Bakalari:
     """Root class of Bakalari."""
 
@@ -42,6 +50,22 @@ class Bakalari:
         cache_filename: str | None = None,
         session: aiohttp.ClientSession | None = None,
         school_concurrency: int = 10,
+        *,
+        validator_cache: ValidatorCache | None = None,
+        response_cache: ResponseCache | None = None,
+        coalesce_requests: bool = False,
+        token_refresh_margin: float = 60.0,
+        transport: TransportConfig | None = None,
+        session_registry: SessionRegistry | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breakers: CircuitBreakerRegistry | None = None,
+        rate_limiter: RateLimiter | None = None,
+        metrics: Metrics = NOOP_METRICS,
+        tracer: Tracer | NoopTracer = NOOP_TRACER,
+        cassette: Cassette | None = None,
+        credential_writer: CredentialWriter | None = None,
+        credential_store: CredentialStore | None = None,
+        school_cache: SchoolDirectoryCache | None = None,
     ):
         """Root class of Bakalari.
 
@@ -55,6 +79,43 @@ class Bakalari:
             session (aiohttp.ClientSession, optional): Session object. Defaults to None.
             school_concurrency (int, optional): Maximum number of concurrent town
                 fetches when building school lists. Defaults to 10.
+            validator_cache (ValidatorCache, optional): Cache for conditional requests
+                (`If-None-Match` / `If-Modified-Since`). Defaults to None.
+            response_cache (ResponseCache, optional): TTL cache for authorized
+                requests, see :attr:`EndPoint.ttl`. Requests are cached only when
+                credentials have user id or username. The cache may be shared,
+                closing this instance cancels only its own background refreshes.
+                Defaults to None.
+            coalesce_requests (bool, optional): Share one in-flight request between
+                concurrent identical authorized GETs. Defaults to False.
+            token_refresh_margin (float, optional): Seconds before access token
+                expiration when it is refreshed ahead of time. Defaults to 60.
+            transport (TransportConfig, optional): Connection pool and keep-alive
+                settings of the owned session. Defaults to aiohttp defaults.
+            session_registry (SessionRegistry, optional): Share pooled sessions per
+                school host with other instances, e.g. `SessionRegistry.default()`.
+            retry_policy (RetryPolicy, optional): Retry transient failures with
+                exponential backoff. Defaults to None (no retries).
+            circuit_breakers (CircuitBreakerRegistry, optional): Per-server circuit
+                breakers, may be shared between instances. Defaults to None.
+            rate_limiter (RateLimiter, optional): Token bucket limiter per school
+                host, share it between instances polling one school. Defaults to None.
+            metrics (Metrics, optional): Request counters and latency histograms
+                sink, e.g. :class:`InMemoryMetrics`. Defaults to no-op.
+            tracer (Tracer, optional): Tracing hooks for request phases and model
+                building in Marks, Timetable and Komens. Defaults to no-op.
+            cassette (Cassette, optional): Record/replay transport for offline
+                benchmarks and tests. Defaults to None (live).
+            credential_writer (CredentialWriter, optional): Debounced writer of
+                auto-cached credentials, share it between instances to batch
+                writes. Defaults to writer owned by this instance.
+            credential_store (CredentialStore, optional): Store of auto-cached
+                credentials, `cache_filename` is the key. Credentials are not
+                loaded on init, use :meth:`async_load_credentials` or pass
+                them from :meth:`CredentialStore.load_all`. The store is not
+                closed with this instance. Defaults to None (JSON file).
+            school_cache (SchoolDirectoryCache, optional): Persistent school
+                directory used by :meth:`schools_list`. Defaults to None.
 
         """
 
@@ -65,17 +126,45 @@ class Bakalari:
         self._new_token: bool = False
         self._auto_cache_credentials: bool = auto_cache_credentials
         self._cache_filename: str | None = cache_filename
+        self._credential_writer: CredentialWriter = (
+            credential_writer or CredentialWriter()
+        )
+        self._credential_store: CredentialStore | None = credential_store
         self._api_client: ApiClient = ApiClient(
-            session=session, timeout=REQUEST_TIMEOUT
+            session=session,
+            timeout=REQUEST_TIMEOUT,
+            validator_cache=validator_cache,
+            coalesce_requests=coalesce_requests,
+            transport=transport,
+            session_registry=session_registry,
+            retry_policy=retry_policy,
+            circuit_breakers=circuit_breakers,
+            rate_limiter=rate_limiter,
+            metrics=metrics,
+            tracer=tracer,
+            cassette=cassette,
         )
+        self._tracer: Tracer | NoopTracer = tracer
         self._refresh_lock: Lock = asyncio.Lock()
+        self._response_cache: ResponseCache | None = response_cache
+        # Keys requested by this instance, their refreshes are cancelled on close.
+        self._response_cache_keys: set[str] = set()
+        self._token_refresh_margin: float = max(0.0, token_refresh_margin)
+        self._token_refresh_task: asyncio.Task[None] | None = None
         self.schools: Schools = Schools()
         self._school_concurrency: int = max(1, int(school_concurrency))
+        self._school_cache: SchoolDirectoryCache | None = school_cache
+        self._schools_refresh_task: asyncio.Task[Schools | None] | None = None
+        self._schools_lock: Lock = asyncio.Lock()
 
         if self.auto_cache_credentials and not self.cache_filename:
             raise Ex.CacheError("Auto-cache is enabled, but no filename is provided!")
 
-        if self._auto_cache_credentials and self._cache_filename:
+        if (
+            self._auto_cache_credentials
+            and self._cache_filename
+            and not credential_store
+        ):
             self.load_credentials(self._cache_filename)
 
     @property
@@ -88,6 +177,11 @@ class Bakalari:
         """Raise an AttributeError as credentials are read-only."""
         raise AttributeError("Credentials are read-only. Use login/refresh methods.")
 
+    @property
+    def tracer(self) -> Tracer | NoopTracer:
+        """Returns the tracer."""
+        return self._tracer
+
     @property
     def auto_cache_credentials(self) -> bool:
         """Returns whether auto-cache is enabled."""
@@ -104,9 +198,21 @@ class Bakalari:
         return self._server
 
     async def send_auth_request(
-        self, request_endpoint: EndPoint, extend: str | None = None, **kwargs
+        self,
+        request_endpoint: EndPoint,
+        extend: str | None = None,
+        *,
+        raw: bool = False,
+        **kwargs,
     ):
-        """Send authorized request with access token or refresh token."""
+        """Send authorized request with access token or refresh token.
+
+        With `raw=True` returns :class:`RawResponse` with undecoded body,
+        status and headers; the response cache is bypassed.
+        """
+
+        if raw:
+            kwargs["raw"] = True
 
         request: str = str(self.get_request_url(request_endpoint) or "")
 
@@ -130,13 +236,52 @@ class Bakalari:
             },
         )
 
-        return await self._api_client.authorized_request(
+        async def _fetch() -> Any:
+            await self._ensure_fresh_token()
+            return await self._api_client.authorized_request(
+                request,
+                method=method,
+                credentials=self.credentials,
+                refresh_callback=self.refresh_access_token,
+                **kwargs,
+            )
+
+        if (
+            self._response_cache is not None
+            and not raw
+            and "json" not in kwargs
+            and "data" not in kwargs
+            and (ttl := self._response_cache.ttl_for(request_endpoint)) > 0
+            # Without stable identity responses could leak between accounts.
+            and (owner := self.credentials.user_id or self.credentials.username)
+        ):
+            key = ResponseCache.make_key(
+                request_endpoint, request, owner, kwargs.get("params")
+            )
+            self._response_cache_keys.add(key)
+            return await self._response_cache.get_or_fetch(key, ttl, _fetch)
+
+        return await _fetch()
+
+    @asynccontextmanager
+    async def stream_auth_request(
+        self, request_endpoint: EndPoint, extend: str | None = None, **kwargs
+    ) -> AsyncIterator[HttpResponse]:
+        """Open authorized response with unread body for streaming."""
+
+        request: str = str(self.get_request_url(request_endpoint) or "")
+        if extend:
+            request += extend
+
+        await self._ensure_fresh_token()
+        async with self._api_client.authorized_stream(
             request,
-            method=method,
+            method=hdrs.METH_GET,
             credentials=self.credentials,
             refresh_callback=self.refresh_access_token,
             **kwargs,
-        )
+        ) as response:
+            yield response
 
     async def send_unauth_request(
         self, request: EndPoint, headers: dict[str, str] | None = None, **kwargs
@@ -185,17 +330,14 @@ class Bakalari:
             url, method=method, headers=headers, **kwargs
         )
 
-    async def schools_list(  # noqa: C901
-        self, town: str | None = None, recursive: bool = True
-    ) -> Schools | None:
-        """Return list of schools with their API points."""
-
-        _schools_list = Schools()
-        headers = {"Accept": "application/json"}
+    async def _municipalities(self) -> dict[str, int | None] | None:
+        """Return towns of municipality list with their school counts."""
 
         log.debug("Gathering list of towns ...")
         try:
-            towns_json = await self.send_unauth_request(EndPoint.SCHOOL_LIST, headers)
+            towns_json = await self.send_unauth_request(
+                EndPoint.SCHOOL_LIST, {"Accept": "application/json"}
+            )
         except Exception as exc:
             log.error(f"Error while gathering schools endpoints. {exc}")
             return None
@@ -204,71 +346,200 @@ class Bakalari:
             log.error("Invalid response format")
             return None
 
-        towns: list[Town] = [
-            {"name": name}
+        return {
+            name: count if isinstance(count := d.get("schoolCount"), int) else None
             for d in towns_json
             if isinstance(d, dict) and isinstance(name := d.get("name"), str)
-        ]
+        }
+
+    def _town_tasks(self, town_names: list[str]) -> list[asyncio.Task[tuple[str, Any]]]:
+        """Start fetches of towns' schools, tasks return (town, response).
+
+        Failed fetches return the exception as response.
+        """
 
-        if town:
-            if recursive:
-                towns = [t_element for t_element in towns if town in t_element["name"]]
-            else:
-                towns = [
-                    t_element
-                    for t_element in towns
-                    if t_element["name"].startswith(town)
-                ]
         semaphore = asyncio.Semaphore(self._school_concurrency)
-        tasks = []
+        headers = {"Accept": "application/json"}
 
-        async def fetch_town(town_name: str):
+        async def fetch_town(key: str, town_name: str) -> tuple[str, Any]:
             async with semaphore:
                 log.debug("Gathering schools for town: %s", town_name)
                 endpoint = f"{EndPoint.SCHOOL_LIST.endpoint}/{parse.quote(town_name)}"
-                return await self._api_client.request(
-                    endpoint, method=hdrs.METH_GET, headers=headers
-                )
-
-        for _town in towns:
-            town_name = _town.get("name")
-            if not town_name:
+                try:
+                    return key, await self._api_client.request(
+                        endpoint, method=hdrs.METH_GET, headers=headers
+                    )
+                except Exception as err:
+                    return key, err
+
+        tasks: list[asyncio.Task[tuple[str, Any]]] = []
+        for name in town_names:
+            if not name:
                 continue
-            if "." in town_name:
-                town_name = town_name[: town_name.find(".")]
+            town_name = name[: name.find(".")] if "." in name else name
+            tasks.append(
+                asyncio.create_task(fetch_town(name, town_name), name=town_name)
+            )
+        return tasks
 
-            tasks.append(asyncio.create_task(fetch_town(town_name), name=town_name))
+    async def _fetch_towns(self, town_names: list[str]) -> list[tuple[str, Any]]:
+        """Fetch schools of towns concurrently, return (town, response) pairs.
 
-        responses = await asyncio.gather(*tasks, return_exceptions=True)
+        Failed fetches are returned as exceptions.
+        """
 
-        for response_town in responses:
-            if isinstance(response_town, Exception):
-                log.error("Town fetch failed: %s", response_town)
-                continue
-            if not isinstance(response_town, dict):
-                log.error("Invalid town response: %r", type(response_town))
-                continue
+        return list(await asyncio.gather(*self._town_tasks(town_names)))
 
-            schools = response_town.get("schools")
-            if not isinstance(schools, list):
-                log.error(
-                    "Invalid schools payload for town %r", response_town.get("name")
-                )
-                continue
+    @staticmethod
+    def _town_schools(response_town: Any) -> tuple[str, list[tuple[str, str]]] | None:
+        """Return town name and (name, api point) of its schools from response."""
 
-            for _schools in schools:
-                if not isinstance(_schools, dict):
-                    continue
+        if isinstance(response_town, Exception):
+            log.error("Town fetch failed: %s", response_town)
+            return None
+        if not isinstance(response_town, dict):
+            log.error("Invalid town response: %r", type(response_town))
+            return None
+
+        schools = response_town.get("schools")
+        if not isinstance(schools, list):
+            log.error("Invalid schools payload for town %r", response_town.get("name"))
+            return None
+
+        return response_town.get("name", ""), [
+            (school.get("name", ""), school.get("schoolUrl", ""))
+            for school in schools
+            if isinstance(school, dict)
+        ]
+
+    async def schools_list(
+        self, town: str | None = None, recursive: bool = True
+    ) -> Schools | None:
+        """Return list of schools with their API points.
+
+        With `school_cache`, schools are served from the cache; stale or
+        changed towns are re-fetched in the background (towns never fetched
+        are fetched before returning). The background refresh is cancelled
+        on close, short-lived callers await :meth:`refresh_schools` when the
+        cache `needs_refresh()`.
+        """
+
+        if self._school_cache is not None:
+            return await self._cached_schools_list(self._school_cache, town, recursive)
+
+        towns = await self._municipalities()
+        if towns is None:
+            return None
+
+        _schools_list = Schools()
+        for _key, response in await self._fetch_towns(
+            select_towns(towns, town, recursive)
+        ):
+            if (parsed := self._town_schools(response)) is None:
+                continue
+            town_name, schools = parsed
+            for name, api_point in schools:
                 _schools_list.append_school(
-                    name=_schools.get("name", ""),
-                    api_point=_schools.get("schoolUrl", ""),
-                    town=response_town.get("name", ""),
+                    name=name, api_point=api_point, town=town_name
                 )
 
         self.schools = _schools_list
 
         return _schools_list
 
+    async def iter_schools(
+        self,
+        town: str | None = None,
+        recursive: bool = True,
+        *,
+        on_error: Callable[[str, Exception], Any] | None = None,
+    ) -> AsyncIterator[School]:
+        """Yield schools as responses of towns arrive.
+
+        Args:
+            town (str, optional): Town filter, same as :meth:`schools_list`.
+            recursive (bool, optional): Substring (True) or prefix town match.
+            on_error (Callable, optional): Called with town name and error of
+                every town which failed, such towns are skipped.
+
+        Raises `Ex.InvalidResponse` when the list of towns is unavailable.
+        Closing the generator (e.g. leaving ``async with
+        contextlib.aclosing(...)`` once a match is found) cancels fetches
+        still running.
+
+        """
+
+        towns = await self._municipalities()
+        if towns is None:
+            raise Ex.InvalidResponse("Unable to fetch list of towns.")
+
+        tasks = self._town_tasks(select_towns(towns, town, recursive))
+        try:
+            async for task in asyncio.as_completed(tasks):
+                key, response = await task
+                if isinstance(response, Exception):
+                    log.error(f"Town fetch failed: {response}")
+                    if on_error is not None:
+                        on_error(key, response)
+                    continue
+                if (parsed := self._town_schools(response)) is None:
+                    if on_error is not None:
+                        on_error(key, Ex.InvalidResponse("Invalid town response"))
+                    continue
+                town_name, schools = parsed
+                for name, api_point in schools:
+                    if name and api_point and town_name:
+                        yield School(name=name, api_point=api_point, town=town_name)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _cached_schools_list(
+        self, cache: SchoolDirectoryCache, town: str | None, recursive: bool
+    ) -> Schools | None:
+        await cache.load()
+        if not cache.towns or cache.missing_towns(cache.select(town, recursive)):
+            if await self.refresh_schools(town, recursive) is None:
+                return None
+        if cache.needs_refresh() and (
+            self._schools_refresh_task is None or self._schools_refresh_task.done()
+        ):
+            self._schools_refresh_task = asyncio.create_task(
+                self.refresh_schools(), name="bakalari-schools-refresh"
+            )
+        self.schools = cache.schools(town, recursive)
+        return self.schools
+
+    async def refresh_schools(
+        self, town: str | None = None, recursive: bool = True
+    ) -> Schools | None:
+        """Re-fetch stale and changed towns of `school_cache` and save it.
+
+        Returns cached schools matching filter, None if municipality list
+        could not be fetched. Refreshes run one at a time; towns which failed
+        are retried after `retry_after` of the cache.
+        """
+
+        cache = self._school_cache
+        if cache is None:
+            raise Ex.CacheError("School cache is not configured.")
+        async with self._schools_lock:
+            await cache.load()
+            if cache.list_stale():
+                if (towns := await self._municipalities()) is None:
+                    return None
+                cache.set_towns(towns)
+            stale = cache.stale_towns(cache.select(town, recursive))
+            log.debug(f"Refreshing {len(stale)} towns of school directory")
+            for key, response in await self._fetch_towns(stale):
+                if (parsed := self._town_schools(response)) is not None:
+                    cache.update_town(key, *parsed)
+                else:
+                    cache.mark_failed(key)
+            await cache.save()
+            return cache.schools(town, recursive)
+
     async def first_login(self, username: str, password: str) -> Credentials:
         """First login.
 
@@ -302,7 +573,7 @@ class Bakalari:
         log.info(f"Successfully logged in with username: {username}")
 
         if self._auto_cache_credentials:
-            self.save_credentials()
+            await self._schedule_credentials_save()
         return self.credentials
 
     async def refresh_access_token(self) -> Credentials:
@@ -336,10 +607,57 @@ class Bakalari:
                 self._credentials = Credentials.create(_credentials)
 
             if self._auto_cache_credentials:
-                self.save_credentials()
+                await self._schedule_credentials_save()
 
             return self.credentials
 
+    async def _ensure_fresh_token(self) -> None:
+        """Refresh access token ahead of its expiration.
+
+        Token close to expiration is refreshed in background while the current one
+        is still used. Already expired token is refreshed before the request to
+        avoid a 401 round-trip.
+        """
+
+        remaining = self.credentials.expires_in()
+        if (
+            remaining is None
+            or remaining > self._token_refresh_margin
+            or not self.credentials.refresh_token
+        ):
+            return
+
+        task = self._schedule_token_refresh()
+        if remaining <= 0:
+            await asyncio.shield(task)
+
+    def _schedule_token_refresh(self) -> asyncio.Task[None]:
+        """Start background token refresh unless one is already running."""
+
+        if self._token_refresh_task is None or self._token_refresh_task.done():
+            self._token_refresh_task = asyncio.create_task(
+                self._proactive_refresh(), name="bakalari-token-refresh"
+            )
+        return self._token_refresh_task
+
+    async def _proactive_refresh(self) -> None:
+        access_token = self.credentials.access_token
+        async with self._refresh_lock:
+            # Wait for refresh already in progress (e.g. after 401).
+            pass
+        if self.credentials.access_token != access_token:
+            return
+
+        log.debug(
+            "Refreshing access token ahead of expiration",
+            extra={"event": "token_refresh_proactive"},
+        )
+        try:
+            await self.refresh_access_token()
+        except APIException as err:
+            # Request falls back to refresh on 401.
+            log.warning(f"Proactive token refresh failed: {err}")
+
     def get_request_url(self, request_endpoint: EndPoint) -> str | Ex.BadEndpointUrl:
         """Get requested url from endpoint.
 
@@ -369,6 +687,7 @@ class Bakalari:
         """Save credentials to file in JSON format.
 
         If auto_save_credentials are enabled, parameters could be ommited.
+        Blocking, use :meth:`async_save_credentials` from async code.
         """
 
         filename = filename or self._cache_filename or None
@@ -377,15 +696,42 @@ class Bakalari:
                 log.error("Filename was not provided or cache filename was not set.")
                 return False
 
-            with open(filename, "wb") as file:
-                file.write(orjson.dumps(self.credentials, option=orjson.OPT_INDENT_2))
-                log.debug(f"Credentials saved to file {filename}")
+            write_atomic(filename, self._credentials_json())
+            log.debug(f"Credentials saved to file {filename}")
         except OSError as err:
             log.error(f"Error while saving credentials to file {filename}. {str(err)}")
             return False
 
         return True
 
+    async def async_save_credentials(self, filename: str | None = None) -> bool:
+        """Save credentials to file atomically without blocking event loop.
+
+        Without `filename`, credentials are saved to `credential_store` if set.
+        """
+
+        if not filename and self._credential_store and self._cache_filename:
+            await self._credential_store.save(self._cache_filename, self.credentials)
+            return True
+        filename = filename or self._cache_filename or None
+        if not filename:
+            log.error("Filename was not provided or cache filename was not set.")
+            return False
+        return await self._credential_writer.write(filename, self._credentials_json())
+
+    def _credentials_json(self) -> bytes:
+        return orjson.dumps(self.credentials, option=orjson.OPT_INDENT_2)
+
+    async def _schedule_credentials_save(self) -> None:
+        """Save auto-cached credentials later, outside of refresh lock."""
+
+        if self._credential_store and self._cache_filename:
+            await self._credential_store.save(self._cache_filename, self.credentials)
+        elif self._cache_filename:
+            self._credential_writer.schedule(
+                self._cache_filename, self._credentials_json()
+            )
+
     def load_credentials(self, filename: str) -> Credentials | bool:
         """Load credentials from file."""
 
@@ -400,9 +746,71 @@ class Bakalari:
             self._credentials = Credentials()
             return False
 
+    async def async_load_credentials(
+        self, filename: str | None = None
+    ) -> Credentials | bool:
+        """Load credentials from file without blocking event loop.
+
+        Without `filename`, credentials are loaded from `credential_store`
+        (or cache file).
+        """
+
+        if not filename and self._credential_store and self._cache_filename:
+            credentials = await self._credential_store.load(self._cache_filename)
+            if credentials is None:
+                self._credentials = Credentials()
+                return False
+            self._credentials = credentials
+            return self.credentials
+        filename = filename or self._cache_filename
+        if not filename:
+            log.error("Filename was not provided or cache filename was not set.")
+            return False
+        try:
+            async with aiofiles.open(filename, "rb") as file:
+                data = orjson.loads(await file.read())
+        except (OSError, orjson.JSONDecodeError):
+            log.error(f"Error while loading credentials from file {filename}")
+            self._credentials = Credentials()
+            return False
+        self._credentials = Credentials.create_from_json(data)
+        return self.credentials
+
+    def pool_stats(self) -> PoolStats | None:
+        """Return connection pool utilization of the underlying HTTP client."""
+
+        return self._api_client.pool_stats()
+
+    def breaker_states(self) -> dict[str, BreakerState]:
+        """Return circuit breaker state per server host."""
+
+        return self._api_client.breaker_states()
+
+    def rate_limit_wait_times(self) -> dict[str, float]:
+        """Return estimated rate limiter wait per server host in seconds."""
+
+        return self._api_client.rate_limit_wait_times()
+
+    @staticmethod
+    async def _cancel_task(task: asyncio.Task[Any] | None) -> None:
+        if task is not None and not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    async def _shutdown(self) -> None:
+        """Stop background work and write pending credentials."""
+
+        await self._cancel_task(self._token_refresh_task)
+        await self._cancel_task(self._schools_refresh_task)
+        if self._response_cache is not None:
+            await self._response_cache.cancel_refreshes(self._response_cache_keys)
+        await self._credential_writer.close()
+
     async def close(self) -> None:
         """Close the underlying HTTP client."""
 
+        await self._shutdown()
         await self._api_client.close()
 
     async def aclose(self) -> None:
@@ -419,4 +827,5 @@ class Bakalari:
     async def __aexit__(self, *_exc_info: object) -> None:
         """Async exit."""
 
+        await self._shutdown()
         await self._api_client.__aexit__(*_exc_info)
@@ -14,6 +14,8 @@ from .datastructure import Credentials, Schools
 from .komens import Komens, MessageContainer
 from .logger_api import configure_logging
 from .marks import Marks
+from .school_cache import SchoolDirectoryCache
+from .snapshot import SchoolSnapshot, is_snapshot, save_snapshot
 from .timetable import Timetable, TimetableContext
 
 log = logging.getLogger(__name__)
@@ -88,6 +90,15 @@ async def schools(args, bakalari: Bakalari):  # noqa: C901
             await w(args.schools_file, _schools.school_list)
         except Exception as ex:
             print(ex)
+    elif args.snapshot_file:
+        _schools = await bakalari.schools_list(
+            town=args.town, recursive=getattr(args, "recursive", True)
+        )
+        if not _schools:
+            print("Nepodařilo se načíst seznam škol.")
+            return
+        if not await save_snapshot(_schools, args.snapshot_file):
+            print("Nepodařilo se uložit snímek seznamu škol.")
 
 
 async def komens(args, bakalari):  # noqa: C901
@@ -384,22 +395,34 @@ async def runme(args):  # noqa: C901
 
     if args.sf and not server:
         try:
-            schools_data = await Schools().load_from_file(args.sf)
+            if is_snapshot(args.sf):
+                schools_data = SchoolSnapshot.open(args.sf)
+            else:
+                schools_data = await Schools().load_from_file(args.sf)
         except Exception:
             sys.exit(1)
 
     school = args.school
     if school and not server:
         if not schools_data:
-            async with Bakalari() as _bak:
+            school_cache = (
+                SchoolDirectoryCache(args.school_cache)
+                if getattr(args, "school_cache", None)
+                else None
+            )
+            async with Bakalari(school_cache=school_cache) as _bak:
                 schools_res = await _bak.schools_list(
                     town=args.town, recursive=getattr(args, "recursive", True)
                 )
+                # Background refresh would be cancelled on exit, refresh now
+                # so the next run starts from an up-to-date cache.
+                if school_cache is not None and school_cache.needs_refresh():
+                    await _bak.refresh_schools()
             if not schools_res:
                 print("Nepodařilo se načíst seznam škol.")
                 return
             schools_data = schools_res
-        if isinstance(schools_data, Schools):
+        if isinstance(schools_data, Schools | SchoolSnapshot):
             server_candidate = schools_data.get_url(school)
         if not isinstance(server_candidate, str):
             print("Škola nebyla nalezena nebo není jednoznačná.")
@@ -546,6 +569,14 @@ def main() -> None:
         dest="schools_file",
         help="Uloží seznam škol do souboru.",
     )
+    action_school.add_argument(
+        "-ss",
+        "--save_snapshot",
+        nargs=None,
+        metavar="Jméno souboru",
+        dest="snapshot_file",
+        help="Uloží seznam škol do binárního snímku (rychlé načtení přes --sf).",
+    )
     action_school.set_defaults(func=schools)
 
     # Globální volby rekurzivního (podřetězcového) filtrování názvu města/školy
@@ -589,6 +620,14 @@ def main() -> None:
         help="Načte seznam škol ze zadaného souboru (formát JSON)",
     )
 
+    parser.add_argument(
+        "-sc",
+        "--school_cache",
+        nargs=None,
+        metavar="SOUBOR.json",
+        help="Průběžně aktualizovaná mezipaměť seznamu škol pro vyhledání školy",
+    )
+
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="Zapne podrobné logování"
     )
@@ -0,0 +1,237 @@
+"""Per-server circuit breaker."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+import time
+
+from strenum import StrEnum
+
+from .metrics import NOOP_METRICS, Metrics
+
+log = logging.getLogger(__name__)
+
+
+class BreakerState(StrEnum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True, slots=True)
+class CircuitBreakerConfig:
+    """Circuit breaker settings.
+
+    Attributes:
+        failure_rate_threshold: Failure ratio in the window which opens the circuit.
+        minimum_calls: Calls needed in the window before failure rate is evaluated.
+        window_size: Number of most recent calls in the rolling window.
+        cooldown: Seconds the circuit stays open before trial calls are allowed.
+        half_open_max_calls: Concurrent trial calls allowed in half-open state.
+
+    """
+
+    failure_rate_threshold: float = 0.5
+    minimum_calls: int = 5
+    window_size: int = 20
+    cooldown: float = 30.0
+    half_open_max_calls: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class BreakerStats:
+    """Circuit breaker state snapshot."""
+
+    host: str
+    state: BreakerState
+    failure_rate: float
+    calls: int
+    opened_count: int
+
+
+class CircuitBreaker:
+    """Circuit breaker of one server host.
+
+    State transitions are logged and counted in `metrics` as
+    ``bakalari_circuit_breaker_transitions_total`` (labels host, from, to).
+    """
+
+    def __init__(
+        self,
+        host: str,
+        config: CircuitBreakerConfig | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        *,
+        metrics: Metrics = NOOP_METRICS,
+    ) -> None:
+        """Create closed circuit breaker for host."""
+
+        self.host: str = host
+        self.metrics: Metrics = metrics
+        self._config: CircuitBreakerConfig = config or CircuitBreakerConfig()
+        self._clock = clock
+        self._state: BreakerState = BreakerState.CLOSED
+        self._window: deque[bool] = deque(maxlen=max(1, self._config.window_size))
+        self._opened_at: float = 0.0
+        self._opened_count: int = 0
+        self._trial_calls: int = 0
+
+    @property
+    def state(self) -> BreakerState:
+        """Return current state; open circuit turns half-open after cool-down."""
+
+        if (
+            self._state is BreakerState.OPEN
+            and self._clock() - self._opened_at >= self._config.cooldown
+        ):
+            self._transition(BreakerState.HALF_OPEN)
+        return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        """Return failure ratio of calls in the rolling window."""
+
+        if not self._window:
+            return 0.0
+        return self._window.count(False) / len(self._window)
+
+    def allow(self) -> bool:
+        """Return True if request may be sent."""
+
+        match self.state:
+            case BreakerState.CLOSED:
+                return True
+            case BreakerState.HALF_OPEN:
+                if self._trial_calls < self._config.half_open_max_calls:
+                    self._trial_calls += 1
+                    return True
+                return False
+            case _:
+                return False
+
+    def retry_in(self) -> float:
+        """Return seconds until open circuit allows trial calls."""
+
+        if self.state is not BreakerState.OPEN:
+            return 0.0
+        return max(0.0, self._config.cooldown - (self._clock() - self._opened_at))
+
+    def record_success(self) -> None:
+        """Record call answered by server."""
+
+        if self.state is BreakerState.HALF_OPEN:
+            self._window.clear()
+            self._transition(BreakerState.CLOSED)
+        self._window.append(True)
+
+    def record_failure(self) -> None:
+        """Record failed call (timeout, connection error, server unavailable)."""
+
+        state = self.state
+        self._window.append(False)
+        if state is BreakerState.HALF_OPEN or (
+            state is BreakerState.CLOSED
+            and len(self._window) >= self._config.minimum_calls
+            and self.failure_rate >= self._config.failure_rate_threshold
+        ):
+            self._open()
+
+    def record_ignored(self) -> None:
+        """Release trial call which ended without outcome (e.g. cancelled)."""
+
+        if self._state is BreakerState.HALF_OPEN and self._trial_calls:
+            self._trial_calls -= 1
+
+    def stats(self) -> BreakerStats:
+        """Return state snapshot."""
+
+        return BreakerStats(
+            host=self.host,
+            state=self.state,
+            failure_rate=self.failure_rate,
+            calls=len(self._window),
+            opened_count=self._opened_count,
+        )
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._opened_count += 1
+        self._transition(BreakerState.OPEN)
+
+    def _transition(self, state: BreakerState) -> None:
+        if state is self._state:
+            return
+        log.warning(
+            f"Circuit breaker for {self.host}: {self._state} -> {state}",
+            extra={"event": "circuit_breaker", "url": self.host},
+        )
+        if self.metrics.enabled:
+            self.metrics.inc(
+                "bakalari_circuit_breaker_transitions_total",
+                {"host": self.host, "from": self._state, "to": state},
+            )
+        self._state = state
+        self._trial_calls = 0
+
+
+class CircuitBreakerRegistry:
+    """Circuit breakers keyed by server host.
+
+    One registry may be shared by many clients, so a dead school server
+    is detected once for all accounts of that school.
+    """
+
+    def __init__(
+        self,
+        config: CircuitBreakerConfig | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        *,
+        metrics: Metrics = NOOP_METRICS,
+    ) -> None:
+        """Create registry; breakers use `config` settings.
+
+        Without `metrics`, the registry reports to metrics of the first
+        :class:`ApiClient` using it which has metrics configured.
+        """
+
+        self._config: CircuitBreakerConfig = config or CircuitBreakerConfig()
+        self._clock = clock
+        self._metrics: Metrics = metrics
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    @property
+    def metrics(self) -> Metrics:
+        """Return sink of state transitions."""
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: Metrics) -> None:
+        """Report transitions of all breakers to `metrics`."""
+
+        self._metrics = metrics
+        for breaker in self._breakers.values():
+            breaker.metrics = metrics
+
+    def get(self, host: str) -> CircuitBreaker:
+        """Return breaker for host, create it when missing."""
+
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                host, self._config, self._clock, metrics=self._metrics
+            )
+            self._breakers[host] = breaker
+        return breaker
+
+    def states(self) -> dict[str, BreakerState]:
+        """Return state of all breakers by host."""
+        return {host: breaker.state for host, breaker in self._breakers.items()}
+
+    def stats(self) -> list[BreakerStats]:
+        """Return snapshots of all breakers."""
+        return [breaker.stats() for breaker in self._breakers.values()]
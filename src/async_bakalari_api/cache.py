@@ -0,0 +1,380 @@
+"""Response caching helpers for the Bakalari API client."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from contextlib import suppress
+from dataclasses import dataclass
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Protocol
+
+import aiofiles
+import aiofiles.os
+from aiohttp import hdrs
+import orjson
+
+from .const import EndPoint
+from .persistence import write_atomic
+
+log = logging.getLogger(__name__)
+
+ValidatorKey = tuple[str, str, tuple[tuple[str, str], ...], str]
+
+
+def normalize_params(params: Any) -> tuple[tuple[str, str], ...]:
+    """Return hashable, order independent representation of query params."""
+
+    if not params:
+        return ()
+    items = params.items() if isinstance(params, Mapping) else params
+    return tuple(sorted((str(k), str(v)) for k, v in items))
+
+
+@dataclass(slots=True, frozen=True)
+class ValidatorEntry:
+    """HTTP validators and parsed payload of one cached response."""
+
+    etag: str | None
+    last_modified: str | None
+    payload: Any
+
+
+class ValidatorCache:
+    """Conditional-request cache based on `ETag` / `Last-Modified` validators.
+
+    Stores validators together with already parsed payload per
+    (method, url, params, owner). When the server answers `304 Not Modified`,
+    the stored payload is handed back without downloading and decoding the body.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        """Create validator cache holding at most `max_entries` responses."""
+
+        self._max_entries: int = max(1, int(max_entries))
+        self._entries: OrderedDict[ValidatorKey, ValidatorEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return number of cached responses."""
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(
+        method: str, url: str, params: Any = None, owner: str | None = None
+    ) -> ValidatorKey:
+        """Build cache key for request."""
+
+        return (method.upper(), url, normalize_params(params), owner or "")
+
+    def get(self, key: ValidatorKey) -> ValidatorEntry | None:
+        """Return cached entry for key and mark it as recently used."""
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def conditional_headers(self, key: ValidatorKey) -> dict[str, str]:
+        """Return `If-None-Match` / `If-Modified-Since` headers for key."""
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return {}
+
+        headers: dict[str, str] = {}
+        if entry.etag:
+            headers[hdrs.IF_NONE_MATCH] = entry.etag
+        if entry.last_modified:
+            headers[hdrs.IF_MODIFIED_SINCE] = entry.last_modified
+        return headers
+
+    def store(
+        self, key: ValidatorKey, response_headers: Mapping[str, str], payload: Any
+    ) -> bool:
+        """Store payload if the response carries any validator.
+
+        Returns True when entry was stored.
+        """
+
+        etag = response_headers.get(hdrs.ETAG)
+        last_modified = response_headers.get(hdrs.LAST_MODIFIED)
+        if not etag and not last_modified:
+            self._entries.pop(key, None)
+            return False
+
+        self._entries[key] = ValidatorEntry(
+            etag=etag, last_modified=last_modified, payload=payload
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, key: ValidatorKey) -> None:
+        """Drop cached entry for key."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._entries.clear()
+
+
+@dataclass(slots=True, frozen=True)
+class CacheEntry:
+    """Cached response payload with its expiration time (unix timestamp)."""
+
+    value: Any
+    stored_at: float
+    expires_at: float
+
+    def is_fresh(self, now: float) -> bool:
+        """Return True if entry did not expire yet."""
+        return now < self.expires_at
+
+
+class CacheBackend(Protocol):
+    """Storage used by :class:`ResponseCache`."""
+
+    async def get(self, key: str) -> CacheEntry | None:
+        """Return entry for key or None."""
+        ...
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        """Store entry under key."""
+        ...
+
+    async def delete(self, key: str) -> None:
+        """Remove entry for key."""
+        ...
+
+    async def clear(self) -> None:
+        """Remove all entries."""
+        ...
+
+
+class MemoryCacheBackend:
+    """In-memory LRU backend bounded by number of entries."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        """Create in-memory backend holding at most `max_entries` entries."""
+
+        self._max_entries: int = max(1, int(max_entries))
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return number of cached entries."""
+        return len(self._entries)
+
+    async def get(self, key: str) -> CacheEntry | None:
+        """Return entry for key and mark it as recently used."""
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        """Store entry and evict least recently used entries over the limit."""
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        """Remove entry for key."""
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+
+class DiskCacheBackend:
+    """On-disk backend storing one JSON file per entry in `directory`.
+
+    Only JSON serializable payloads can be stored, other values are skipped.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Create on-disk backend in `directory` (created if missing)."""
+
+        self._directory: str = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self._directory, f"{digest}.json")
+
+    async def get(self, key: str) -> CacheEntry | None:
+        """Load entry for key from disk."""
+
+        try:
+            async with aiofiles.open(self._path(key), "rb") as file:
+                data = orjson.loads(await file.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as err:
+            log.warning(f"Unable to read cache entry for {key}: {err}")
+            return None
+
+        if data.get("key") != key:
+            return None
+        return CacheEntry(
+            value=data.get("value"),
+            stored_at=float(data.get("stored_at", 0)),
+            expires_at=float(data.get("expires_at", 0)),
+        )
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        """Write entry to disk atomically."""
+
+        path = self._path(key)
+        try:
+            data = orjson.dumps(
+                {
+                    "key": key,
+                    "value": entry.value,
+                    "stored_at": entry.stored_at,
+                    "expires_at": entry.expires_at,
+                }
+            )
+        except TypeError as err:
+            log.debug(f"Cache entry for {key} is not JSON serializable: {err}")
+            return
+
+        try:
+            # Unique temp file per write, concurrent misses of one key never
+            # publish a partial entry.
+            await asyncio.get_running_loop().run_in_executor(
+                None, write_atomic, path, data
+            )
+        except OSError as err:
+            log.warning(f"Unable to write cache entry for {key}: {err}")
+
+    async def delete(self, key: str) -> None:
+        """Remove entry file for key."""
+
+        with suppress(FileNotFoundError):
+            await aiofiles.os.remove(self._path(key))
+
+    async def clear(self) -> None:
+        """Remove all entry files from directory."""
+
+        for name in await aiofiles.os.listdir(self._directory):
+            if name.endswith(".json"):
+                with suppress(FileNotFoundError):
+                    await aiofiles.os.remove(os.path.join(self._directory, name))
+
+
+class ResponseCache:
+    """TTL response cache for authorized requests with stale-while-revalidate.
+
+    TTL is taken from :attr:`EndPoint.ttl` unless overridden by `ttl_overrides`.
+    Entries older than TTL, but younger than TTL + `stale_while_revalidate`,
+    are returned immediately while a refresh runs in the background.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        *,
+        ttl_overrides: Mapping[EndPoint, float] | None = None,
+        stale_while_revalidate: float = 0.0,
+    ) -> None:
+        """Create response cache.
+
+        Args:
+            backend (CacheBackend, optional): Storage backend. Defaults to in-memory LRU.
+            ttl_overrides (Mapping[EndPoint, float], optional): Per endpoint TTL in seconds.
+            stale_while_revalidate (float, optional): Seconds a stale entry may be
+                served while it is refreshed in background. Defaults to 0 (disabled).
+
+        """
+
+        self.backend: CacheBackend = (
+            backend if backend is not None else MemoryCacheBackend()
+        )
+        self._ttl_overrides: dict[EndPoint, float] = dict(ttl_overrides or {})
+        self._stale_while_revalidate: float = max(0.0, stale_while_revalidate)
+        self._refreshing: dict[str, asyncio.Task[Any]] = {}
+
+    def ttl_for(self, endpoint: EndPoint) -> float:
+        """Return TTL in seconds for endpoint (0 = do not cache)."""
+        return self._ttl_overrides.get(endpoint, endpoint.ttl)
+
+    @staticmethod
+    def make_key(endpoint: EndPoint, url: str, owner: str, params: Any = None) -> str:
+        """Build cache key for request of `owner` to resolved `url`."""
+
+        query = "&".join(f"{k}={v}" for k, v in normalize_params(params))
+        return f"{owner}|{endpoint.name}|{url}|{query}"
+
+    async def get_or_fetch(
+        self, key: str, ttl: float, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return cached value for key or fetch, store and return a fresh one."""
+
+        now = time.time()
+        entry = await self.backend.get(key)
+        if entry is not None:
+            if entry.is_fresh(now):
+                return entry.value
+            if now < entry.expires_at + self._stale_while_revalidate:
+                self._schedule_refresh(key, ttl, fetch)
+                return entry.value
+
+        return await self._fetch_and_store(key, ttl, fetch)
+
+    async def _fetch_and_store(
+        self, key: str, ttl: float, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        value = await fetch()
+        now = time.time()
+        await self.backend.set(
+            key, CacheEntry(value=value, stored_at=now, expires_at=now + ttl)
+        )
+        return value
+
+    def _schedule_refresh(
+        self, key: str, ttl: float, fetch: Callable[[], Awaitable[Any]]
+    ) -> None:
+        if key in self._refreshing:
+            return
+
+        task = asyncio.create_task(
+            self._fetch_and_store(key, ttl, fetch), name=f"cache-refresh:{key}"
+        )
+        self._refreshing[key] = task
+
+        def _done(done: asyncio.Task[Any]) -> None:
+            self._refreshing.pop(key, None)
+            if not done.cancelled() and (err := done.exception()) is not None:
+                log.warning(f"Background refresh of {key} failed: {err}")
+
+        task.add_done_callback(_done)
+
+    async def invalidate(self, key: str) -> None:
+        """Drop cached value for key."""
+        await self.backend.delete(key)
+
+    async def clear(self) -> None:
+        """Drop all cached values."""
+        await self.backend.clear()
+
+    async def cancel_refreshes(self, keys: Iterable[str]) -> None:
+        """Cancel running background refreshes of `keys`."""
+
+        tasks = [task for key in keys if (task := self._refreshing.get(key))]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Cancel all running background refreshes."""
+
+        await self.cancel_refreshes(list(self._refreshing))
@@ -0,0 +1,368 @@
+"""Record/replay transport for offline benchmarks and deterministic tests."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Generator, Iterable
+from dataclasses import dataclass
+import hashlib
+import logging
+import os
+import random
+import time
+from types import TracebackType
+from typing import Any, Self
+from urllib import parse
+
+import aiofiles
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+import orjson
+from strenum import StrEnum
+
+from .cache import normalize_params
+from .exceptions import Ex
+
+log = logging.getLogger(__name__)
+
+# Body is stored decoded, transfer related headers would be wrong on replay.
+_SKIPPED_HEADERS = frozenset(
+    {"content-encoding", "content-length", "transfer-encoding"}
+)
+
+InteractionKey = tuple[str, str, tuple[tuple[str, str], ...], str | None]
+LatencyModel = Callable[["Interaction"], float]
+
+
+class CassetteMode(StrEnum):
+    """Cassette transport modes."""
+
+    LIVE = "live"
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+def recorded_latency(scale: float = 1.0) -> LatencyModel:
+    """Replay with recorded latency multiplied by `scale`."""
+    return lambda interaction: interaction.latency_ms * scale / 1000
+
+
+def uniform_latency(low_ms: float, high_ms: float) -> LatencyModel:
+    """Replay with latency drawn uniformly from range."""
+    return lambda _interaction: random.uniform(low_ms, high_ms) / 1000
+
+
+def lognormal_latency(median_ms: float, sigma: float = 0.5) -> LatencyModel:
+    """Replay with long-tailed latency typical of real servers."""
+    return lambda _interaction: random.lognormvariate(0, sigma) * median_ms / 1000
+
+
+def _body_digest(kwargs: dict[str, Any]) -> str | None:
+    """Return digest of request body; bodies (passwords) are never stored."""
+
+    if kwargs.get("json") is not None:
+        raw = orjson.dumps(kwargs["json"], option=orjson.OPT_SORT_KEYS)
+    elif (data := kwargs.get("data")) is not None:
+        if isinstance(data, dict):
+            data = parse.urlencode(sorted(data.items()))
+        raw = data if isinstance(data, bytes) else str(data).encode()
+    else:
+        return None
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def _request_key(method: str, url: str, kwargs: dict[str, Any]) -> InteractionKey:
+    return (
+        method.upper(),
+        url,
+        normalize_params(kwargs.get("params")),
+        _body_digest(kwargs),
+    )
+
+
+@dataclass(slots=True)
+class Interaction:
+    """Recorded request/response pair."""
+
+    method: str
+    url: str
+    params: tuple[tuple[str, str], ...]
+    body_digest: str | None
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+    latency_ms: float = 0.0
+
+    @property
+    def key(self) -> InteractionKey:
+        """Return request matching key."""
+        return (self.method, self.url, self.params, self.body_digest)
+
+    def to_json(self) -> dict[str, Any]:
+        """Return JSON serializable dict; binary bodies are base64 encoded."""
+
+        data: dict[str, Any] = {
+            "method": self.method,
+            "url": self.url,
+            "params": self.params,
+            "body_digest": self.body_digest,
+            "status": self.status,
+            "headers": self.headers,
+            "latency_ms": round(self.latency_ms, 3),
+        }
+        try:
+            data["body"] = self.body.decode()
+        except UnicodeDecodeError:
+            data["body_b64"] = base64.b64encode(self.body).decode()
+        return data
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> Self:
+        """Create interaction from dict written by :meth:`to_json`."""
+
+        if "body_b64" in data:
+            body = base64.b64decode(data["body_b64"])
+        else:
+            body = str(data.get("body", "")).encode()
+        return cls(
+            method=data["method"],
+            url=data["url"],
+            params=tuple((str(k), str(v)) for k, v in data.get("params", ())),
+            body_digest=data.get("body_digest"),
+            status=int(data["status"]),
+            headers=[(k, v) for k, v in data.get("headers", [])],
+            body=body,
+            latency_ms=float(data.get("latency_ms", 0.0)),
+        )
+
+
+class _ReplayContent:
+    """Minimal stand-in of :class:`aiohttp.StreamReader`."""
+
+    def __init__(self, body: bytes) -> None:
+        self._body = body
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        for i in range(0, len(self._body), n):
+            yield self._body[i : i + n]
+
+
+class ReplayResponse:
+    """Response served from cassette, compatible with what ApiClient reads."""
+
+    def __init__(self, interaction: Interaction) -> None:
+        """Create response of recorded interaction."""
+
+        self.method: str = interaction.method
+        self.url: str = interaction.url
+        self.status: int = interaction.status
+        self.headers: CIMultiDictProxy[str] = CIMultiDictProxy(
+            CIMultiDict(interaction.headers)
+        )
+        self.content: _ReplayContent = _ReplayContent(interaction.body)
+        self._body: bytes = interaction.body
+        mimetype, _, options = self.headers.get(
+            aiohttp.hdrs.CONTENT_TYPE, "application/octet-stream"
+        ).partition(";")
+        self.content_type: str = mimetype.strip().lower()
+        self.charset: str | None = None
+        for option in options.split(";"):
+            name, _, value = option.partition("=")
+            if name.strip().lower() == "charset":
+                self.charset = value.strip().strip('"')
+
+    @property
+    def content_length(self) -> int:
+        """Return body size."""
+        return len(self._body)
+
+    async def read(self) -> bytes:
+        """Return body."""
+        return self._body
+
+    def release(self) -> None:
+        """Nothing to release."""
+
+    async def __aenter__(self) -> Self:
+        """Enter response context."""
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Exit response context."""
+
+
+class _RequestContext:
+    """Awaitable and async context manager, like aiohttp request result."""
+
+    def __init__(self, coro: Awaitable[ReplayResponse]) -> None:
+        self._coro = coro
+
+    def __await__(self) -> Generator[Any, None, ReplayResponse]:
+        return self._coro.__await__()
+
+    async def __aenter__(self) -> ReplayResponse:
+        return await self._coro
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        return None
+
+
+class CassetteSession:
+    """Session-like object recording through or replaying from cassette."""
+
+    closed: bool = False
+    connector: None = None
+
+    def __init__(
+        self, cassette: Cassette, session: aiohttp.ClientSession | None = None
+    ) -> None:
+        """Replay from cassette, or record requests sent through `session`."""
+
+        self._cassette = cassette
+        self._session = session
+
+    def request(self, method: str, url: str, **kwargs: Any) -> _RequestContext:
+        """Send (record) or serve (replay) request."""
+
+        if self._session is None:
+            return _RequestContext(self._cassette.replay(method, url, kwargs))
+        return _RequestContext(self._record(self._session, method, url, kwargs))
+
+    async def _record(
+        self,
+        session: aiohttp.ClientSession,
+        method: str,
+        url: str,
+        kwargs: dict[str, Any],
+    ) -> ReplayResponse:
+        start = time.perf_counter()
+        async with session.request(method, url, **kwargs) as response:
+            body = await response.read()
+            headers = [
+                (k, v)
+                for k, v in response.headers.items()
+                if k.lower() not in _SKIPPED_HEADERS
+            ]
+            status = response.status
+        key = _request_key(method, url, kwargs)
+        interaction = Interaction(
+            method=key[0],
+            url=url,
+            params=key[2],
+            body_digest=key[3],
+            status=status,
+            headers=headers,
+            body=body,
+            latency_ms=(time.perf_counter() - start) * 1000,
+        )
+        await self._cassette.append(interaction)
+        return ReplayResponse(interaction)
+
+
+class Cassette:
+    """Recorded interactions stored as JSONL.
+
+    `path` is a ``.jsonl`` file, or a directory holding one file per host.
+    Request bodies are stored only as digest, but response bodies are stored
+    as received - recordings of login responses contain tokens.
+
+    In replay mode interactions with the same request are served in recorded
+    order, the last one is repeated when exhausted.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        mode: CassetteMode = CassetteMode.REPLAY,
+        *,
+        latency: LatencyModel | None = None,
+    ) -> None:
+        """Create cassette.
+
+        Args:
+            path (str): JSONL file or directory of cassette.
+            mode (CassetteMode, optional): Transport mode. Defaults to replay.
+            latency (Callable, optional): Simulated latency in seconds per replayed
+                interaction, e.g. :func:`recorded_latency`. Defaults to None.
+
+        """
+
+        self.path: str = os.fspath(path)
+        self.mode: CassetteMode = CassetteMode(mode)
+        self._latency: LatencyModel | None = latency
+        self._interactions: dict[InteractionKey, deque[Interaction]] = {}
+        self._loaded: bool = False
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        """Return number of loaded interactions."""
+        return sum(len(items) for items in self._interactions.values())
+
+    def session(self, session: aiohttp.ClientSession | None = None) -> CassetteSession:
+        """Return session replaying, or recording through `session`."""
+        return CassetteSession(self, session)
+
+    def _files(self) -> Iterable[str]:
+        if os.path.isdir(self.path):
+            return sorted(
+                os.path.join(self.path, name)
+                for name in os.listdir(self.path)
+                if name.endswith(".jsonl")
+            )
+        return [self.path] if os.path.exists(self.path) else []
+
+    def _file_for(self, url: str) -> str:
+        if self.path.endswith(".jsonl"):
+            return self.path
+        host = parse.urlsplit(url).hostname or "default"
+        return os.path.join(self.path, f"{host}.jsonl")
+
+    def _add(self, interaction: Interaction) -> None:
+        self._interactions.setdefault(interaction.key, deque()).append(interaction)
+
+    async def load(self) -> None:
+        """Load interactions from disk."""
+
+        async with self._lock:
+            if self._loaded:
+                return
+            for filename in self._files():
+                async with aiofiles.open(filename, "rb") as file:
+                    async for line in file:
+                        if line.strip():
+                            self._add(Interaction.from_json(orjson.loads(line)))
+            self._loaded = True
+            log.debug(f"Loaded {len(self)} interactions from cassette {self.path}")
+
+    async def append(self, interaction: Interaction) -> None:
+        """Store recorded interaction and append it to cassette file."""
+
+        filename = self._file_for(interaction.url)
+        async with self._lock:
+            self._add(interaction)
+            if directory := os.path.dirname(filename):
+                os.makedirs(directory, exist_ok=True)
+            async with aiofiles.open(filename, "ab") as file:
+                await file.write(orjson.dumps(interaction.to_json()) + b"\n")
+
+    async def replay(
+        self, method: str, url: str, kwargs: dict[str, Any]
+    ) -> ReplayResponse:
+        """Return recorded response of request."""
+
+        if not self._loaded:
+            await self.load()
+        items = self._interactions.get(_request_key(method, url, kwargs))
+        if not items:
+            raise Ex.ReplayMiss(f"No recorded response for {method.upper()} {url}")
+        interaction = items.popleft() if len(items) > 1 else items[0]
+        if self._latency is not None:
+            await asyncio.sleep(max(0.0, self._latency(interaction)))
+        return ReplayResponse(interaction)
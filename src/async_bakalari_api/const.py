@@ -27,19 +27,22 @@ class Errors(StrEnum):
 class EndPoint(Enum):
     """List of endpoints."""
 
-    VERSION = {"endpoint": "/api", "method": "get"}
+    VERSION = {"endpoint": "/api", "method": "get", "ttl": 3600}
     LOGIN = {"endpoint": "/api/login", "method": "post"}
     SCHOOL_LIST = {
         "endpoint": "https://sluzby.bakalari.cz/api/v1/municipality",
         "method": "get",
+        "ttl": 86400,
     }
     KOMENS_UNREAD = {
         "endpoint": "/api/3/komens/messages/received",
         "method": "post",
+        "ttl": 60,
     }
     KOMENS_UNREAD_COUNT = {
         "endpoint": "/api/3/komens/messages/received/unread",
         "method": "get",
+        "ttl": 30,
     }
     KOMENS_ATTACHMENT = {
         "endpoint": "/api/3/komens/attachment",
@@ -54,16 +57,19 @@ class EndPoint(Enum):
     KOMENS_GET_SINGLE_MESSAGE = {
         "endpoint": "/api/3/komens/messages/received",
         "method": "get",
+        "ttl": 60,
     }
 
     NOTICEBOARD_ALL = {
         "endpoint": "/api/3/komens/messages/noticeboard",
         "method": "post",
+        "ttl": 300,
     }
 
     MARKS = {
         "endpoint": "/api/3/marks",
         "method": "get",
+        "ttl": 300,
     }
     SIGN_MARKS = {
         "endpoint": "/api/3/marks/SetClassificationConfirmation",
@@ -72,10 +78,12 @@ class EndPoint(Enum):
     TIMETABLE_ACTUAL = {
         "endpoint": "/api/3/timetable/actual",
         "method": "get",
+        "ttl": 300,
     }
     TIMETABLE_PERMANENT = {
         "endpoint": "/api/3/timetable/permanent",
         "method": "get",
+        "ttl": 86400,
     }
 
     def get(self, key: str) -> Any:
@@ -96,6 +104,11 @@ class EndPoint(Enum):
         """Method property."""
         return self.get("method")
 
+    @property
+    def ttl(self) -> float:
+        """Default response cache TTL in seconds (0 = not cacheable)."""
+        return float(self.value.get("ttl", 0))
+
 
 class Token(StrEnum):
     """Token."""
@@ -104,3 +117,4 @@ class Token(StrEnum):
     ACCESS_TOKEN = "access_token"
     REFRESH_TOKEN = "refresh_token"
     USERNAME = "username"
+    EXPIRES_IN = "expires_in"
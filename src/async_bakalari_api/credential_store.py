@@ -0,0 +1,298 @@
+"""Pluggable stores of account credentials."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Protocol
+
+import aiofiles
+import aiofiles.os
+import orjson
+
+from .datastructure import Credentials
+from .persistence import CredentialWriter
+
+log = logging.getLogger(__name__)
+
+
+class CredentialStore(Protocol):
+    """Storage of credentials by key (account id, cache file name ...)."""
+
+    async def load(self, key: str) -> Credentials | None:
+        """Return stored credentials or None."""
+        ...
+
+    async def save(self, key: str, credentials: Credentials) -> None:
+        """Store credentials, the write may be deferred until :meth:`close`."""
+        ...
+
+    async def delete(self, key: str) -> None:
+        """Remove credentials."""
+        ...
+
+    async def load_all(self) -> dict[str, Credentials]:
+        """Return all stored credentials by key."""
+        ...
+
+    async def close(self) -> None:
+        """Write deferred changes and release resources."""
+        ...
+
+
+def _dumps(credentials: Credentials) -> bytes:
+    return orjson.dumps(credentials, option=orjson.OPT_INDENT_2)
+
+
+def _loads(data: bytes) -> Credentials:
+    return Credentials.create_from_json(orjson.loads(data))
+
+
+class FileCredentialStore:
+    """One JSON file per key, in the format of :meth:`Bakalari.save_credentials`.
+
+    The key is the file name, relative to `directory` when given. Writes are
+    atomic and debounced by a :class:`CredentialWriter`.
+    """
+
+    def __init__(
+        self, directory: str | None = None, *, writer: CredentialWriter | None = None
+    ) -> None:
+        """Create store of files in `directory` (None = keys are paths)."""
+
+        self._directory: str | None = directory
+        self._writer: CredentialWriter = writer or CredentialWriter()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key) if self._directory else key
+
+    async def load(self, key: str) -> Credentials | None:
+        """Return credentials from file, None if missing or invalid."""
+
+        path = self._path(key)
+        data = self._writer.peek(path)
+        try:
+            if data is None:
+                async with aiofiles.open(path, "rb") as file:
+                    data = await file.read()
+            return _loads(data)
+        except (OSError, orjson.JSONDecodeError, KeyError):
+            log.error(f"Error while loading credentials from file {path}")
+            return None
+
+    async def save(self, key: str, credentials: Credentials) -> None:
+        """Schedule atomic write of credentials file."""
+
+        self._writer.schedule(self._path(key), _dumps(credentials))
+
+    async def delete(self, key: str) -> None:
+        """Remove credentials file."""
+
+        path = self._path(key)
+        self._writer.discard(path)
+        with suppress(FileNotFoundError):
+            await aiofiles.os.remove(path)
+
+    async def load_all(self) -> dict[str, Credentials]:
+        """Return credentials of all `*.json` files in directory."""
+
+        if not self._directory:
+            raise ValueError("Loading all credentials requires a directory.")
+        result: dict[str, Credentials] = {}
+        for name in await aiofiles.os.listdir(self._directory):
+            if name.endswith(".json") and not name.startswith("."):
+                if (credentials := await self.load(name)) is not None:
+                    result[name] = credentials
+        return result
+
+    async def flush(self) -> bool:
+        """Write pending files now."""
+        return await self._writer.flush()
+
+    async def close(self) -> None:
+        """Write pending files."""
+        await self._writer.close()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS credentials (
+    key TEXT PRIMARY KEY,
+    username TEXT,
+    access_token TEXT,
+    refresh_token TEXT,
+    user_id TEXT,
+    expires_at REAL,
+    updated_at REAL NOT NULL
+)
+"""
+_COLUMNS = ("username", "access_token", "refresh_token", "user_id", "expires_at")
+_UPSERT = """
+INSERT INTO credentials
+    (key, username, access_token, refresh_token, user_id, expires_at, updated_at)
+VALUES (
+    :key, :username, :access_token, :refresh_token, :user_id, :expires_at,
+    :updated_at
+)
+ON CONFLICT (key) DO UPDATE SET
+    username = excluded.username,
+    access_token = excluded.access_token,
+    refresh_token = excluded.refresh_token,
+    user_id = excluded.user_id,
+    expires_at = excluded.expires_at,
+    updated_at = excluded.updated_at
+"""
+_SELECT = """
+SELECT key, username, access_token, refresh_token, user_id, expires_at
+FROM credentials
+"""
+
+
+def _row_credentials(row: sqlite3.Row) -> Credentials:
+    return Credentials(**{column: row[column] for column in _COLUMNS})
+
+
+def _credentials_row(key: str, credentials: Credentials, now: float) -> dict[str, Any]:
+    row = {column: getattr(credentials, column) for column in _COLUMNS}
+    row.update(key=key, updated_at=now)
+    return row
+
+
+class SQLiteCredentialStore:
+    """Credentials of many accounts in one SQLite database.
+
+    The database runs in WAL mode, so readers do not block the writer.
+    Saves are collected for `batch_delay` seconds and upserted in one
+    transaction. All statements run in a dedicated thread, in call order.
+    """
+
+    def __init__(self, path: str, *, batch_delay: float = 0.05) -> None:
+        """Create store of database file `path` (opened on first use)."""
+
+        self._path: str = path
+        self._batch_delay: float = max(0.0, batch_delay)
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="bakalari-credentials-db"
+        )
+        self._conn: sqlite3.Connection | None = None
+        self._pending: dict[str, Credentials] = {}
+        self._timer: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        """Return number of credentials waiting to be written."""
+        return len(self._pending)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _upsert(self, rows: list[dict[str, Any]]) -> None:
+        with self._connection() as conn:
+            conn.executemany(_UPSERT, rows)
+
+    def _select(self, key: str | None) -> list[sqlite3.Row]:
+        conn = self._connection()
+        if key is None:
+            return conn.execute(_SELECT).fetchall()
+        return conn.execute(_SELECT + "WHERE key = ?", (key,)).fetchall()
+
+    def _delete(self, key: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM credentials WHERE key = ?", (key,))
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    async def load(self, key: str) -> Credentials | None:
+        """Return stored credentials or None."""
+
+        if (credentials := self._pending.get(key)) is not None:
+            return credentials
+        rows = await self._run(self._select, key)
+        return _row_credentials(rows[0]) if rows else None
+
+    async def save(self, key: str, credentials: Credentials) -> None:
+        """Queue upsert of credentials, written with the next batch."""
+
+        self._pending[key] = credentials
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.get_running_loop().create_task(
+                self._delayed_flush(), name="bakalari-credentials-db"
+            )
+
+    async def _delayed_flush(self) -> None:
+        # Saves queued while a batch is written need another round; a failed
+        # batch waits for the next save or close instead of looping.
+        while self._pending:
+            await asyncio.sleep(self._batch_delay)
+            try:
+                await asyncio.shield(self.flush())
+            except sqlite3.Error as err:
+                log.error(f"Unable to save credentials to {self._path}. {err}")
+                return
+
+    async def flush(self) -> None:
+        """Upsert queued credentials in one transaction.
+
+        On failure the batch stays queued (newer saves win) and the error
+        is raised.
+        """
+
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        now = time.time()
+        rows = [_credentials_row(key, c, now) for key, c in batch.items()]
+        try:
+            await self._run(self._upsert, rows)
+        except BaseException:
+            for key, credentials in batch.items():
+                self._pending.setdefault(key, credentials)
+            raise
+        log.debug(f"Saved credentials of {len(rows)} accounts")
+
+    async def delete(self, key: str) -> None:
+        """Remove credentials."""
+
+        self._pending.pop(key, None)
+        await self._run(self._delete, key)
+
+    async def load_all(self) -> dict[str, Credentials]:
+        """Return all stored credentials by key, in one query."""
+
+        await self.flush()
+        rows = await self._run(self._select, None)
+        return {row["key"]: _row_credentials(row) for row in rows}
+
+    async def close(self) -> None:
+        """Write queued credentials and close the database."""
+
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._timer
+        self._timer = None
+        try:
+            await self.flush()
+        finally:
+            await self._run(self._close)
+            self._executor.shutdown(wait=False)
@@ -2,10 +2,19 @@
 
 from __future__ import annotations
 
-from contextlib import suppress
-from dataclasses import dataclass
+from array import array
+import base64
+import binascii
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, replace
+import heapq
 import logging
-from typing import Any, override
+import re
+import sys
+import time
+from typing import Any, overload, override
+import unicodedata
 
 import aiofiles
 import orjson
@@ -14,6 +23,96 @@ from .const import Token
 
 log = logging.getLogger(__name__)
 
+_WORD = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """Return case-folded text without diacritics (``Škola`` -> ``skola``)."""
+
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text: str) -> list[str]:
+    """Return normalized words of text."""
+    return _WORD.findall(normalize_text(text))
+
+
+def _jwt_expiration(token: str | None) -> float | None:
+    """Return `exp` claim of JWT token as unix timestamp, if available."""
+
+    if not token or token.count(".") != 2:
+        return None
+    payload = token.split(".")[1]
+    try:
+        claims = orjson.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+    except (binascii.Error, ValueError):
+        return None
+    exp = claims.get("exp") if isinstance(claims, dict) else None
+    return float(exp) if isinstance(exp, int | float) else None
+
+
+def prefix_matches(
+    term: str, tokens: Sequence[str], postings: Callable[[int], Iterable[int]]
+) -> dict[int, int]:
+    """Return school indexes with token starting with term, 2 if equal.
+
+    `tokens` are sorted, `postings(pos)` returns schools with token at `pos`.
+    """
+
+    matched: dict[int, int] = {}
+    for pos in range(bisect_left(tokens, term), len(tokens)):
+        token = tokens[pos]
+        if not token.startswith(term):
+            break
+        weight = 2 if token == term else 1
+        for idx in postings(pos):
+            if matched.get(idx, 0) < weight:
+                matched[idx] = weight
+    return matched
+
+
+def ranked_search(
+    query: str,
+    matches: Callable[[str], dict[int, int]],
+    name: Callable[[int], str],
+    leading: Callable[[int], str],
+    *,
+    limit: int | None,
+    keep: Callable[[int], bool] | None = None,
+) -> list[int]:
+    """Return indexes of schools matching all words of query, best first.
+
+    See :meth:`Schools.search` for ranking; `matches` is :func:`prefix_matches`
+    over the index, `name` and `leading` return name and its first token.
+    """
+
+    terms = tokenize(query)
+    if not terms:
+        return []
+    scores = matches(terms[0])
+    for term in terms[1:]:
+        matched = matches(term)
+        scores = {i: s + matched[i] for i, s in scores.items() if i in matched}
+    if keep is not None:
+        scores = {i: s for i, s in scores.items() if keep(i)}
+
+    first = terms[0]
+    phrase = query.strip().casefold() if len(terms) > 1 else None
+
+    def rank(idx: int) -> tuple[int, int, int]:
+        text = name(idx)
+        score = scores[idx] + leading(idx).startswith(first)
+        if phrase is not None and phrase in text.casefold():
+            score += 1
+        return -score, len(text), idx
+
+    if limit is None:
+        return sorted(scores, key=rank)
+    return heapq.nsmallest(limit, scores, key=rank)
+
 
 @dataclass(frozen=True)
 class Credentials:
@@ -23,22 +122,35 @@ class Credentials:
     access_token: str | None = None
     refresh_token: str | None = None
     user_id: str | None = None
+    expires_at: float | None = None
 
     @classmethod
     def create(cls, data: dict[str, Any]) -> Credentials:
-        """Create class object form data."""
+        """Create class object form data.
+
+        Expiration of access token is taken from `expires_in` of login response,
+        or from `exp` claim of the access token.
+        """
+
+        access_token = data.get(Token.ACCESS_TOKEN)
+        expires_in = data.get(Token.EXPIRES_IN)
+        if isinstance(expires_in, int | float) and not isinstance(expires_in, bool):
+            expires_at = time.time() + expires_in
+        else:
+            expires_at = _jwt_expiration(access_token)
 
         return cls(
             username=data.get(Token.USERNAME),
             user_id=data.get(Token.USER_ID),
-            access_token=data.get(Token.ACCESS_TOKEN),
+            access_token=access_token,
             refresh_token=data.get(Token.REFRESH_TOKEN),
+            expires_at=expires_at,
         )
 
     @classmethod
     def create_from_json(cls, data: dict[str, Any]) -> Credentials:
         """Return class object from JSON dictionary."""
-        return Credentials.create(
+        credentials = Credentials.create(
             {
                 Token.USER_ID: data["user_id"],
                 Token.ACCESS_TOKEN: data["access_token"],
@@ -46,9 +158,19 @@ class Credentials:
                 Token.USERNAME: data["username"],
             }
         )
+        if isinstance(expires_at := data.get("expires_at"), int | float):
+            return replace(credentials, expires_at=float(expires_at))
+        return credentials
 
+    def expires_in(self, now: float | None = None) -> float | None:
+        """Return seconds until access token expires, None if unknown."""
 
-@dataclass
+        if self.expires_at is None:
+            return None
+        return self.expires_at - (time.time() if now is None else now)
+
+
+@dataclass(slots=True)
 class School:
     """Data structure for one school item."""
 
@@ -82,7 +204,7 @@ class UniqueTowns:
         """Return number of towns in the list."""
         return len(self.list)
 
-    def __iter__(self):
+    def __iter__(self) -> Iterator[str]:
         """Return iterator for the list."""
         return iter(self.list)
 
@@ -101,14 +223,89 @@ class UniqueTowns:
         return self.list[index]
 
 
+class SchoolColumns(Sequence[School]):
+    """Schools stored column-wise, :class:`School` records are made on access.
+
+    Names and API points are kept in plain lists and towns as indexes into
+    a table of distinct towns, so no object per school is kept alive.
+    """
+
+    __slots__ = ("_api_points", "_names", "_town_ids", "_town_index", "_towns")
+
+    def __init__(self) -> None:
+        """Create empty store."""
+
+        self._names: list[str] = []
+        self._api_points: list[str] = []
+        self._towns: list[str] = []
+        self._town_index: dict[str, int] = {}
+        self._town_ids: array[int] = array("I")
+
+    def append(self, school: School) -> None:
+        """Append school record."""
+
+        town = school.town or ""
+        if (town_id := self._town_index.get(town)) is None:
+            town_id = self._town_index[town] = len(self._towns)
+            self._towns.append(town)
+        self._names.append(school.name or "")
+        self._api_points.append(school.api_point or "")
+        self._town_ids.append(town_id)
+
+    def __len__(self) -> int:
+        """Return number of schools."""
+        return len(self._names)
+
+    @overload
+    def __getitem__(self, index: int) -> School: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[School]: ...
+
+    def __getitem__(self, index: int | slice) -> School | list[School]:
+        """Return school (or list of schools for slice)."""
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return School(
+            self._names[index],
+            self._api_points[index],
+            self._towns[self._town_ids[index]],
+        )
+
+    def __iter__(self) -> Iterator[School]:
+        """Iterate over schools."""
+
+        towns = self._towns
+        for name, api_point, town_id in zip(
+            self._names, self._api_points, self._town_ids, strict=True
+        ):
+            yield School(name, api_point, towns[town_id])
+
+
 class Schools:
     """List of schools with their url for Bakalari API."""
 
-    def __init__(self) -> None:
-        """List of schools with their url for Bakalari API."""
+    def __init__(self, *, compact: bool = False) -> None:
+        """List of schools with their url for Bakalari API.
 
-        self.school_list: list[School] = []
+        With `compact`, `school_list` is a :class:`SchoolColumns` store
+        keeping no :class:`School` object per school (less memory, slower
+        access) instead of a list.
+        """
+
+        self.school_list: list[School] | SchoolColumns = (
+            SchoolColumns() if compact else []
+        )
         self.towns_list: UniqueTowns = UniqueTowns()
+        # Indexes refer to positions in school_list.
+        self._by_api_point: dict[str, int] = {}
+        self._by_town: dict[str, array[int]] = {}
+        # Normalized name token -> indexes into school_list.
+        self._tokens: dict[str, array[int]] = {}
+        self._sorted_tokens: list[str] | None = None
+        # First name token of every school, for ranking.
+        self._leading: list[str] = []
 
     def __len__(self) -> int:
         """Return number of schools in the list."""
@@ -140,11 +337,69 @@ class Schools:
             )
             return False
 
-        self.school_list.append(School(name=name, api_point=api_point, town=town))
+        # Towns repeat for every school, keep one string per town.
+        town = sys.intern(town)
+        school = School(name=name, api_point=api_point, town=town)
+        self.school_list.append(school)
         self.towns_list.append(town)
+        self._index(len(self.school_list) - 1, school)
 
         return True
 
+    def _index(self, idx: int, school: School) -> None:
+        self._by_api_point.setdefault(school.api_point or "", idx)
+        if (town := self._by_town.get(school.town or "")) is None:
+            town = self._by_town[school.town or ""] = array("I")
+        town.append(idx)
+        tokens = tokenize(school.name or "")
+        for token in dict.fromkeys(tokens):
+            if (postings := self._tokens.get(token)) is None:
+                self._tokens[token] = array("I", (idx,))
+                self._sorted_tokens = None
+            else:
+                postings.append(idx)
+        self._leading.append(sys.intern(tokens[0]) if tokens else "")
+
+    def _substring_candidates(self, text: str) -> Sequence[School]:
+        """Return schools which may contain `text`, in list order.
+
+        Inner words of `text` are whole words of every matching name, so the
+        rarest of them narrows the scan.
+        """
+
+        postings = [self._tokens.get(token, []) for token in tokenize(text)[1:-1]]
+        if not postings:
+            return self.school_list
+        return [self.school_list[idx] for idx in min(postings, key=len)]
+
+    def _prefix_matches(self, term: str) -> dict[int, int]:
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._tokens)
+        tokens = self._sorted_tokens
+        return prefix_matches(term, tokens, lambda pos: self._tokens[tokens[pos]])
+
+    def search(
+        self, query: str, limit: int | None = 10, town: str | None = None
+    ) -> list[School]:
+        """Return schools matching all words of query, best first.
+
+        Words match by prefix, ignoring case and diacritics ("zakl skol" finds
+        "Základní škola"). Whole-word matches rank above prefix matches, names
+        starting with the first word or containing the query as typed above
+        the rest, then shorter names.
+        """
+
+        schools = self.school_list
+        ranked = ranked_search(
+            query,
+            self._prefix_matches,
+            lambda idx: schools[idx].name or "",
+            self._leading.__getitem__,
+            limit=limit,
+            keep=None if town is None else lambda idx: schools[idx].town == town,
+        )
+        return [schools[idx] for idx in ranked]
+
     def get_all_towns(self) -> list[str]:
         """Return list of all towns in the list."""
         return self.towns_list.list
@@ -172,7 +427,7 @@ class Schools:
             return False
 
         if name is not None:
-            for item in self.school_list:
+            for item in self._substring_candidates(name):
                 if item.name is not None and name in item.name:
                     return item.api_point or False
 
@@ -189,37 +444,29 @@ class Schools:
         if town is None:
             return list(self.school_list)
 
-        return [
-            item
-            for item in self.school_list
-            if item.town is not None and item.town in town
-        ]
+        towns = [name for name in self._by_town if name in town]
+        indexes = (
+            self._by_town[towns[0]]
+            if len(towns) == 1
+            else sorted(idx for name in towns for idx in self._by_town[name])
+        )
+        return [self.school_list[idx] for idx in indexes]
 
     def get_school_name_by_api_point(self, api_point: str) -> str | bool:
         """Get school name by its api point."""
-        with suppress(IndexError):
-            return [item for item in self.school_list if api_point == item.api_point][
-                0
-            ].name or False
-        return False
+        if (idx := self._by_api_point.get(api_point)) is None:
+            return False
+        return self.school_list[idx].name or False
 
     async def save_to_file(self, filename: str) -> bool:
         """Save loaded school list to file in JSON format."""
 
-        schools = []
-
-        for item in self.school_list:
-            new_data = {
-                "name": item.name,
-                "api_point": item.api_point,
-                "town": item.town,
-            }
-            schools.append(new_data)
-
         try:
             async with aiofiles.open(filename, "wb") as file:
                 await file.write(
-                    orjson.dumps(self.school_list, option=orjson.OPT_INDENT_2)
+                    orjson.dumps(
+                        self.school_list, default=list, option=orjson.OPT_INDENT_2
+                    )
                 )
         except OSError as ex:
             log.error(
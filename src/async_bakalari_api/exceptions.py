@@ -30,6 +30,47 @@ class Ex(APIException):
     class BadRequestException(APIException):
         """Bad request."""
 
+    class ServerConnectionError(BadRequestException):
+        """Connection to server failed."""
+
+    class TransientServerError(BadRequestException):
+        """Server answered with transient error (HTTP 429 / 502 / 503 / 504)."""
+
+        def __init__(
+            self,
+            message,
+            *args,
+            status: int | None = None,
+            retry_after: float | None = None,
+            **kwargs,
+        ):
+            """Transient server error with optional `Retry-After` delay in seconds."""
+
+            super().__init__(message, *args, **kwargs)
+            self.status = status
+            self.retry_after = retry_after
+
+    class TooManyRequests(TransientServerError):
+        """Server throttles requests (HTTP 429)."""
+
+    class ServiceUnavailable(TransientServerError):
+        """Server is temporarily unavailable (HTTP 502 / 503 / 504)."""
+
+    class CircuitOpen(BadRequestException):
+        """Circuit breaker of server is open, request was not sent."""
+
+        def __init__(self, message, *args, retry_after: float = 0.0, **kwargs):
+            """Open circuit with seconds remaining until trial requests are allowed."""
+
+            super().__init__(message, *args, **kwargs)
+            self.retry_after = retry_after
+
+    class ReplayMiss(APIException):
+        """Request has no recorded response in replay cassette."""
+
+    class AttachmentTooLarge(APIException):
+        """Attachment exceeds allowed size."""
+
     class InvalidHTTPMethod(APIException):
         """Invalid HTTP method."""
 
@@ -1,15 +1,22 @@
 """Module for working with Komens."""
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import date, datetime
 import logging
+import os
 from typing import Any
 
+from aiohttp import hdrs
 import dateutil
 import dateutil.parser
 import orjson
 
+from .api_client import attachment_filename
 from .bakalari import Bakalari
 from .const import EndPoint
+from .streaming import CHUNK_SIZE, AsyncWritable, AttachmentStream, ProgressCallback
+from .tracing import tracer_of
 
 log = logging.getLogger(__name__)
 
@@ -226,15 +233,16 @@ class Komens:
     async def create_msg(self, msg):
         """Create a message containter from data."""
         log.debug(f"Writing message: {msg}")
-        return MessageContainer(
-            mid=msg["Id"],
-            title=msg["Title"],
-            text=msg["Text"],
-            sent=dateutil.parser.parse(msg["SentDate"]),
-            sender=msg["Sender"]["Name"],
-            read=msg["Read"],
-            attachments=msg["Attachments"],
-        )
+        with tracer_of(self.bakalari).span("komens.create_msg"):
+            return MessageContainer(
+                mid=msg["Id"],
+                title=msg["Title"],
+                text=msg["Text"],
+                sent=dateutil.parser.parse(msg["SentDate"]),
+                sender=msg["Sender"]["Name"],
+                read=msg["Read"],
+                attachments=msg["Attachments"],
+            )
 
     async def fetch_noticeboard(self) -> Messages:
         """Fetch noticeboard messages."""
@@ -287,6 +295,78 @@ class Komens:
 
         return filename, filedata
 
+    @asynccontextmanager
+    async def stream_attachment(
+        self,
+        id: str,
+        *,
+        chunk_size: int = CHUNK_SIZE,
+        buffer_chunks: int = 4,
+        max_size: int | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> AsyncIterator[AttachmentStream]:
+        """Open attachment for streaming.
+
+        Unlike :meth:`get_attachment` the body is not held in memory; iterate
+        the yielded stream for chunks or call its `save` method.
+
+        Args:
+            id (str): The ID of the attachment to retrieve.
+            chunk_size (int, optional): Size of read chunks in bytes.
+            buffer_chunks (int, optional): Chunks read ahead at most.
+            max_size (int, optional): Raise `Ex.AttachmentTooLarge` above this size.
+            progress (Callable, optional): Called with (received bytes, total or None).
+
+        """
+
+        async with self.bakalari.stream_auth_request(
+            EndPoint.KOMENS_ATTACHMENT, extend=f"/{id}"
+        ) as response:
+            try:
+                filename = attachment_filename(
+                    response.headers.get(hdrs.CONTENT_DISPOSITION, "")
+                )
+            except ValueError:
+                filename = id
+            yield AttachmentStream(
+                response,
+                filename,
+                chunk_size=chunk_size,
+                buffer_chunks=buffer_chunks,
+                max_size=max_size,
+                progress=progress,
+            )
+
+    async def download_attachment(
+        self,
+        id: str,
+        destination: str | os.PathLike[str] | AsyncWritable,
+        *,
+        chunk_size: int = CHUNK_SIZE,
+        max_size: int | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> tuple[str, int]:
+        """Download attachment to file, directory or async file object.
+
+        When `destination` is a directory, attachment is saved under its filename.
+
+        Returns:
+            Tuple[str, int]: Filename of the attachment and number of bytes written.
+
+        """
+
+        async with self.stream_attachment(
+            id, chunk_size=chunk_size, max_size=max_size, progress=progress
+        ) as stream:
+            if isinstance(destination, str | os.PathLike) and os.path.isdir(
+                destination
+            ):
+                destination = os.path.join(
+                    destination, os.path.basename(stream.filename) or id
+                )
+            size = await stream.save(destination)
+        return stream.filename, size
+
     async def message_mark_read(self, id: str):
         """Mark message as read.
 
@@ -12,6 +12,7 @@ from dateutil import parser
 
 from .bakalari import Bakalari
 from .const import EndPoint
+from .tracing import tracer_of
 
 log = logging.getLogger(__name__)
 
@@ -431,22 +432,25 @@ class Marks:
             log.warning("fetch_marks: unexpected response type %s", type(response))
             return
 
-        raw_options = response.get("MarkOptions")
-        options: list[dict[str, str]] | None = (
-            raw_options if isinstance(raw_options, list) else None
-        )
-        await self._parse_marks_options(options)
+        with tracer_of(self.bakalari).span("marks.build_models"):
+            raw_options = response.get("MarkOptions")
+            options: list[dict[str, str]] | None = (
+                raw_options if isinstance(raw_options, list) else None
+            )
+            await self._parse_marks_options(options)
 
-        raw_subjects = response.get("Subjects")
-        subjects_list: list[dict[str, Any]] = (
-            [s for s in raw_subjects if isinstance(s, dict)]
-            if isinstance(raw_subjects, list)
-            else []
-        )
+            raw_subjects = response.get("Subjects")
+            subjects_list: list[dict[str, Any]] = (
+                [s for s in raw_subjects if isinstance(s, dict)]
+                if isinstance(raw_subjects, list)
+                else []
+            )
 
-        tasks = [asyncio.create_task(self._parse_subjects(s)) for s in subjects_list]
+            tasks = [
+                asyncio.create_task(self._parse_subjects(s)) for s in subjects_list
+            ]
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+            results = await asyncio.gather(*tasks, return_exceptions=True)
 
         for r in results:
             if isinstance(r, Exception):
@@ -0,0 +1,212 @@
+"""Request metrics (counters and latency histograms)."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Protocol
+
+LabelSet = tuple[tuple[str, str], ...]
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+)
+
+
+class Metrics(Protocol):
+    """Metrics sink used by :class:`ApiClient`.
+
+    Callers check :attr:`enabled` before building labels, so a disabled
+    sink costs a single attribute lookup per request.
+    """
+
+    enabled: bool
+
+    def inc(self, name: str, labels: dict[str, str], value: float = 1.0) -> None:
+        """Increase counter."""
+
+    def observe(self, name: str, labels: dict[str, str], value: float) -> None:
+        """Record histogram observation."""
+
+
+class NoopMetrics:
+    """Metrics sink which drops everything."""
+
+    enabled: bool = False
+
+    def inc(self, name: str, labels: dict[str, str], value: float = 1.0) -> None:
+        """Drop counter increment."""
+
+    def observe(self, name: str, labels: dict[str, str], value: float) -> None:
+        """Drop observation."""
+
+
+NOOP_METRICS = NoopMetrics()
+
+
+@dataclass(slots=True)
+class Histogram:
+    """Cumulative-bucket histogram."""
+
+    buckets: tuple[float, ...]
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+
+    def __post_init__(self) -> None:
+        """Create zero bucket counts (last one is +Inf)."""
+
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        """Record value."""
+
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: Histogram) -> None:
+        """Add observations of histogram with same buckets."""
+
+        for i, value in enumerate(other.counts):
+            self.counts[i] += value
+        self.count += other.count
+        self.total += other.total
+
+    def quantile(self, q: float) -> float:
+        """Estimate q-quantile by linear interpolation inside the bucket."""
+
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    # +Inf bucket, best estimate is the highest finite bound.
+                    return float(self.buckets[-1])
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return float(self.buckets[-1])
+
+
+def _label_set(labels: dict[str, str]) -> LabelSet:
+    return tuple(sorted(labels.items()))
+
+
+def _matches(label_set: LabelSet, selector: dict[str, str]) -> bool:
+    labels = dict(label_set)
+    return all(labels.get(key) == value for key, value in selector.items())
+
+
+class InMemoryMetrics:
+    """In-process metrics registry with Prometheus text exporter."""
+
+    enabled: bool = True
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        """Create empty registry; histograms use `buckets` upper bounds."""
+
+        self._buckets: tuple[float, ...] = tuple(sorted(buckets))
+        self._counters: dict[str, dict[LabelSet, float]] = {}
+        self._histograms: dict[str, dict[LabelSet, Histogram]] = {}
+
+    def inc(self, name: str, labels: dict[str, str], value: float = 1.0) -> None:
+        """Increase counter."""
+
+        series = self._counters.setdefault(name, {})
+        key = _label_set(labels)
+        series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: dict[str, str], value: float) -> None:
+        """Record histogram observation."""
+
+        series = self._histograms.setdefault(name, {})
+        key = _label_set(labels)
+        if (histogram := series.get(key)) is None:
+            histogram = series[key] = Histogram(self._buckets)
+        histogram.observe(value)
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Return sum of counter series matching labels."""
+
+        return sum(
+            value
+            for key, value in self._counters.get(name, {}).items()
+            if _matches(key, labels)
+        )
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        """Return histogram merged from series matching labels."""
+
+        merged = Histogram(self._buckets)
+        for key, histogram in self._histograms.get(name, {}).items():
+            if _matches(key, labels):
+                merged.merge(histogram)
+        return merged
+
+    def quantile(self, name: str, q: float, **labels: str) -> float:
+        """Estimate quantile (e.g. 0.95) of histogram series matching labels."""
+        return self.histogram(name, **labels).quantile(q)
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+
+        self._counters.clear()
+        self._histograms.clear()
+
+    def to_prometheus(self) -> str:
+        """Render metrics in Prometheus text exposition format."""
+
+        lines: list[str] = []
+        for name, series in sorted(self._counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(
+                f"{name}{_format_labels(key)} {_format_value(value)}"
+                for key, value in series.items()
+            )
+        for name, series in sorted(self._histograms.items()):
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(
+                    (*self._buckets, "+Inf"), histogram.counts, strict=True
+                ):
+                    cumulative += count
+                    le = bound if isinstance(bound, str) else _format_value(bound)
+                    lines.append(
+                        f"{name}_bucket{_format_labels((*key, ('le', le)))} {cumulative}"
+                    )
+                lines.append(
+                    f"{name}_sum{_format_labels(key)} {_format_value(histogram.total)}"
+                )
+                lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _format_labels(label_set: LabelSet) -> str:
+    if not label_set:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in label_set
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,571 @@
+"""Local mock of Bakalari v3 API with synthetic data, for load tests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+import logging
+import random
+import secrets
+import time
+from typing import Any, Self
+from urllib import parse
+
+from aiohttp import hdrs, web
+import orjson
+
+from .const import EndPoint, Errors
+
+log = logging.getLogger(__name__)
+
+_MARK_OPTIONS = [
+    {"Id": str(i), "Abbrev": str(i), "Name": name}
+    for i, name in enumerate(
+        ("výborný", "chvalitebný", "dobrý", "dostatečný", "nedostatečný"), 1
+    )
+]
+_HOURS = [
+    {
+        "Id": i + 1,
+        "Caption": str(i + 1),
+        "BeginTime": f"{8 + i:02d}:00",
+        "EndTime": f"{8 + i:02d}:45",
+    }
+    for i in range(10)
+]
+_MUNICIPALITY_PATH = parse.urlsplit(EndPoint.SCHOOL_LIST.endpoint).path
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+@dataclass(frozen=True, slots=True)
+class MockData:
+    """Sizes of generated payloads."""
+
+    subjects: int = 10
+    marks_per_subject: int = 10
+    atoms_per_day: int = 6
+    messages: int = 20
+    noticeboard: int = 5
+    attachments_per_message: int = 1
+    attachment_size: int = 64 * 1024
+    towns: int = 10
+    schools_per_town: int = 20
+    seed: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class MockFaults:
+    """Injected latency and failures.
+
+    Attributes:
+        latency: Delay in seconds added to every response.
+        jitter: Upper bound of uniformly random delay added to latency.
+        error_rate: Fraction of requests answered with 503.
+        token_lifetime: Access token lifetime in seconds, None = never expires.
+        rate_limit: Requests per account allowed in `rate_window`, then 429.
+        rate_window: Rate limit window in seconds.
+
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    token_lifetime: float | None = None
+    rate_limit: int | None = None
+    rate_window: float = 1.0
+
+
+def _json(payload: Any, status: int = 200) -> web.Response:
+    return web.Response(
+        body=orjson.dumps(payload), status=status, content_type="application/json"
+    )
+
+
+def generate_marks(data: MockData) -> dict[str, Any]:
+    """Return marks payload."""
+
+    rng = random.Random(data.seed)
+    start = datetime(2024, 9, 2, 8)
+    subjects = []
+    for s in range(data.subjects):
+        subject_id = f"S{s}"
+        marks = [
+            {
+                "Id": f"M{s}-{m}",
+                "MarkDate": (start + timedelta(days=m * 3 + s)).isoformat(),
+                "Caption": f"Test {m + 1}",
+                "Theme": f"Téma {m + 1}",
+                "MarkText": str(rng.randint(1, 5)),
+                "Teacher": f"Učitel {s}",
+                "SubjectId": subject_id,
+                "IsNew": m == data.marks_per_subject - 1,
+                "IsPoints": False,
+                "PointsText": "",
+                "MaxPoints": 0,
+                "MarkConfirmationState": "Confirmed" if m % 2 else "None",
+            }
+            for m in range(data.marks_per_subject)
+        ]
+        subjects.append(
+            {
+                "Subject": {
+                    "Id": subject_id,
+                    "Abbrev": f"P{s}",
+                    "Name": f"Předmět {s}",
+                },
+                "AverageText": f"{rng.uniform(1, 5):.2f}".replace(".", ","),
+                "PointsOnly": False,
+                "Marks": marks,
+            }
+        )
+    return {"MarkOptions": _MARK_OPTIONS, "Subjects": subjects}
+
+
+def generate_timetable(data: MockData, monday: date | None = None) -> dict[str, Any]:
+    """Return timetable payload of week starting `monday`, permanent when None."""
+
+    hours = _HOURS[: max(1, min(data.atoms_per_day, len(_HOURS)))]
+    subjects = max(1, data.subjects)
+    days = []
+    for day in range(5):
+        atoms = [
+            {
+                "HourId": hour["Id"],
+                "GroupIds": ["G1"],
+                "SubjectId": f"S{(day * len(hours) + i) % subjects}",
+                "TeacherId": f"T{(day + i) % subjects}",
+                "RoomId": f"R{i % 5}",
+                "CycleIds": [],
+                "HomeworkIds": [],
+                "Theme": f"Téma {i + 1}" if monday is not None else None,
+                "Change": None,
+            }
+            for i, hour in enumerate(hours)
+        ]
+        days.append(
+            {
+                "DayOfWeek": day + 1,
+                "Date": (
+                    (monday + timedelta(days=day)).isoformat()
+                    if monday is not None
+                    else "0001-01-01T00:00:00"
+                ),
+                "DayDescription": "",
+                "DayType": "WorkDay",
+                "Atoms": atoms,
+            }
+        )
+    return {
+        "Hours": hours,
+        "Classes": [{"Id": "C1", "Abbrev": "1.A", "Name": "1.A"}],
+        "Groups": [{"Id": "G1", "ClassId": "C1", "Abbrev": "cel", "Name": "celá"}],
+        "Subjects": [
+            {"Id": f"S{i}", "Abbrev": f"P{i}", "Name": f"Předmět {i}"}
+            for i in range(subjects)
+        ],
+        "Teachers": [
+            {"Id": f"T{i}", "Abbrev": f"U{i}", "Name": f"Učitel {i}"}
+            for i in range(subjects)
+        ],
+        "Rooms": [
+            {"Id": f"R{i}", "Abbrev": f"{100 + i}", "Name": f"Učebna {100 + i}"}
+            for i in range(5)
+        ],
+        "Cycles": [],
+        "Days": days,
+    }
+
+
+def generate_messages(data: MockData, prefix: str, count: int) -> list[dict[str, Any]]:
+    """Return list of Komens messages with ids `prefix`0..count-1."""
+
+    sent = datetime(2024, 9, 2, 13, 37)
+    return [
+        {
+            "$type": "GeneralMessage",
+            "Id": f"{prefix}{i}",
+            "Title": f"Zpráva {i}",
+            "Text": f"Text zprávy {i}. " * 10,
+            "SentDate": (sent + timedelta(hours=i)).isoformat() + "+02:00",
+            "Sender": {
+                "$type": "Sender",
+                "Id": "T0",
+                "Type": "teacher",
+                "Name": "Učitel 0",
+            },
+            "Attachments": [
+                {
+                    "$type": "AttachmentInfo",
+                    "Id": f"{prefix}{i}-{a}",
+                    "Name": f"příloha {i}-{a}.pdf",
+                    "Type": "application/pdf",
+                    "Size": data.attachment_size,
+                }
+                for a in range(data.attachments_per_message)
+            ],
+            "Read": i % 3 == 0,
+        }
+        for i in range(count)
+    ]
+
+
+def generate_towns(data: MockData) -> list[dict[str, Any]]:
+    """Return municipality list payload."""
+
+    return [
+        {"name": f"Město {t}", "schoolCount": data.schools_per_town}
+        for t in range(data.towns)
+    ]
+
+
+def generate_town(data: MockData, town: str, base_url: str) -> dict[str, Any]:
+    """Return schools payload of town."""
+
+    return {
+        "name": town,
+        "schools": [
+            {
+                "id": f"{town}-{s}",
+                "name": f"Základní škola {s}, {town}",
+                "schoolUrl": f"{base_url}/{parse.quote(town)}/{s}",
+            }
+            for s in range(data.schools_per_town)
+        ],
+    }
+
+
+class MockBakalariServer:
+    """Local aiohttp server speaking the Bakalari v3 API.
+
+    Every account (any username, unless `accounts` is given) sees the same
+    synthetic data; read state of messages is kept per account. Payloads
+    are rendered once, so the server itself stays cheap under load.
+
+    Example:
+        async with MockBakalariServer(faults=MockFaults(latency=0.05)) as server:
+            bakalari = Bakalari(server.url)
+            await bakalari.first_login("user", "password")
+
+    """
+
+    def __init__(
+        self,
+        data: MockData = MockData(),
+        faults: MockFaults = MockFaults(),
+        *,
+        accounts: dict[str, str] | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create server, call :meth:`start` or use as async context manager.
+
+        Args:
+            data (MockData, optional): Sizes of generated payloads.
+            faults (MockFaults, optional): Injected latency and errors.
+            accounts (dict, optional): Username to password; any login is
+                accepted when None.
+            host (str, optional): Interface to listen on.
+            port (int, optional): Port to listen on, 0 picks a free one.
+            clock (Callable, optional): Time source for tokens and rate limits.
+
+        """
+
+        self.data: MockData = data
+        self.faults: MockFaults = faults
+        self.requests: Counter[str] = Counter()
+        self.statuses: Counter[int] = Counter()
+        self._accounts = accounts
+        self._host = host
+        self._port = port
+        self._clock = clock
+        self._rng = random.Random(data.seed)
+        self._user_ids: dict[str, str] = {}
+        self._access: dict[str, tuple[str, float]] = {}
+        self._refresh: dict[str, str] = {}
+        self._user_access: dict[str, str] = {}
+        self._windows: dict[str, tuple[float, int]] = {}
+        self._read: dict[str, set[str]] = {}
+        self._weeks: dict[date, bytes] = {}
+        self._runner: web.AppRunner | None = None
+        self.url: str = ""
+
+        self._marks = orjson.dumps(generate_marks(data))
+        self._permanent = orjson.dumps(generate_timetable(data))
+        self._messages = generate_messages(data, "K", data.messages)
+        self._notices = orjson.dumps(
+            {"Messages": generate_messages(data, "N", data.noticeboard)}
+        )
+        self._attachment = random.Random(data.seed).randbytes(
+            max(1, min(4096, data.attachment_size))
+        )
+        self.app: web.Application = self._make_app()
+
+    @property
+    def municipality_url(self) -> str:
+        """Return URL of school list (stand-in for EndPoint.SCHOOL_LIST)."""
+        return f"{self.url}{_MUNICIPALITY_PATH}"
+
+    def _make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        # Unread count shares prefix with single message, it must go first.
+        routes = [
+            (hdrs.METH_POST, EndPoint.LOGIN, "", self._login),
+            (hdrs.METH_GET, EndPoint.MARKS, "", self._marks_handler),
+            (hdrs.METH_GET, EndPoint.TIMETABLE_ACTUAL, "", self._actual),
+            (hdrs.METH_GET, EndPoint.TIMETABLE_PERMANENT, "", self._permanent_handler),
+            (hdrs.METH_POST, EndPoint.KOMENS_UNREAD, "", self._received),
+            (hdrs.METH_GET, EndPoint.KOMENS_UNREAD_COUNT, "", self._unread_count),
+            (hdrs.METH_GET, EndPoint.KOMENS_GET_SINGLE_MESSAGE, "/{id}", self._single),
+            (hdrs.METH_POST, EndPoint.NOTICEBOARD_ALL, "", self._noticeboard),
+            (
+                hdrs.METH_GET,
+                EndPoint.KOMENS_ATTACHMENT,
+                "/{id}",
+                self._attachment_handler,
+            ),
+            (
+                hdrs.METH_PUT,
+                EndPoint.KOMENS_MARK_READ,
+                "/{id}/mark-as-read",
+                self._mark_read,
+            ),
+        ]
+        for method, endpoint, suffix, handler in routes:
+            app.router.add_route(
+                method, endpoint.endpoint + suffix, handler, name=endpoint.name
+            )
+        app.router.add_get(_MUNICIPALITY_PATH, self._towns, name="SCHOOL_LIST")
+        app.router.add_get(
+            _MUNICIPALITY_PATH + "/{town}", self._town, name="SCHOOL_LIST_TOWN"
+        )
+        return app
+
+    async def start(self) -> str:
+        """Start listening and return base URL."""
+
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{self._host}:{port}"
+        log.info(f"Mock Bakalari server listening on {self.url}")
+        return self.url
+
+    async def close(self) -> None:
+        """Stop server."""
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> Self:
+        """Start server."""
+
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Stop server."""
+        await self.close()
+
+    def expire_tokens(self) -> None:
+        """Expire all issued access tokens."""
+
+        self._access = {
+            token: (user, float("-inf")) for token, (user, _) in self._access.items()
+        }
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Handler):
+        route = request.match_info.route.name or request.path
+        self.requests[route] += 1
+        faults = self.faults
+        if faults.latency or faults.jitter:
+            await asyncio.sleep(faults.latency + self._rng.uniform(0, faults.jitter))
+        if faults.error_rate and self._rng.random() < faults.error_rate:
+            response = _json({"Message": "Service unavailable"}, 503)
+            response.headers[hdrs.RETRY_AFTER] = "1"
+        else:
+            response = await handler(request)
+        self.statuses[response.status] += 1
+        return response
+
+    def _issue(self, username: str) -> web.Response:
+        # Only the newest access token of account stays valid.
+        self._access.pop(self._user_access.get(username, ""), None)
+        access, refresh = secrets.token_hex(16), secrets.token_hex(16)
+        self._access[access] = (username, self._clock())
+        self._user_access[username] = access
+        self._refresh[refresh] = username
+        user_id = self._user_ids.setdefault(username, f"U{len(self._user_ids) + 1}")
+        lifetime = self.faults.token_lifetime
+        return _json(
+            {
+                "bak:UserId": user_id,
+                "access_token": access,
+                "refresh_token": refresh,
+                "token_type": "Bearer",
+                "expires_in": int(lifetime) if lifetime is not None else 3600,
+            }
+        )
+
+    async def _login(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        match form.get("grant_type"):
+            case "password":
+                username = str(form.get("username", ""))
+                password = str(form.get("password", ""))
+                expected = (self._accounts or {}).get(username)
+                if (
+                    not username
+                    or not password
+                    or (self._accounts is not None and expected != password)
+                ):
+                    return _json(
+                        {"error": "invalid_grant", "error_uri": Errors.INVALID_LOGIN},
+                        400,
+                    )
+                return self._issue(username)
+            case "refresh_token":
+                username = self._refresh.pop(str(form.get("refresh_token", "")), None)
+                if username is None:
+                    return _json(
+                        {
+                            "error": "invalid_grant",
+                            "error_uri": Errors.INVALID_REFRESH_TOKEN,
+                        },
+                        400,
+                    )
+                return self._issue(username)
+            case _:
+                return _json({"error": "unsupported_grant_type"}, 400)
+
+    def _authorize(self, request: web.Request) -> str | web.Response:
+        """Return username of request, or error response."""
+
+        token = request.headers.get(hdrs.AUTHORIZATION, "").removeprefix("Bearer ")
+        if (entry := self._access.get(token)) is None:
+            return self._unauthorized(Errors.INVALID_TOKEN)
+        username, issued = entry
+        now = self._clock()
+        lifetime = self.faults.token_lifetime
+        if issued == float("-inf") or (
+            lifetime is not None and now - issued >= lifetime
+        ):
+            return self._unauthorized(Errors.ACCESS_TOKEN_EXPIRED)
+        if (limit := self.faults.rate_limit) is not None:
+            start, count = self._windows.get(username, (now, 0))
+            if now - start >= self.faults.rate_window:
+                start, count = now, 0
+            if count >= limit:
+                response = _json({"Message": "Too many requests"}, 429)
+                retry_after = max(1, round(self.faults.rate_window - (now - start)))
+                response.headers[hdrs.RETRY_AFTER] = str(retry_after)
+                return response
+            self._windows[username] = (start, count + 1)
+        return username
+
+    @staticmethod
+    def _unauthorized(error: Errors) -> web.Response:
+        response = _json({"Message": "Unauthorized"}, 401)
+        response.headers[hdrs.WWW_AUTHENTICATE] = (
+            f'Bearer error="invalid_token", error_uri="{error}"'
+        )
+        return response
+
+    async def _marks_handler(self, request: web.Request) -> web.Response:
+        if isinstance(user := self._authorize(request), web.Response):
+            return user
+        return web.Response(body=self._marks, content_type="application/json")
+
+    async def _actual(self, request: web.Request) -> web.Response:
+        if isinstance(user := self._authorize(request), web.Response):
+            return user
+        try:
+            day = date.fromisoformat(request.query.get("date", ""))
+        except ValueError:
+            day = date.today()
+        monday = day - timedelta(days=day.weekday())
+        if (body := self._weeks.get(monday)) is None:
+            body = self._weeks[monday] = orjson.dumps(
+                generate_timetable(self.data, monday)
+            )
+        return web.Response(body=body, content_type="application/json")
+
+    async def _permanent_handler(self, request: web.Request) -> web.Response:
+        if isinstance(user := self._authorize(request), web.Response):
+            return user
+        return web.Response(body=self._permanent, content_type="application/json")
+
+    def _messages_of(self, username: str) -> list[dict[str, Any]]:
+        read = self._read.get(username)
+        if not read:
+            return self._messages
+        return [
+            {**msg, "Read": True} if msg["Id"] in read else msg
+            for msg in self._messages
+        ]
+
+    async def _received(self, request: web.Request) -> web.Response:
+        if isinstance(user := self._authorize(request), web.Response):
+            return user
+        return _json({"Messages": self._messages_of(user)})
+
+    async def _unread_count(self, request: web.Request) -> web.Response:
+        if isinstance(user := self._authorize(request), web.Response):
+            return user
+        return _json(sum(not msg["Read"] for msg in self._messages_of(user)))
+
+    async def _single(self, request: web.Request) -> web.Response:
+        if isinstance(user := self._authorize(request), web.Response):
+            return user
+        message_id = request.match_info["id"]
+        for msg in self._messages_of(user):
+            if msg["Id"] == message_id:
+                return _json({"Message": [msg]})
+        return _json({"Message": "Not found"}, 404)
+
+    async def _noticeboard(self, request: web.Request) -> web.Response:
+        if isinstance(user := self._authorize(request), web.Response):
+            return user
+        return web.Response(body=self._notices, content_type="application/json")
+
+    async def _mark_read(self, request: web.Request) -> web.Response:
+        if isinstance(user := self._authorize(request), web.Response):
+            return user
+        self._read.setdefault(user, set()).add(request.match_info["id"])
+        return web.Response(status=204)
+
+    async def _attachment_handler(self, request: web.Request) -> web.StreamResponse:
+        if isinstance(user := self._authorize(request), web.Response):
+            return user
+        size = self.data.attachment_size
+        filename = parse.quote(f"příloha {request.match_info['id']}.pdf")
+        response = web.StreamResponse(
+            headers={
+                hdrs.CONTENT_TYPE: "application/octet-stream",
+                hdrs.CONTENT_DISPOSITION: f"attachment; filename*=UTF-8''{filename}",
+            }
+        )
+        response.content_length = size
+        await response.prepare(request)
+        block = self._attachment
+        sent = 0
+        while sent < size:
+            chunk = block[: size - sent]
+            await response.write(chunk)
+            sent += len(chunk)
+        await response.write_eof()
+        return response
+
+    async def _towns(self, _request: web.Request) -> web.Response:
+        return _json(generate_towns(self.data))
+
+    async def _town(self, request: web.Request) -> web.Response:
+        return _json(generate_town(self.data, request.match_info["town"], self.url))
@@ -0,0 +1,145 @@
+"""Atomic and debounced persistence of credential files."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+import logging
+import os
+import tempfile
+
+log = logging.getLogger(__name__)
+
+
+def write_atomic(filename: str, data: bytes) -> None:
+    """Write file atomically: temp file, fsync, rename, fsync directory.
+
+    Readers see either the old or the new content, never a partial file.
+    The file is created with owner-only permissions.
+    """
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(filename)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, filename)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(tmp)
+        raise
+    with suppress(OSError):
+        # Persist the rename itself; not supported on every platform.
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _write_batch(batch: dict[str, bytes]) -> list[str]:
+    """Write files, return names of those which failed."""
+
+    failed: list[str] = []
+    for filename, data in batch.items():
+        try:
+            write_atomic(filename, data)
+        except OSError as err:
+            log.error(f"Error while saving credentials to file {filename}. {err}")
+            failed.append(filename)
+    return failed
+
+
+class CredentialWriter:
+    """Debounced writer of credential files, run in a thread executor.
+
+    Scheduled writes are held for `delay` seconds; later writes of the same
+    file replace earlier ones and all pending files are written in one
+    executor job. Share one writer between accounts (e.g. in a pool) to
+    batch writes of many accounts refreshing at once.
+    """
+
+    def __init__(self, delay: float = 0.5) -> None:
+        """Create writer; `delay` is debounce time in seconds."""
+
+        self._delay: float = max(0.0, delay)
+        self._pending: dict[str, bytes] = {}
+        self._timer: asyncio.Task[None] | None = None
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Return number of files waiting to be written."""
+        return len(self._pending)
+
+    def peek(self, filename: str) -> bytes | None:
+        """Return data of file waiting to be written, None if not pending."""
+        return self._pending.get(filename)
+
+    def discard(self, filename: str) -> None:
+        """Drop pending write of file."""
+        self._pending.pop(filename, None)
+
+    def schedule(self, filename: str, data: bytes) -> None:
+        """Schedule write of file, must be called from running event loop."""
+
+        self._pending[filename] = data
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.get_running_loop().create_task(
+                self._delayed_flush(), name="bakalari-credentials-writer"
+            )
+
+    async def _delayed_flush(self) -> None:
+        while True:
+            await asyncio.sleep(self._delay)
+            # Cancelling the timer must not drop a batch already being written.
+            requeued = await asyncio.shield(self._flush())
+            # Files scheduled while writing need another round; failed files
+            # wait for the next schedule, write or close instead of looping.
+            if all(requeued.get(name) is data for name, data in self._pending.items()):
+                return
+
+    async def _flush(self) -> dict[str, bytes]:
+        """Write pending files, return failed ones put back to pending."""
+
+        async with self._lock:
+            if not self._pending:
+                return {}
+            batch, self._pending = self._pending, {}
+            failed = await asyncio.get_running_loop().run_in_executor(
+                None, _write_batch, batch
+            )
+            requeued: dict[str, bytes] = {}
+            for filename in failed:
+                # Newer data scheduled during the write wins.
+                requeued[filename] = self._pending.setdefault(filename, batch[filename])
+        log.debug(f"Saved {len(batch) - len(failed)} credential files")
+        return requeued
+
+    async def flush(self) -> bool:
+        """Write pending files now, return False if any write failed.
+
+        Failed files stay pending and are retried by next flush.
+        """
+
+        return not await self._flush()
+
+    async def write(self, filename: str, data: bytes) -> bool:
+        """Write file now (with any other pending files)."""
+
+        self._pending[filename] = data
+        return await self.flush()
+
+    async def close(self) -> None:
+        """Cancel debounce timer and write pending files."""
+
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._timer
+        self._timer = None
+        await self.flush()
@@ -0,0 +1,326 @@
+"""Pool of many accounts sharing transport, with bounded concurrency."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import logging
+import time
+from typing import Any, Self
+from urllib import parse
+
+from strenum import StrEnum
+
+from .bakalari import Bakalari
+from .datastructure import Credentials
+from .komens import Komens
+from .marks import Marks
+from .timetable import Timetable
+from .transport import SessionRegistry, TransportConfig
+
+log = logging.getLogger(__name__)
+
+Fetcher = Callable[[Bakalari], Awaitable[Any]]
+
+
+class FetchKind(StrEnum):
+    """Data fetched for every account by :meth:`BakalariPool.fetch_all`."""
+
+    MARKS = "marks"
+    TIMETABLE = "timetable"
+    PERMANENT_TIMETABLE = "permanent_timetable"
+    MESSAGES = "messages"
+    NOTICEBOARD = "noticeboard"
+    UNREAD_COUNT = "unread_count"
+
+
+async def _fetch_marks(bakalari: Bakalari) -> Marks:
+    marks = Marks(bakalari)
+    await marks.fetch_marks()
+    return marks
+
+
+_FETCHERS: dict[FetchKind, Fetcher] = {
+    FetchKind.MARKS: _fetch_marks,
+    FetchKind.TIMETABLE: lambda b: Timetable(b).fetch_actual(),
+    FetchKind.PERMANENT_TIMETABLE: lambda b: Timetable(b).fetch_permanent(),
+    FetchKind.MESSAGES: lambda b: Komens(b).fetch_messages(),
+    FetchKind.NOTICEBOARD: lambda b: Komens(b).fetch_noticeboard(),
+    FetchKind.UNREAD_COUNT: lambda b: Komens(b).count_unread_messages(),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class AccountResult:
+    """Result of one account; `error` is set when fetching failed."""
+
+    account_id: str
+    value: Any = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Return True when fetch succeeded."""
+        return self.error is None
+
+
+@dataclass(slots=True)
+class _Account:
+    server: str
+    credentials: Credentials
+    client: Bakalari | None = None
+    in_use: int = 0
+    last_used: float = 0.0
+    stale: bool = False
+
+
+class BakalariPool:
+    """Accounts registered by server and credentials, polled concurrently.
+
+    :class:`Bakalari` instances are created on first use and share one
+    :class:`SessionRegistry`, so accounts of one school reuse connections.
+    Idle instances above `max_clients` or older than `idle_timeout` are
+    closed; their (possibly refreshed) credentials are kept for next use.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 50,
+        max_per_host: int = 4,
+        max_clients: int | None = 1000,
+        idle_timeout: float | None = 300.0,
+        session_registry: SessionRegistry | None = None,
+        transport: TransportConfig | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        **bakalari_options: Any,
+    ) -> None:
+        """Create empty pool.
+
+        Args:
+            max_concurrency (int, optional): Accounts fetched at once. Defaults to 50.
+            max_per_host (int, optional): Accounts of one school host fetched at
+                once. Defaults to 4.
+            max_clients (int, optional): Live Bakalari instances kept, least
+                recently used idle ones are evicted. None = unlimited.
+            idle_timeout (float, optional): Seconds after which idle instance is
+                evicted. None = never.
+            session_registry (SessionRegistry, optional): Shared sessions per host,
+                created from `transport` when not given.
+            transport (TransportConfig, optional): Connection pool settings of
+                pool-owned registry.
+            clock (Callable, optional): Time source for idle eviction.
+            **bakalari_options: Passed to every Bakalari, e.g. `retry_policy`,
+                `rate_limiter`, `circuit_breakers` or `metrics`. With
+                `credential_store`, refreshed credentials are saved under
+                the account id.
+
+        """
+
+        if max_concurrency < 1 or max_per_host < 1:
+            raise ValueError("Concurrency limits must be at least 1.")
+
+        self._global: asyncio.Semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_per_host: int = max_per_host
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self._max_clients: int | None = max_clients
+        self._idle_timeout: float | None = idle_timeout
+        self._own_registry: bool = session_registry is None
+        self._registry: SessionRegistry = session_registry or SessionRegistry(transport)
+        self._clock = clock
+        self._options: dict[str, Any] = bakalari_options
+        self._accounts: dict[str, _Account] = {}
+        # Live clients in least recently used order.
+        self._live: OrderedDict[str, _Account] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return number of registered accounts."""
+        return len(self._accounts)
+
+    def __contains__(self, account_id: object) -> bool:
+        """Check if account is registered."""
+        return account_id in self._accounts
+
+    @property
+    def live_clients(self) -> int:
+        """Return number of instantiated Bakalari clients."""
+        return len(self._live)
+
+    def register(self, account_id: str, server: str, credentials: Credentials) -> None:
+        """Register account, replacing credentials of known account."""
+
+        if (account := self._accounts.get(account_id)) is not None:
+            account.server = server
+            account.credentials = credentials
+            # Live instance is recreated with new credentials on next use.
+            account.stale = account.client is not None
+            return
+        self._accounts[account_id] = _Account(server=server, credentials=credentials)
+
+    async def unregister(self, account_id: str) -> Credentials | None:
+        """Remove account, return its latest credentials."""
+
+        if (account := self._accounts.pop(account_id, None)) is None:
+            return None
+        await self._evict(account_id, account)
+        return account.credentials
+
+    def credentials(self, account_id: str) -> Credentials:
+        """Return latest credentials of account (including refreshed tokens)."""
+
+        account = self._accounts[account_id]
+        if account.client is not None:
+            return account.client.credentials
+        return account.credentials
+
+    def _host_semaphore(self, server: str) -> asyncio.Semaphore:
+        host = parse.urlsplit(server).hostname or server
+        if (semaphore := self._hosts.get(host)) is None:
+            semaphore = self._hosts[host] = asyncio.Semaphore(self._max_per_host)
+        return semaphore
+
+    @asynccontextmanager
+    async def client(self, account_id: str) -> AsyncIterator[Bakalari]:
+        """Return Bakalari of account, instantiating it when needed.
+
+        The instance is not evicted while the context is open. Concurrency
+        limits do not apply here, see :meth:`run`.
+        """
+
+        account = self._accounts[account_id]
+        await self.evict_idle()
+        if account.stale and account.in_use == 0:
+            await self._evict(account_id, account, save_credentials=False)
+        if account.client is None:
+            if "credential_store" in self._options:
+                store_options = {
+                    "auto_cache_credentials": True,
+                    "cache_filename": account_id,
+                }
+            else:
+                store_options = {}
+            account.client = Bakalari(
+                account.server,
+                credentials=account.credentials,
+                session_registry=self._registry,
+                **store_options,
+                **self._options,
+            )
+            await self._evict_over_limit()
+        self._live[account_id] = account
+        self._live.move_to_end(account_id)
+        account.in_use += 1
+        try:
+            yield account.client
+        finally:
+            account.in_use -= 1
+            account.last_used = self._clock()
+
+    async def run(self, account_id: str, fetch: Fetcher) -> Any:
+        """Run `fetch` with account client within concurrency limits."""
+
+        account = self._accounts[account_id]
+        # Host slot first, waiting for a busy school must not hold a global slot.
+        async with (
+            self._host_semaphore(account.server),
+            self._global,
+            self.client(account_id) as bakalari,
+        ):
+            return await fetch(bakalari)
+
+    async def _fetch_one(self, account_id: str, fetch: Fetcher) -> AccountResult:
+        try:
+            return AccountResult(account_id, await self.run(account_id, fetch))
+        except Exception as err:
+            log.warning(f"Fetch for account {account_id} failed: {err}")
+            return AccountResult(account_id, error=err)
+
+    async def fetch_all(
+        self,
+        kind: FetchKind | str | Fetcher,
+        accounts: Iterable[str] | None = None,
+    ) -> AsyncIterator[AccountResult]:
+        """Fetch data of all (or given) accounts, yield results as they complete.
+
+        Args:
+            kind (FetchKind | Callable): What to fetch, or coroutine function
+                called with account's Bakalari.
+            accounts (Iterable[str], optional): Account ids. Defaults to all.
+
+        Failures are yielded as results with `error`. Closing the generator
+        (e.g. leaving ``async with contextlib.aclosing(...)`` early) cancels
+        fetches still running.
+
+        """
+
+        fetch = kind if callable(kind) else _FETCHERS[FetchKind(kind)]
+        ids = list(self._accounts if accounts is None else accounts)
+        tasks = {
+            asyncio.create_task(self._fetch_one(account_id, fetch))
+            for account_id in ids
+        }
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _evict(
+        self, account_id: str, account: _Account, *, save_credentials: bool = True
+    ) -> None:
+        self._live.pop(account_id, None)
+        account.stale = False
+        if (client := account.client) is None:
+            return
+        if save_credentials:
+            account.credentials = client.credentials
+        account.client = None
+        await client.close()
+        log.debug(f"Evicted client of account {account_id}")
+
+    async def _evict_over_limit(self) -> None:
+        if self._max_clients is None:
+            return
+        excess = len(self._live) + 1 - self._max_clients
+        for account_id, account in list(self._live.items()):
+            if excess <= 0:
+                break
+            if account.in_use == 0:
+                await self._evict(account_id, account)
+                excess -= 1
+
+    async def evict_idle(self) -> int:
+        """Close clients idle longer than `idle_timeout`, return their number."""
+
+        if self._idle_timeout is None:
+            return 0
+        deadline = self._clock() - self._idle_timeout
+        idle = [
+            (account_id, account)
+            for account_id, account in self._live.items()
+            if account.in_use == 0 and account.last_used <= deadline
+        ]
+        for account_id, account in idle:
+            await self._evict(account_id, account)
+        return len(idle)
+
+    async def close(self) -> None:
+        """Close all clients (and pool-owned sessions)."""
+
+        for account_id, account in list(self._live.items()):
+            await self._evict(account_id, account)
+        if self._own_registry:
+            await self._registry.close()
+
+    async def __aenter__(self) -> Self:
+        """Enter pool context."""
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Close pool."""
+        await self.close()
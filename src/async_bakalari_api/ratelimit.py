@@ -0,0 +1,150 @@
+"""Client-side rate limiting (token bucket) per server host."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+import time
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    """Token bucket settings.
+
+    Attributes:
+        rate: Requests per second replenished to the bucket.
+        burst: Bucket capacity, i.e. requests which may be sent at once.
+
+    """
+
+    rate: float = 5.0
+    burst: int = 10
+
+    def __post_init__(self) -> None:
+        """Validate settings."""
+
+        if self.rate <= 0 or self.burst < 1:
+            raise ValueError("Rate must be positive and burst at least 1.")
+
+
+class TokenBucket:
+    """Async token bucket; waiting requests are served in FIFO order."""
+
+    def __init__(
+        self, limit: RateLimit, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Create full bucket."""
+
+        self.limit: RateLimit = limit
+        self._clock = clock
+        self._tokens: float = float(limit.burst)
+        self._updated: float = clock()
+        self._lock: asyncio.Lock = asyncio.Lock()
+        self._waiting: int = 0
+
+    @property
+    def waiting(self) -> int:
+        """Return number of queued requests."""
+        return self._waiting
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            float(self.limit.burst),
+            self._tokens + (now - self._updated) * self.limit.rate,
+        )
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Return estimated seconds a new request would wait."""
+
+        self._refill()
+        deficit = self._waiting + 1 - self._tokens
+        return max(0.0, deficit / self.limit.rate)
+
+    async def acquire(self) -> float:
+        """Take one token, wait for it in queue; return seconds waited."""
+
+        start = self._clock()
+        self._waiting += 1
+        try:
+            # asyncio.Lock wakes waiters in FIFO order, so the queue is fair.
+            async with self._lock:
+                self._refill()
+                while self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.limit.rate)
+                    self._refill()
+                self._tokens -= 1
+        finally:
+            self._waiting -= 1
+        return self._clock() - start
+
+
+class RateLimiter:
+    """Token buckets keyed by server host with optional global cap.
+
+    Complements ``school_concurrency`` of :meth:`Bakalari.schools_list`:
+    the semaphore bounds requests in flight, the limiter bounds request rate.
+    """
+
+    def __init__(
+        self,
+        per_host: RateLimit | None = RateLimit(),
+        *,
+        global_limit: RateLimit | None = None,
+        host_limits: dict[str, RateLimit] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create rate limiter.
+
+        Args:
+            per_host (RateLimit, optional): Default limit of each host (None = unlimited).
+            global_limit (RateLimit, optional): Limit shared by all hosts (None = unlimited).
+            host_limits (dict, optional): Limits overriding `per_host` for given hosts.
+            clock (Callable, optional): Monotonic clock.
+
+        """
+
+        self._per_host: RateLimit | None = per_host
+        self._host_limits: dict[str, RateLimit] = dict(host_limits or {})
+        self._clock = clock
+        self._buckets: dict[str, TokenBucket] = {}
+        self._global: TokenBucket | None = (
+            TokenBucket(global_limit, clock) if global_limit is not None else None
+        )
+
+    def _bucket(self, host: str) -> TokenBucket | None:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            limit = self._host_limits.get(host, self._per_host)
+            if limit is None:
+                return None
+            bucket = TokenBucket(limit, self._clock)
+            self._buckets[host] = bucket
+        return bucket
+
+    async def acquire(self, host: str) -> float:
+        """Wait for host and global token; return seconds waited."""
+
+        waited = 0.0
+        # Host first, so requests blocked on a busy host don't drain global tokens.
+        if (bucket := self._bucket(host)) is not None:
+            waited += await bucket.acquire()
+        if self._global is not None:
+            waited += await self._global.acquire()
+        return waited
+
+    def wait_time(self, host: str) -> float:
+        """Return estimated seconds a new request to host would wait."""
+
+        waits = [0.0]
+        if (bucket := self._bucket(host)) is not None:
+            waits.append(bucket.wait_time())
+        if self._global is not None:
+            waits.append(self._global.wait_time())
+        return max(waits)
+
+    def wait_times(self) -> dict[str, float]:
+        """Return estimated wait of a new request per known host."""
+        return {host: self.wait_time(host) for host in self._buckets}
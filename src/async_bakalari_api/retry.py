@@ -0,0 +1,92 @@
+"""Retry policy for transient request failures."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+import random
+
+from aiohttp import hdrs
+
+from .exceptions import APIException, Ex
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse `Retry-After` header (delay in seconds or HTTP date) to seconds."""
+
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """Retry policy with exponential backoff and full jitter.
+
+    Only idempotent methods are retried, so e.g. POST to `/api/login` is never
+    replayed. `Retry-After` of 429 / 503 responses takes precedence over backoff.
+
+    Attributes:
+        max_attempts: Total number of attempts including the first one.
+        base_delay: Backoff base in seconds.
+        max_delay: Upper bound of backoff delay in seconds.
+        retry_statuses: HTTP statuses considered transient.
+        idempotent_methods: Methods which may be safely replayed.
+        respect_retry_after: Honor `Retry-After` header.
+        max_retry_after: Give up when server asks to wait longer than this.
+
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    retry_statuses: frozenset[int] = frozenset({429, 502, 503, 504})
+    idempotent_methods: frozenset[str] = frozenset(
+        {
+            hdrs.METH_GET,
+            hdrs.METH_HEAD,
+            hdrs.METH_OPTIONS,
+            hdrs.METH_PUT,
+            hdrs.METH_DELETE,
+        }
+    )
+    respect_retry_after: bool = True
+    max_retry_after: float = 60.0
+
+    def backoff(self, attempt: int) -> float:
+        """Return full-jitter backoff delay for attempt (0 based)."""
+
+        cap = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0, cap)  # noqa: S311
+
+    def retry_delay(self, method: str, attempt: int, err: APIException) -> float | None:
+        """Return delay before next attempt, None if request must not be retried."""
+
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if method.upper() not in self.idempotent_methods:
+            return None
+
+        if isinstance(err, Ex.TransientServerError):
+            if err.status not in self.retry_statuses:
+                return None
+            if self.respect_retry_after and err.retry_after is not None:
+                if err.retry_after > self.max_retry_after:
+                    return None
+                return err.retry_after
+            return self.backoff(attempt)
+
+        if isinstance(err, Ex.TimeoutException | Ex.ServerConnectionError):
+            return self.backoff(attempt)
+
+        return None
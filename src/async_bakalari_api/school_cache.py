@@ -0,0 +1,223 @@
+"""Persistent cache of the school directory with per-town freshness."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+import logging
+import time
+
+import aiofiles
+import orjson
+
+from .datastructure import Schools
+from .persistence import write_atomic
+
+log = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+
+@dataclass(slots=True)
+class TownEntry:
+    """Cached schools of one town from the municipality list."""
+
+    name: str
+    fetched_at: float
+    count: int | None = None
+    schools: list[tuple[str, str]] = field(default_factory=list)
+
+
+def select_towns(names: Iterable[str], town: str | None, recursive: bool) -> list[str]:
+    """Filter town names like :meth:`Bakalari.schools_list` does."""
+
+    if not town:
+        return list(names)
+    if recursive:
+        return [name for name in names if town in name]
+    return [name for name in names if name.startswith(town)]
+
+
+class SchoolDirectoryCache:
+    """School directory kept in a JSON file, refreshed town by town.
+
+    The municipality list (with school count of every town) is re-checked
+    after `ttl` seconds. A town is fetched again when it is new, its school
+    count changed, or its schools are older than `town_ttl` seconds. A town
+    whose fetch failed is not retried for `retry_after` seconds.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        *,
+        ttl: float = 86400.0,
+        town_ttl: float = 30 * 86400.0,
+        retry_after: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Create cache stored in `filename` (loaded on first use)."""
+
+        self._filename: str = filename
+        self._ttl: float = ttl
+        self._town_ttl: float = town_ttl
+        self._retry_after: float = retry_after
+        self._clock = clock
+        self._loaded: bool = False
+        self._checked_at: float | None = None
+        # Town name of the municipality list -> announced school count.
+        self._towns: dict[str, int | None] = {}
+        self._entries: dict[str, TownEntry] = {}
+        # Town name -> time of last failed fetch.
+        self._failed: dict[str, float] = {}
+
+    @property
+    def filename(self) -> str:
+        """Return cache file name."""
+        return self._filename
+
+    @property
+    def towns(self) -> list[str]:
+        """Return town names of the last municipality list."""
+        return list(self._towns)
+
+    def __len__(self) -> int:
+        """Return number of cached schools."""
+        return sum(len(entry.schools) for entry in self._entries.values())
+
+    async def load(self) -> bool:
+        """Load cache file once, return False if missing or invalid."""
+
+        if self._loaded:
+            return bool(self._towns)
+        self._loaded = True
+        try:
+            async with aiofiles.open(self._filename, "rb") as file:
+                data = orjson.loads(await file.read())
+        except OSError:
+            log.debug(f"School directory cache {self._filename} not found")
+            return False
+        except orjson.JSONDecodeError:
+            log.error(f"School directory cache {self._filename} is corrupted.")
+            return False
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            log.warning(f"Ignoring school directory cache {self._filename}")
+            return False
+        self._checked_at = data.get("checked_at")
+        self._towns = dict(data.get("towns", {}))
+        self._entries = {
+            key: TownEntry(
+                name=entry["name"],
+                fetched_at=entry["fetched_at"],
+                count=entry.get("count"),
+                schools=[(name, url) for name, url in entry["schools"]],
+            )
+            for key, entry in data.get("entries", {}).items()
+        }
+        self._failed = dict(data.get("failed", {}))
+        log.debug(f"Loaded {len(self)} schools from {self._filename}")
+        return True
+
+    async def save(self) -> bool:
+        """Write cache file atomically without blocking event loop."""
+
+        data = orjson.dumps(
+            {
+                "version": CACHE_VERSION,
+                "checked_at": self._checked_at,
+                "towns": self._towns,
+                "entries": self._entries,
+                "failed": self._failed,
+            }
+        )
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, write_atomic, self._filename, data
+            )
+        except OSError as err:
+            log.error(f"Unable to save school directory cache {self._filename}. {err}")
+            return False
+        return True
+
+    def set_towns(self, towns: dict[str, int | None]) -> None:
+        """Store fresh municipality list, drop towns which disappeared."""
+
+        self._towns = dict(towns)
+        self._checked_at = self._clock()
+        for key in self._entries.keys() - self._towns.keys():
+            del self._entries[key]
+        for key in self._failed.keys() - self._towns.keys():
+            del self._failed[key]
+
+    def update_town(self, key: str, name: str, schools: list[tuple[str, str]]) -> None:
+        """Store freshly fetched schools of town `key`."""
+
+        self._entries[key] = TownEntry(
+            name=name,
+            fetched_at=self._clock(),
+            count=self._towns.get(key),
+            schools=schools,
+        )
+        self._failed.pop(key, None)
+
+    def mark_failed(self, key: str) -> None:
+        """Record failed fetch of town `key`, it is skipped until `retry_after`."""
+        self._failed[key] = self._clock()
+
+    def _backing_off(self, key: str) -> bool:
+        failed_at = self._failed.get(key)
+        return failed_at is not None and self._clock() - failed_at < self._retry_after
+
+    def list_stale(self) -> bool:
+        """Check if municipality list should be fetched again."""
+
+        return self._checked_at is None or self._clock() - self._checked_at >= self._ttl
+
+    def missing_towns(self, names: Iterable[str]) -> list[str]:
+        """Return towns of `names` which were never fetched (nor failed lately)."""
+
+        return [
+            name
+            for name in names
+            if name not in self._entries and not self._backing_off(name)
+        ]
+
+    def stale_towns(self, names: Iterable[str]) -> list[str]:
+        """Return towns of `names` which are missing, changed or expired.
+
+        Towns which failed lately are left out.
+        """
+
+        deadline = self._clock() - self._town_ttl
+        stale: list[str] = []
+        for name in names:
+            if self._backing_off(name):
+                continue
+            entry = self._entries.get(name)
+            if (
+                entry is None
+                or entry.fetched_at <= deadline
+                or entry.count != self._towns.get(name)
+            ):
+                stale.append(name)
+        return stale
+
+    def needs_refresh(self) -> bool:
+        """Check if anything should be fetched again."""
+        return self.list_stale() or bool(self.stale_towns(self._towns))
+
+    def select(self, town: str | None = None, recursive: bool = True) -> list[str]:
+        """Return cached town names matching filter."""
+        return select_towns(self._towns, town, recursive)
+
+    def schools(self, town: str | None = None, recursive: bool = True) -> Schools:
+        """Build :class:`Schools` of cached towns matching filter."""
+
+        result = Schools()
+        for key in self.select(town, recursive):
+            if (entry := self._entries.get(key)) is None:
+                continue
+            for name, api_point in entry.schools:
+                result.append_school(name, api_point, entry.name)
+        return result
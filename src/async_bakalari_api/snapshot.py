@@ -0,0 +1,431 @@
+"""Binary, memory-mapped snapshot of the school directory.
+
+Layout: fixed header (magic, version, counts and offset/size of every
+section) followed by 8-byte aligned sections. String sections hold UTF-8
+strings terminated by NUL with a little-endian ``uint32`` array of start
+offsets; index sections are ``uint32`` arrays. Nothing is decoded on open,
+queries read only the parts of the file they need.
+"""
+
+from __future__ import annotations
+
+from array import array
+import asyncio
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+import logging
+import mmap
+import struct
+import sys
+from types import TracebackType
+from typing import Self, overload
+
+from .datastructure import School, Schools, prefix_matches, ranked_search, tokenize
+from .persistence import write_atomic
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"BKSCHOOL"
+VERSION = 1
+_SECTIONS = (
+    "names",
+    "name_offsets",
+    "api_points",
+    "api_offsets",
+    "api_order",
+    "town_ids",
+    "towns",
+    "town_offsets",
+    "town_postings",
+    "town_posting_offsets",
+    "tokens",
+    "token_offsets",
+    "token_postings",
+    "token_posting_offsets",
+    "leading",
+)
+_HEADER = struct.Struct("<8sII" + "QQ" * len(_SECTIONS))
+_NO_TOKEN = 0xFFFFFFFF
+
+
+def _uint32(values: Sequence[int]) -> bytes:
+    data = array("I", values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _strings(values: Sequence[str]) -> tuple[bytes, bytes]:
+    """Return NUL terminated UTF-8 strings and their start offsets."""
+
+    encoded = [value.encode() + b"\0" for value in values]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return b"".join(encoded), _uint32(offsets)
+
+
+def _postings(groups: Sequence[Sequence[int]]) -> tuple[bytes, bytes]:
+    """Return concatenated groups and their start offsets."""
+
+    offsets = [0]
+    for group in groups:
+        offsets.append(offsets[-1] + len(group))
+    return _uint32([idx for group in groups for idx in group]), _uint32(offsets)
+
+
+def build_snapshot(schools: Schools) -> bytes:
+    """Return snapshot of schools."""
+
+    names: list[str] = []
+    api_points: list[str] = []
+    town_ids: list[int] = []
+    town_index: dict[str, int] = {}
+    town_postings: list[list[int]] = []
+    token_sets: dict[str, list[int]] = {}
+    leading: list[str | None] = []
+    for idx, school in enumerate(schools.school_list):
+        town = school.town or ""
+        if (town_id := town_index.get(town)) is None:
+            town_id = town_index[town] = len(town_postings)
+            town_postings.append([])
+        town_postings[town_id].append(idx)
+        names.append(school.name or "")
+        api_points.append(school.api_point or "")
+        town_ids.append(town_id)
+        tokens = tokenize(school.name or "")
+        for token in dict.fromkeys(tokens):
+            token_sets.setdefault(token, []).append(idx)
+        leading.append(tokens[0] if tokens else None)
+
+    tokens_sorted = sorted(token_sets)
+    token_ids = {token: pos for pos, token in enumerate(tokens_sorted)}
+    sections = {
+        "api_order": _uint32(
+            sorted(range(len(api_points)), key=lambda i: (api_points[i], i))
+        ),
+        "town_ids": _uint32(town_ids),
+        "leading": _uint32(
+            [_NO_TOKEN if token is None else token_ids[token] for token in leading]
+        ),
+    }
+    sections["names"], sections["name_offsets"] = _strings(names)
+    sections["api_points"], sections["api_offsets"] = _strings(api_points)
+    sections["towns"], sections["town_offsets"] = _strings(list(town_index))
+    sections["town_postings"], sections["town_posting_offsets"] = _postings(
+        town_postings
+    )
+    sections["tokens"], sections["token_offsets"] = _strings(tokens_sorted)
+    sections["token_postings"], sections["token_posting_offsets"] = _postings(
+        [token_sets[token] for token in tokens_sorted]
+    )
+
+    body = bytearray()
+    positions: list[int] = []
+    for name in _SECTIONS:
+        body += b"\0" * (-(_HEADER.size + len(body)) % 8)
+        positions += [_HEADER.size + len(body), len(sections[name])]
+        body += sections[name]
+    return _HEADER.pack(MAGIC, VERSION, len(names), *positions) + body
+
+
+async def save_snapshot(schools: Schools, filename: str) -> bool:
+    """Write snapshot of schools atomically without blocking event loop."""
+
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            None, write_atomic, filename, build_snapshot(schools)
+        )
+    except OSError as ex:
+        log.error(f"Unable to save schools snapshot to file {filename}. Error: {ex}")
+        return False
+    return True
+
+
+def is_snapshot(filename: str) -> bool:
+    """Check if file starts with snapshot magic."""
+
+    try:
+        with open(filename, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class _Strings(Sequence[str]):
+    """Strings of snapshot section, decoded on access."""
+
+    __slots__ = ("_data", "_offsets")
+
+    def __init__(self, data: memoryview, offsets: Sequence[int]) -> None:
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def span(self, index: int) -> tuple[int, int]:
+        """Return start and end (without NUL) of string in section."""
+        return self._offsets[index], self._offsets[index + 1] - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        start, end = self.span(index)
+        return str(self._data[start:end], "utf-8")
+
+
+class SchoolSnapshot(Sequence[School]):
+    """Read-only school directory backed by memory-mapped snapshot file.
+
+    Answers the queries of :class:`Schools` without loading the file;
+    :class:`School` records are created only for returned results.
+
+    Example:
+        await save_snapshot(schools, "schools.bin")
+        with SchoolSnapshot.open("schools.bin") as snapshot:
+            snapshot.search("zakl skola brno")
+
+    """
+
+    def __init__(self, buffer: mmap.mmap | bytes) -> None:
+        """Create snapshot over buffer, see :meth:`open`."""
+
+        self._buffer = buffer
+        # Every view into buffer, released on close.
+        self._exports: list[memoryview] = [memoryview(buffer)]
+        try:
+            self._parse()
+        except ValueError:
+            self.close()
+            raise
+
+    def _parse(self) -> None:
+        buffer = self._buffer
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Not a schools snapshot.")
+        magic, version, count, *positions = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a schools snapshot or unsupported version.")
+        self._count: int = count
+        views: dict[str, memoryview] = {}
+        for pos, name in enumerate(_SECTIONS):
+            offset, size = positions[2 * pos], positions[2 * pos + 1]
+            if offset + size > len(buffer):
+                raise ValueError("Schools snapshot is truncated.")
+            views[name] = self._export(self._exports[0][offset : offset + size])
+        self._names_span: tuple[int, int] = (positions[0], positions[0] + positions[1])
+        self._name_offsets = self._uint32(views["name_offsets"])
+        self._names = _Strings(views["names"], self._name_offsets)
+        self._api_points = _Strings(
+            views["api_points"], self._uint32(views["api_offsets"])
+        )
+        self._api_order = self._uint32(views["api_order"])
+        self._town_ids = self._uint32(views["town_ids"])
+        self._towns = _Strings(views["towns"], self._uint32(views["town_offsets"]))
+        self._town_postings = self._uint32(views["town_postings"])
+        self._town_posting_offsets = self._uint32(views["town_posting_offsets"])
+        self._tokens = _Strings(views["tokens"], self._uint32(views["token_offsets"]))
+        self._token_postings = self._uint32(views["token_postings"])
+        self._token_posting_offsets = self._uint32(views["token_posting_offsets"])
+        self._leading = self._uint32(views["leading"])
+        if len(self._names) != count or len(self._town_ids) != count:
+            raise ValueError("Schools snapshot is corrupted.")
+
+    def _export(self, view: memoryview) -> memoryview:
+        self._exports.append(view)
+        return view
+
+    def _uint32(self, view: memoryview) -> Sequence[int]:
+        if sys.byteorder == "little":
+            return self._export(view.cast("I"))
+        data = array("I", view.tobytes())
+        data.byteswap()
+        return data
+
+    @classmethod
+    def open(cls, filename: str) -> Self:
+        """Memory-map snapshot file."""
+
+        with open(filename, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def close(self) -> None:
+        """Unmap the file; results returned earlier stay valid."""
+
+        for view in reversed(self._exports):
+            view.release()
+        self._exports.clear()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self) -> Self:
+        """Enter context."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Close snapshot."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Return number of schools."""
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> School: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[School]: ...
+
+    def __getitem__(self, index: int | slice) -> School | list[School]:
+        """Return school (or list of schools for slice)."""
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if not -self._count <= index < self._count:
+            raise IndexError("School index out of range")
+        index %= self._count
+        return School(
+            name=self._names[index],
+            api_point=self._api_points[index],
+            town=self._towns[self._town_ids[index]],
+        )
+
+    @property
+    def school_list(self) -> Self:
+        """Return self, for code written against :class:`Schools`."""
+        return self
+
+    def to_schools(self, *, compact: bool = False) -> Schools:
+        """Load all schools into :class:`Schools`."""
+
+        schools = Schools(compact=compact)
+        for school in self:
+            schools.append_school(
+                school.name or "", school.api_point or "", school.town or ""
+            )
+        return schools
+
+    def get_all_towns(self) -> list[str]:
+        """Return list of all towns."""
+        return list(self._towns)
+
+    def istown(self, town: str) -> bool:
+        """Check if town is in the directory."""
+        return town in self._towns
+
+    def get_towns_partial_name(self, partial: str) -> list[str]:
+        """Get town by partial name."""
+        return [town for town in self._towns if partial in town]
+
+    def count_towns(self) -> int:
+        """Return number of towns."""
+        return len(self._towns)
+
+    def get_url(self, name: str | None = None, idx: int | None = None) -> str | bool:
+        """Return url for school from name or index, see :meth:`Schools.get_url`."""
+
+        if (name is not None) and (idx is not None):
+            return False
+
+        if name is not None:
+            needle = name.encode()
+            if b"\0" in needle:
+                return False
+            # UTF-8 substring search over NUL separated names finds the
+            # first school (in list order) containing the name.
+            start, end = self._names_span
+            found = self._buffer.find(needle, start, end)
+            if found < 0:
+                return False
+            school = bisect_right(self._name_offsets, found - start) - 1
+            return self._api_points[school] or False
+
+        if idx is not None:
+            try:
+                return self[idx].api_point or False
+            except IndexError:
+                return False
+
+        return False
+
+    def _town_schools(self, town_id: int) -> Sequence[int]:
+        return self._town_postings[
+            self._town_posting_offsets[town_id] : self._town_posting_offsets[
+                town_id + 1
+            ]
+        ]
+
+    def get_schools_by_town(self, town: str | None = None) -> list[School]:
+        """Get list of schools in town, see :meth:`Schools.get_schools_by_town`."""
+
+        if town is None:
+            return list(self)
+        indexes = sorted(
+            idx
+            for town_id, name in enumerate(self._towns)
+            if name in town
+            for idx in self._town_schools(town_id)
+        )
+        return [self[idx] for idx in indexes]
+
+    def get_school_name_by_api_point(self, api_point: str) -> str | bool:
+        """Get school name by its api point."""
+
+        pos = bisect_left(
+            self._api_order, api_point, key=lambda idx: self._api_points[idx]
+        )
+        if pos == len(self._api_order):
+            return False
+        idx = self._api_order[pos]
+        if self._api_points[idx] != api_point:
+            return False
+        return self._names[idx] or False
+
+    def _prefix_matches(self, term: str) -> dict[int, int]:
+        offsets = self._token_posting_offsets
+        return prefix_matches(
+            term,
+            self._tokens,
+            lambda pos: self._token_postings[offsets[pos] : offsets[pos + 1]],
+        )
+
+    def _leading_token(self, idx: int) -> str:
+        token_id = self._leading[idx]
+        return "" if token_id == _NO_TOKEN else self._tokens[token_id]
+
+    def search(
+        self, query: str, limit: int | None = 10, town: str | None = None
+    ) -> list[School]:
+        """Return schools matching all words of query, see :meth:`Schools.search`."""
+
+        town_ids = (
+            None
+            if town is None
+            else {i for i, name in enumerate(self._towns) if name == town}
+        )
+        ranked = ranked_search(
+            query,
+            self._prefix_matches,
+            self._names.__getitem__,
+            self._leading_token,
+            limit=limit,
+            keep=None
+            if town_ids is None
+            else lambda idx: self._town_ids[idx] in town_ids,
+        )
+        return [self[idx] for idx in ranked]
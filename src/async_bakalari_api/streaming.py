@@ -0,0 +1,135 @@
+"""Streaming download of attachments."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import suppress
+import inspect
+import logging
+import os
+from typing import Protocol
+
+import aiofiles
+import aiofiles.os
+import aiohttp
+
+from .exceptions import Ex
+from .transport import HttpResponse
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+ProgressCallback = Callable[[int, int | None], Awaitable[None] | None]
+
+
+class AsyncWritable(Protocol):
+    """Async file-like object, e.g. opened by :func:`aiofiles.open`."""
+
+    async def write(self, data: bytes, /) -> object:
+        """Write chunk of data."""
+
+
+class AttachmentStream:
+    """Attachment body read in chunks through bounded buffer.
+
+    Chunks are read ahead by background task into a queue of at most
+    `buffer_chunks` items, so memory use is bounded by
+    ``chunk_size * buffer_chunks`` regardless of attachment size.
+    """
+
+    def __init__(
+        self,
+        response: HttpResponse,
+        filename: str,
+        *,
+        chunk_size: int = CHUNK_SIZE,
+        buffer_chunks: int = 4,
+        max_size: int | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> None:
+        """Wrap open response of attachment request."""
+
+        self.filename: str = filename
+        self.total: int | None = response.content_length
+        self.received: int = 0
+        self._response = response
+        self._chunk_size: int = max(1, chunk_size)
+        self._buffer_chunks: int = max(1, buffer_chunks)
+        self._max_size: int | None = max_size
+        self._progress: ProgressCallback | None = progress
+
+        if max_size is not None and self.total is not None and self.total > max_size:
+            raise Ex.AttachmentTooLarge(
+                f"Attachment {filename} has {self.total} bytes, limit is {max_size}."
+            )
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        """Iterate over body chunks."""
+        return self._chunks()
+
+    async def _produce(self, queue: asyncio.Queue[bytes | Exception | None]) -> None:
+        try:
+            async for chunk in self._response.content.iter_chunked(self._chunk_size):
+                await queue.put(chunk)
+        except TimeoutError as err:
+            await queue.put(
+                Ex.TimeoutException(f"Timeout while downloading {self.filename}")
+            )
+            log.debug(f"Download of {self.filename} timed out: {err}")
+        except aiohttp.ClientError as err:
+            await queue.put(
+                Ex.ServerConnectionError(f"Download of {self.filename} failed: {err}")
+            )
+        else:
+            await queue.put(None)
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        queue: asyncio.Queue[bytes | Exception | None] = asyncio.Queue(
+            self._buffer_chunks
+        )
+        producer = asyncio.create_task(self._produce(queue))
+        try:
+            while (item := await queue.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+                self.received += len(item)
+                if self._max_size is not None and self.received > self._max_size:
+                    raise Ex.AttachmentTooLarge(
+                        f"Attachment {self.filename} exceeds limit {self._max_size} bytes."
+                    )
+                if self._progress is not None:
+                    result = self._progress(self.received, self.total)
+                    if inspect.isawaitable(result):
+                        await result
+                yield item
+        finally:
+            producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await producer
+
+    async def save(self, destination: str | os.PathLike[str] | AsyncWritable) -> int:
+        """Write body to path or async file object; return number of bytes.
+
+        Path is written through temporary file and replaced atomically,
+        partial file is removed on failure.
+        """
+
+        if not isinstance(destination, str | os.PathLike):
+            async for chunk in self:
+                await destination.write(chunk)
+            return self.received
+
+        path = os.fspath(destination)
+        tmp_path = f"{path}.part"
+        try:
+            async with aiofiles.open(tmp_path, "wb") as file:
+                async for chunk in self:
+                    await file.write(chunk)
+            await aiofiles.os.replace(tmp_path, path)
+        except BaseException:
+            with suppress(OSError):
+                await aiofiles.os.remove(tmp_path)
+            raise
+        return self.received
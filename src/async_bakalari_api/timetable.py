@@ -12,6 +12,7 @@ from dateutil import parser as dt_parser
 
 from .bakalari import Bakalari
 from .const import EndPoint
+from .tracing import tracer_of
 
 log = logging.getLogger(__name__)
 
@@ -308,7 +309,8 @@ class Timetable:
             request_endpoint=EndPoint.TIMETABLE_ACTUAL,
             params=params,
         )
-        week = self._parse_timetable(cast(dict[str, Any], data))
+        with tracer_of(self.bakalari).span("timetable.parse_timetable"):
+            week = self._parse_timetable(cast(dict[str, Any], data))
         self._last_actual = week
         return week
 
@@ -334,7 +336,8 @@ class Timetable:
             request_endpoint=EndPoint.TIMETABLE_PERMANENT,
             params=params,
         )
-        week = self._parse_timetable(cast(dict[str, Any], data))
+        with tracer_of(self.bakalari).span("timetable.parse_timetable"):
+            week = self._parse_timetable(cast(dict[str, Any], data))
         self._last_permanent = week
         return week
 
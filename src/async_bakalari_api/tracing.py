@@ -0,0 +1,233 @@
+"""Lightweight tracing hooks (OpenTelemetry-like, no dependency)."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import itertools
+import logging
+import random
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+log = logging.getLogger(__name__)
+
+_NOT_SAMPLED: Any = object()
+_current_span: ContextVar[Any] = ContextVar("bakalari_current_span", default=None)
+_ids = itertools.count(1)
+_NULL_CONTEXT: AbstractContextManager[None] = nullcontext()
+
+
+@dataclass(slots=True)
+class Span:
+    """Timed operation; times are :func:`time.perf_counter` seconds."""
+
+    name: str
+    trace_id: int
+    span_id: int
+    parent_id: int | None
+    start: float
+    end: float | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        """Return span duration in milliseconds (0 while running)."""
+
+        if self.end is None:
+            return 0.0
+        return (self.end - self.start) * 1000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set span attribute."""
+        self.attributes[key] = value
+
+
+class NoopTracer:
+    """Tracer which records nothing."""
+
+    enabled: bool = False
+
+    def span(self, name: str, **attributes: Any) -> AbstractContextManager[Any]:
+        """Return shared no-op context manager."""
+        return _NULL_CONTEXT
+
+    def trace_config(self) -> aiohttp.TraceConfig | None:
+        """Return None, no HTTP phase tracing."""
+        return None
+
+
+NOOP_TRACER = NoopTracer()
+
+
+def tracer_of(bakalari: Any) -> Tracer | NoopTracer:
+    """Return tracer of Bakalari instance, no-op tracer when it has none."""
+    return getattr(bakalari, "tracer", NOOP_TRACER)
+
+
+class Tracer:
+    """Tracer sampling whole traces and handing finished spans to exporter.
+
+    Sampling is decided once per root span; children of unsampled trace
+    cost one context variable lookup.
+    """
+
+    enabled: bool = True
+
+    def __init__(
+        self,
+        exporter: Callable[[Span], None],
+        *,
+        sample_rate: float = 1.0,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        """Create tracer.
+
+        Args:
+            exporter (Callable): Called with every finished span.
+            sample_rate (float, optional): Fraction of traces recorded. Defaults to 1.
+            rng (Callable, optional): Random number source for sampling.
+
+        """
+
+        self._exporter = exporter
+        self._sample_rate: float = min(1.0, max(0.0, sample_rate))
+        self._rng = rng
+
+    def _parent(self) -> Any:
+        parent = _current_span.get()
+        if parent is None and self._rng() >= self._sample_rate:
+            return _NOT_SAMPLED
+        return parent
+
+    def _export(self, span: Span) -> None:
+        try:
+            self._exporter(span)
+        except Exception as err:
+            log.debug(f"Span exporter failed: {err}")
+
+    def span(self, name: str, **attributes: Any) -> AbstractContextManager[Any]:
+        """Return context manager measuring a span, yields Span or None."""
+
+        parent = self._parent()
+        if parent is _NOT_SAMPLED:
+            return self._unsampled()
+        return self._sampled(name, parent, attributes)
+
+    @contextmanager
+    def _unsampled(self) -> Iterator[None]:
+        token = _current_span.set(_NOT_SAMPLED)
+        try:
+            yield None
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def _sampled(
+        self, name: str, parent: Span | None, attributes: dict[str, Any]
+    ) -> Iterator[Span]:
+        span_id = next(_ids)
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent is not None else span_id,
+            span_id=span_id,
+            parent_id=parent.span_id if parent is not None else None,
+            start=time.perf_counter(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as err:
+            span.set_attribute("error", err.__class__.__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end = time.perf_counter()
+            self._export(span)
+
+    def record(self, name: str, start: float, end: float, **attributes: Any) -> None:
+        """Record already finished span under the current span."""
+
+        parent = _current_span.get()
+        if parent is None or parent is _NOT_SAMPLED:
+            # Phase spans only make sense inside a traced request.
+            return
+        self._export(
+            Span(
+                name=name,
+                trace_id=parent.trace_id,
+                span_id=next(_ids),
+                parent_id=parent.span_id,
+                start=start,
+                end=end,
+                attributes=attributes,
+            )
+        )
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return aiohttp trace config emitting connection and TTFB spans."""
+
+        config = aiohttp.TraceConfig(trace_config_ctx_factory=SimpleNamespace)
+
+        async def on_request_start(_session, ctx, _params) -> None:
+            ctx.request_start = time.perf_counter()
+
+        async def on_connection_queued_end(_session, ctx, _params) -> None:
+            ctx.queued_end = time.perf_counter()
+
+        async def on_connection_acquired(_session, ctx, _params, *, reused) -> None:
+            self.record(
+                "http.connection_acquire",
+                getattr(ctx, "request_start", time.perf_counter()),
+                time.perf_counter(),
+                reused=reused,
+                queued=hasattr(ctx, "queued_end"),
+            )
+
+        async def on_connection_reuseconn(session, ctx, params) -> None:
+            await on_connection_acquired(session, ctx, params, reused=True)
+
+        async def on_connection_create_end(session, ctx, params) -> None:
+            await on_connection_acquired(session, ctx, params, reused=False)
+
+        async def on_request_headers_sent(_session, ctx, _params) -> None:
+            ctx.headers_sent = time.perf_counter()
+
+        async def on_request_end(_session, ctx, params) -> None:
+            now = time.perf_counter()
+            self.record(
+                "http.ttfb",
+                getattr(ctx, "headers_sent", getattr(ctx, "request_start", now)),
+                now,
+                status=params.response.status,
+            )
+
+        config.on_request_start.append(on_request_start)
+        config.on_connection_queued_end.append(on_connection_queued_end)
+        config.on_connection_reuseconn.append(on_connection_reuseconn)
+        config.on_connection_create_end.append(on_connection_create_end)
+        config.on_request_headers_sent.append(on_request_headers_sent)
+        config.on_request_end.append(on_request_end)
+        return config
+
+
+class InMemorySpanExporter:
+    """Exporter collecting finished spans in a list, useful for tests."""
+
+    def __init__(self) -> None:
+        """Create empty exporter."""
+        self.spans: list[Span] = []
+
+    def __call__(self, span: Span) -> None:
+        """Store span."""
+        self.spans.append(span)
+
+    def names(self) -> list[str]:
+        """Return names of collected spans."""
+        return [span.name for span in self.spans]
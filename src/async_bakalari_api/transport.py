@@ -0,0 +1,334 @@
+"""Transport (connection pool) configuration for the Bakalari API client."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Generator
+from dataclasses import dataclass, field, replace
+import logging
+from types import TracebackType
+from typing import Any, ClassVar, Protocol
+
+import aiohttp
+
+from .const import REQUEST_TIMEOUT
+from .tracing import NOOP_TRACER, NoopTracer, Tracer
+
+log = logging.getLogger(__name__)
+
+
+class HttpBody(Protocol):
+    """Body stream of :class:`HttpResponse`."""
+
+    def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        """Iterate over body in chunks of at most `n` bytes."""
+        ...
+
+
+class HttpResponse(Protocol):
+    """Part of :class:`aiohttp.ClientResponse` read by the client.
+
+    Implemented by aiohttp responses and by responses replayed from cassette.
+    """
+
+    @property
+    def status(self) -> int:
+        """Return HTTP status code."""
+        ...
+
+    @property
+    def headers(self) -> Any:
+        """Return response headers, :class:`multidict.CIMultiDictProxy`.
+
+        Typed as Any, pyright does not match the cached property of aiohttp
+        against a protocol member.
+        """
+        ...
+
+    @property
+    def content_type(self) -> str:
+        """Return MIME type of body."""
+        ...
+
+    @property
+    def charset(self) -> str | None:
+        """Return charset of body."""
+        ...
+
+    @property
+    def content_length(self) -> int | None:
+        """Return announced body size."""
+        ...
+
+    @property
+    def content(self) -> HttpBody:
+        """Return body stream."""
+        ...
+
+    async def read(self) -> bytes:
+        """Read whole body."""
+        ...
+
+    def release(self) -> Any:
+        """Release connection of response."""
+        ...
+
+
+class HttpRequestContext(Protocol):
+    """Result of :meth:`HttpSession.request`, awaitable or async context."""
+
+    def __await__(self) -> Generator[Any, None, HttpResponse]:
+        """Return response, caller releases it."""
+        ...
+
+    async def __aenter__(self) -> HttpResponse:
+        """Return response released on exit."""
+        ...
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Release response."""
+        ...
+
+
+class HttpSession(Protocol):
+    """Part of :class:`aiohttp.ClientSession` used to send requests."""
+
+    def request(self, method: str, url: str, **kwargs: Any) -> HttpRequestContext:
+        """Send request."""
+        ...
+
+
+@dataclass(frozen=True, slots=True)
+class TransportConfig:
+    """Connection pool and keep-alive settings of the owned :mod:`aiohttp` session.
+
+    Defaults match :class:`aiohttp.TCPConnector` defaults.
+
+    Attributes:
+        limit: Total number of simultaneous connections (0 = unlimited).
+        limit_per_host: Simultaneous connections to one host (0 = unlimited).
+        keepalive_timeout: Seconds an idle connection is kept for reuse.
+        ttl_dns_cache: Seconds DNS results are cached (None = forever).
+        happy_eyeballs_delay: RFC 8305 connection attempt delay (None = disabled).
+        force_close: Close connection after each request (disables keep-alive).
+
+    """
+
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 15.0
+    ttl_dns_cache: int | None = 10
+    happy_eyeballs_delay: float | None = 0.25
+    force_close: bool = False
+
+    def create_connector(self) -> aiohttp.TCPConnector:
+        """Create connector for this configuration."""
+
+        kwargs: dict[str, Any] = {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "ttl_dns_cache": self.ttl_dns_cache,
+            "happy_eyeballs_delay": self.happy_eyeballs_delay,
+            "force_close": self.force_close,
+        }
+        if not self.force_close:
+            # aiohttp refuses keepalive_timeout together with force_close
+            kwargs["keepalive_timeout"] = self.keepalive_timeout
+        return aiohttp.TCPConnector(**kwargs)
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStats:
+    """Connection pool utilization snapshot.
+
+    ``acquired_per_host`` is only filled for connectors with
+    ``limit_per_host`` set, aiohttp does not track hosts of acquired
+    connections otherwise.
+    """
+
+    limit: int
+    limit_per_host: int
+    acquired: int
+    idle: int
+    waiting: int
+    acquired_per_host: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def utilization(self) -> float:
+        """Return ratio of acquired connections to total limit (0 if unlimited)."""
+
+        if not self.limit:
+            return 0.0
+        return self.acquired / self.limit
+
+    def merge(self, other: PoolStats) -> PoolStats:
+        """Return utilization of both pools together."""
+
+        per_host = dict(self.acquired_per_host)
+        for host, count in other.acquired_per_host.items():
+            per_host[host] = per_host.get(host, 0) + count
+        return replace(
+            self,
+            limit=self.limit + other.limit,
+            limit_per_host=self.limit_per_host + other.limit_per_host,
+            acquired=self.acquired + other.acquired,
+            idle=self.idle + other.idle,
+            waiting=self.waiting + other.waiting,
+            acquired_per_host=per_host,
+        )
+
+
+def pool_stats(connector: aiohttp.BaseConnector) -> PoolStats:
+    """Return utilization statistics of connector pool.
+
+    aiohttp does not expose these counters publicly, missing internals
+    are reported as zero. Per host counts come from aiohttp bookkeeping
+    which exists only with ``limit_per_host`` set, unlimited connectors
+    report them empty.
+    """
+
+    acquired = getattr(connector, "_acquired", ())
+    conns = getattr(connector, "_conns", {})
+    waiters = getattr(connector, "_waiters", {})
+    per_host: dict[str, int] = {}
+    for key, protos in getattr(connector, "_acquired_per_host", {}).items():
+        if protos:
+            host = getattr(key, "host", str(key))
+            per_host[host] = per_host.get(host, 0) + len(protos)
+
+    return PoolStats(
+        limit=connector.limit,
+        limit_per_host=connector.limit_per_host,
+        acquired=len(acquired),
+        idle=sum(len(items) for items in conns.values()),
+        waiting=sum(len(items) for items in waiters.values()),
+        acquired_per_host=per_host,
+    )
+
+
+@dataclass(slots=True)
+class _RegistryEntry:
+    session: aiohttp.ClientSession
+    loop: asyncio.AbstractEventLoop
+    refs: int = 0
+
+
+class SessionRegistry:
+    """Process-wide registry of sessions shared per server host.
+
+    Many :class:`ApiClient` instances (one per account) acquire the session for
+    a host from the registry, so connections, TLS sessions and DNS cache are
+    reused across accounts of the same school. Sessions are reference counted
+    and closed when the last client releases them.
+
+    Sessions are shared per host and tracer, the session of a traced client
+    carries the :meth:`Tracer.trace_config` hooks of its tracer.
+    """
+
+    _default: ClassVar[SessionRegistry | None] = None
+
+    def __init__(
+        self,
+        transport: TransportConfig | None = None,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> None:
+        """Create registry; sessions use `transport` connection pool settings."""
+
+        self._transport: TransportConfig = transport or TransportConfig()
+        self._timeout: float = timeout
+        self._entries: dict[tuple[str, Tracer | NoopTracer], _RegistryEntry] = {}
+
+    @classmethod
+    def default(cls) -> SessionRegistry:
+        """Return process-wide default registry."""
+
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def __len__(self) -> int:
+        """Return number of open sessions."""
+        return len(self._entries)
+
+    async def acquire(
+        self, host: str, *, tracer: Tracer | NoopTracer = NOOP_TRACER
+    ) -> aiohttp.ClientSession:
+        """Return shared session for host and increase its reference count."""
+
+        key = (host, tracer)
+        loop = asyncio.get_running_loop()
+        entry = self._entries.get(key)
+        if entry is not None and (entry.session.closed or entry.loop is not loop):
+            # Session belongs to closed or different event loop, it can't be reused.
+            self._entries.pop(key, None)
+            entry = None
+
+        if entry is None:
+            trace_config = tracer.trace_config()
+            session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+                trust_env=True,
+                connector=self._transport.create_connector(),
+                trace_configs=[trace_config] if trace_config is not None else None,
+            )
+            entry = _RegistryEntry(session=session, loop=loop)
+            self._entries[key] = entry
+            log.debug(f"Created shared session for host {host}")
+
+        entry.refs += 1
+        return entry.session
+
+    async def release(
+        self,
+        host: str,
+        session: aiohttp.ClientSession | None = None,
+        *,
+        tracer: Tracer | NoopTracer = NOOP_TRACER,
+    ) -> None:
+        """Decrease reference count of host session, close it when unused.
+
+        If `session` is given, release is ignored when host session was replaced.
+        """
+
+        key = (host, tracer)
+        entry = self._entries.get(key)
+        if entry is None or (session is not None and entry.session is not session):
+            return
+
+        entry.refs -= 1
+        if entry.refs <= 0:
+            del self._entries[key]
+            await entry.session.close()
+            log.debug(f"Closed shared session for host {host}")
+
+    def refcounts(self) -> dict[str, int]:
+        """Return number of clients using session per host."""
+
+        counts: dict[str, int] = {}
+        for (host, _tracer), entry in self._entries.items():
+            counts[host] = counts.get(host, 0) + entry.refs
+        return counts
+
+    def pool_stats(self) -> dict[str, PoolStats]:
+        """Return pool utilization per host (sessions of all tracers together)."""
+
+        stats: dict[str, PoolStats] = {}
+        for (host, _tracer), entry in self._entries.items():
+            if entry.session.closed:
+                continue
+            current = pool_stats(entry.session.connector)  # pyright: ignore[reportArgumentType]
+            stats[host] = stats[host].merge(current) if host in stats else current
+        return stats
+
+    async def close(self) -> None:
+        """Close all sessions regardless of reference counts."""
+
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for entry in entries:
+            await entry.session.close()
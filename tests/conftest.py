@@ -0,0 +1,21 @@
+"""Shared test fixtures."""
+
+import pytest
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Return manually advanced clock."""
+    return FakeClock()
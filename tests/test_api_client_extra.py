@@ -15,7 +15,7 @@ from typing import Any
 import aiohttp
 from aiohttp import hdrs
 from aioresponses import aioresponses
-from async_bakalari_api.api_client import ApiClient
+from async_bakalari_api.api_client import ApiClient, RawResponse
 from async_bakalari_api.exceptions import Ex
 import pytest
 
@@ -92,6 +92,52 @@ async def test_request_non_json_content_type_error_fallback_to_none():
     assert res is None
 
 
+async def test_request_decodes_raw_bytes_with_pluggable_decoder():
+    """Body is handed to decoder as bytes; empty JSON body becomes None."""
+    url = "https://example.com/marks"
+    seen: list[Any] = []
+
+    def decoder(body: bytes | str) -> Any:
+        seen.append(body)
+        return {"decoded": True}
+
+    with aioresponses() as m:
+        m.get(url, status=200, body=b'{"a": 1}')
+        m.get(url, status=200, body=b"  ")
+        async with ApiClient(json_decoder=decoder) as client:
+            assert await client.request(url, hdrs.METH_GET) == {"decoded": True}
+            assert await client.request(url, hdrs.METH_GET) is None
+    assert seen == [b'{"a": 1}']
+
+
+async def test_request_json_decoding_fallbacks():
+    """Non UTF-8, unknown charset and orjson-unsupported input are still decoded."""
+    url = "https://example.com/marks"
+    with aioresponses() as m:
+        m.get(
+            url,
+            status=200,
+            body='{"name": "Žluťoučký"}'.encode("cp1250"),
+            headers={"Content-Type": "application/json; charset=windows-1250"},
+        )
+        m.get(
+            url,
+            status=200,
+            body='{"name": "Žluťoučký"}'.encode(),
+            headers={"Content-Type": "application/json; charset=utf-8-bogus"},
+        )
+        m.get(url, status=200, body=b'{"avg": NaN, "big": 18446744073709551616}')
+        m.get(url, status=200, body=b"{broken")
+        async with ApiClient() as client:
+            assert await client.request(url, hdrs.METH_GET) == {"name": "Žluťoučký"}
+            assert await client.request(url, hdrs.METH_GET) == {"name": "Žluťoučký"}
+            res = await client.request(url, hdrs.METH_GET)
+            assert res["big"] == 2**64
+            assert res["avg"] != res["avg"]  # NaN
+            with pytest.raises(ValueError):
+                await client.request(url, hdrs.METH_GET)
+
+
 # ---------------------------------------------------------------------------
 # _ensure_session / context manager ownership branches
 # ---------------------------------------------------------------------------
@@ -293,3 +339,113 @@ async def test_request_400_without_error_uri_maps_bad_request():
         async with ApiClient() as client:
             with pytest.raises(Ex.BadRequestException):
                 await client.request(url, hdrs.METH_GET)
+
+
+# ---------------------------------------------------------------------------
+# authorized_request coalescing
+# ---------------------------------------------------------------------------
+
+
+async def test_authorized_request_coalesces_identical_gets():
+    """Concurrent identical GETs share one request and the same result."""
+    creds = Creds(access_token="A", refresh_token="R")
+    calls: list[str] = []
+    release = asyncio.Event()
+
+    async with ApiClient(coalesce_requests=True) as client:
+
+        async def fake_request(self, url_: str, method: str, **kw: Any):
+            calls.append(url_)
+            await release.wait()
+            return {"url": url_}
+
+        client.request = fake_request.__get__(client, ApiClient)  # type: ignore[assignment]
+
+        def call(url: str, method: str = hdrs.METH_GET, **kw: Any):
+            return asyncio.create_task(
+                client.authorized_request(
+                    url,
+                    method,
+                    credentials=creds,
+                    refresh_callback=lambda: asyncio.sleep(0),
+                    **kw,
+                )
+            )
+
+        tasks = [call("https://example.com/marks") for _ in range(3)]
+        tasks.append(call("https://example.com/marks", params={"a": "1"}))
+        tasks.append(call("https://example.com/marks", hdrs.METH_POST))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+    assert len(calls) == 3
+    assert results[0] is results[1] is results[2]
+    assert not client._inflight  # noqa: SLF001
+
+
+async def test_authorized_request_coalesced_failure_reaches_every_waiter():
+    """A failure of the shared request is raised to all coalesced callers."""
+    creds = Creds(access_token="A", refresh_token="R")
+    calls = 0
+
+    async with ApiClient(coalesce_requests=True) as client:
+
+        async def fake_request(self, url_: str, method: str, **kw: Any):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            raise Ex.TimeoutException("timeout")
+
+        client.request = fake_request.__get__(client, ApiClient)  # type: ignore[assignment]
+
+        results = await asyncio.gather(
+            *(
+                client.authorized_request(
+                    "https://example.com/marks",
+                    hdrs.METH_GET,
+                    credentials=creds,
+                    refresh_callback=lambda: asyncio.sleep(0),
+                )
+                for _ in range(3)
+            ),
+            return_exceptions=True,
+        )
+
+    assert calls == 1
+    assert all(isinstance(r, Ex.TimeoutException) for r in results)
+
+
+# ---------------------------------------------------------------------------
+# raw passthrough
+# ---------------------------------------------------------------------------
+
+
+async def test_authorized_request_raw_returns_undecoded_body():
+    """raw=True returns body bytes, status and headers; errors still map."""
+    url = "https://example.com/marks"
+    creds = Creds(access_token="A", refresh_token="R")
+    body = b'{"Subjects": []}'
+
+    with aioresponses() as m:
+        m.get(url, status=200, body=body, headers={"ETag": '"v1"'})
+        m.get(url, status=204)
+        m.get(url, status=400, payload={"error_uri": "ID2024"})
+        async with ApiClient(coalesce_requests=True) as client:
+            res = await client.authorized_request(
+                url,
+                hdrs.METH_GET,
+                credentials=creds,
+                refresh_callback=lambda: asyncio.sleep(0),
+                raw=True,
+            )
+            assert isinstance(res, RawResponse)
+            assert res.status == 200
+            assert res.body == body
+            assert res.headers["etag"] == '"v1"'
+
+            empty = await client.request(url, hdrs.METH_GET, raw=True)
+            assert (empty.status, empty.body) == (204, b"")
+
+            with pytest.raises(Ex.InvalidLogin):
+                await client.request(url, hdrs.METH_GET, raw=True)
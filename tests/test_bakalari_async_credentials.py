@@ -3,6 +3,7 @@
 import asyncio
 import contextlib
 from dataclasses import FrozenInstanceError
+import time
 from typing import Any
 
 from async_bakalari_api.bakalari import Bakalari
@@ -213,3 +214,146 @@ async def test_multiple_instances_do_not_share_credentials(monkeypatch):
     }  # allow "ok" if another test's impl reused
     # b2 unchanged
     assert b2.credentials.access_token == "a2"
+
+
+@pytest.mark.asyncio
+async def test_expiring_token_is_refreshed_in_background(monkeypatch):
+    """Token inside refresh margin is refreshed once in background."""
+
+    b = Bakalari(FS, token_refresh_margin=60)
+    object.__setattr__(
+        b,
+        "_credentials",
+        Credentials(access_token="old", refresh_token="r", expires_at=time.time() + 30),
+    )
+    used_tokens: list[str] = []
+    calls = {"refresh": 0}
+
+    async def fake_refresh(self: Bakalari) -> Credentials:
+        async with self._refresh_lock:
+            calls["refresh"] += 1
+            await asyncio.sleep(0)
+            object.__setattr__(
+                self,
+                "_credentials",
+                Credentials(
+                    access_token="new",
+                    refresh_token="r",
+                    expires_at=time.time() + 3600,
+                ),
+            )
+            return self.credentials
+
+    async def fake_send(self, url: str, method: str, headers=None, **kwargs: Any):
+        used_tokens.append((headers or {}).get("Authorization", ""))
+        return "DATA"
+
+    monkeypatch.setattr(Bakalari, "refresh_access_token", fake_refresh)
+    monkeypatch.setattr(
+        "async_bakalari_api.api_client.ApiClient.request", fake_send, raising=False
+    )
+
+    assert await asyncio.gather(
+        b.send_auth_request(EndPoint.MARKS), b.send_auth_request(EndPoint.MARKS)
+    ) == ["DATA", "DATA"]
+    # requests did not wait for refresh and used the still valid token
+    assert used_tokens == ["Bearer old", "Bearer old"]
+    await b._token_refresh_task  # noqa: SLF001
+    assert calls["refresh"] == 1
+
+    await b.send_auth_request(EndPoint.MARKS)
+    assert used_tokens[-1] == "Bearer new"
+    assert calls["refresh"] == 1
+    await b.close()
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_refreshed_before_request(monkeypatch):
+    """Already expired token is refreshed before sending, avoiding 401."""
+
+    b = Bakalari(FS)
+    object.__setattr__(
+        b,
+        "_credentials",
+        Credentials(access_token="old", refresh_token="r", expires_at=time.time() - 1),
+    )
+    used_tokens: list[str] = []
+
+    async def fake_refresh(self: Bakalari) -> Credentials:
+        object.__setattr__(
+            self, "_credentials", Credentials(access_token="new", refresh_token="r")
+        )
+        return self.credentials
+
+    async def fake_send(self, url: str, method: str, headers=None, **kwargs: Any):
+        used_tokens.append((headers or {}).get("Authorization", ""))
+        return "DATA"
+
+    monkeypatch.setattr(Bakalari, "refresh_access_token", fake_refresh)
+    monkeypatch.setattr(
+        "async_bakalari_api.api_client.ApiClient.request", fake_send, raising=False
+    )
+
+    assert await b.send_auth_request(EndPoint.MARKS) == "DATA"
+    assert used_tokens == ["Bearer new"]
+    await b.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_proactive_refresh_falls_back_to_request(monkeypatch, caplog):
+    """Failure of proactive refresh is logged and request continues."""
+
+    b = Bakalari(FS)
+    object.__setattr__(
+        b,
+        "_credentials",
+        Credentials(access_token="old", refresh_token="r", expires_at=time.time() - 1),
+    )
+
+    async def fake_refresh(self: Bakalari) -> Credentials:
+        raise Ex.RefreshTokenExpired("expired")
+
+    async def fake_send(self, url: str, method: str, headers=None, **kwargs: Any):
+        return "DATA"
+
+    monkeypatch.setattr(Bakalari, "refresh_access_token", fake_refresh)
+    monkeypatch.setattr(
+        "async_bakalari_api.api_client.ApiClient.request", fake_send, raising=False
+    )
+
+    assert await b.send_auth_request(EndPoint.MARKS) == "DATA"
+    assert "Proactive token refresh failed" in caplog.text
+    await b.close()
+
+
+@pytest.mark.asyncio
+async def test_context_exit_cancels_background_token_refresh(monkeypatch):
+    """Leaving context manager mid-refresh cancels the refresh task."""
+
+    started = asyncio.Event()
+
+    async def hanging_refresh(self: Bakalari) -> Credentials:
+        started.set()
+        await asyncio.Event().wait()
+        return self.credentials
+
+    async def fake_send(self, url: str, method: str, headers=None, **kwargs: Any):
+        return "DATA"
+
+    monkeypatch.setattr(Bakalari, "refresh_access_token", hanging_refresh)
+    monkeypatch.setattr(
+        "async_bakalari_api.api_client.ApiClient.request", fake_send, raising=False
+    )
+
+    async with Bakalari(FS, token_refresh_margin=60) as b:
+        object.__setattr__(
+            b,
+            "_credentials",
+            Credentials(
+                access_token="a", refresh_token="r", expires_at=time.time() + 5
+            ),
+        )
+        assert await b.send_auth_request(EndPoint.MARKS) == "DATA"
+        await started.wait()
+        task = b._token_refresh_task  # noqa: SLF001
+    assert task is not None and task.cancelled()
@@ -0,0 +1,143 @@
+"""Tests for per-server circuit breaker."""
+
+from aiohttp import hdrs
+from aioresponses import aioresponses
+from async_bakalari_api.api_client import ApiClient
+from async_bakalari_api.breaker import (
+    BreakerState,
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitBreakerRegistry,
+)
+from async_bakalari_api.exceptions import Ex
+from async_bakalari_api.metrics import InMemoryMetrics
+from async_bakalari_api.retry import RetryPolicy
+import pytest
+from yarl import URL
+
+URL_MARKS = "https://school-a.example/api/3/marks"
+URL_OTHER = "https://school-b.example/api/3/marks"
+
+
+def test_breaker_opens_on_failure_rate_and_recovers(clock):
+    """Closed -> open -> half-open -> closed."""
+
+    cfg = CircuitBreakerConfig(
+        failure_rate_threshold=0.5, minimum_calls=4, window_size=4, cooldown=10
+    )
+    breaker = CircuitBreaker("h", cfg, clock)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state is BreakerState.CLOSED  # below minimum calls
+    breaker.record_success()
+    assert breaker.state is BreakerState.CLOSED  # 3/4 -> evaluated on failure
+    breaker.record_failure()
+    assert breaker.state is BreakerState.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() == 10
+
+    clock.now += 10
+    assert breaker.state is BreakerState.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial call
+    breaker.record_success()
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.stats().failure_rate == 0.0
+    assert breaker.stats().opened_count == 1
+
+
+def test_failed_trial_reopens_and_ignored_trial_is_released(clock):
+    """Failure in half-open state opens circuit again."""
+
+    breaker = CircuitBreaker(
+        "h", CircuitBreakerConfig(minimum_calls=1, cooldown=5), clock
+    )
+    breaker.record_failure()
+    clock.now += 5
+    assert breaker.allow()
+    breaker.record_ignored()
+    assert breaker.allow()  # trial slot released
+    breaker.record_failure()
+    assert breaker.state is BreakerState.OPEN
+    assert breaker.stats().opened_count == 2
+
+
+async def test_api_client_fails_fast_on_open_circuit(clock):
+    """Open circuit raises CircuitOpen without sending; other hosts unaffected."""
+
+    breakers = CircuitBreakerRegistry(
+        CircuitBreakerConfig(minimum_calls=2, cooldown=30), clock
+    )
+    with aioresponses() as m:
+        m.get(URL_MARKS, status=503, repeat=True)
+        m.get(URL_OTHER, payload={"ok": True})
+        async with ApiClient(circuit_breakers=breakers) as client:
+            for _ in range(2):
+                with pytest.raises(Ex.ServiceUnavailable):
+                    await client.request(URL_MARKS, hdrs.METH_GET)
+            assert client.breaker_states() == {"school-a.example": "open"}
+
+            with pytest.raises(Ex.CircuitOpen) as exc:
+                await client.request(URL_MARKS, hdrs.METH_GET)
+            assert exc.value.retry_after == 30
+            assert len(m.requests[("GET", URL(URL_MARKS))]) == 2
+
+            assert await client.request(URL_OTHER, hdrs.METH_GET) == {"ok": True}
+            assert client.breaker_states()["school-b.example"] == "closed"
+
+
+async def test_client_errors_count_as_success_and_open_circuit_is_not_retried(
+    monkeypatch,
+):
+    """4xx answers keep circuit closed; CircuitOpen is not retried."""
+
+    async def fake_sleep(_delay: float):
+        return None
+
+    monkeypatch.setattr("async_bakalari_api.api_client.asyncio.sleep", fake_sleep)
+    breakers = CircuitBreakerRegistry(CircuitBreakerConfig(minimum_calls=1))
+    with aioresponses() as m:
+        m.get(URL_MARKS, status=404)
+        m.get(URL_MARKS, exception=TimeoutError(), repeat=True)
+        async with ApiClient(
+            circuit_breakers=breakers, retry_policy=RetryPolicy(max_attempts=5)
+        ) as client:
+            with pytest.raises(Ex.BadRequestException):
+                await client.request(URL_MARKS, hdrs.METH_GET)
+            assert breakers.get("school-a.example").state is BreakerState.CLOSED
+
+            with pytest.raises(Ex.CircuitOpen):
+                await client.request(URL_MARKS, hdrs.METH_GET)
+        # 404 + one timeout (1/2 failures opens), then the breaker stops retries
+        assert len(m.requests[("GET", URL(URL_MARKS))]) == 2
+
+
+def test_api_client_without_breakers_reports_no_states():
+    """Breakers are disabled by default."""
+
+    assert ApiClient().breaker_states() == {}
+
+
+async def test_transitions_are_reported_to_client_metrics(clock):
+    """Registry without own metrics reports to metrics of its client."""
+
+    metrics = InMemoryMetrics()
+    breakers = CircuitBreakerRegistry(
+        CircuitBreakerConfig(minimum_calls=1, cooldown=5), clock
+    )
+    breakers.get("school-a.example").record_failure()
+    with aioresponses() as m:
+        m.get(URL_MARKS, payload={"ok": True})
+        async with ApiClient(circuit_breakers=breakers, metrics=metrics) as client:
+            clock.now += 5
+            await client.request(URL_MARKS, hdrs.METH_GET)
+
+    name = "bakalari_circuit_breaker_transitions_total"
+    assert breakers.metrics is metrics
+    assert metrics.counter(name, host="school-a.example", to="half_open") == 1
+    assert metrics.counter(name, host="school-a.example", to="closed") == 1
+    assert 'from="half_open",host="school-a.example",to="closed"' in (
+        metrics.to_prometheus()
+    )
@@ -0,0 +1,392 @@
+"""Tests for response caching helpers."""
+
+import asyncio
+
+from aiohttp import hdrs
+from aioresponses import aioresponses
+from async_bakalari_api.api_client import ApiClient
+from async_bakalari_api.bakalari import Bakalari
+from async_bakalari_api.cache import (
+    CacheEntry,
+    DiskCacheBackend,
+    MemoryCacheBackend,
+    ResponseCache,
+    ValidatorCache,
+)
+from async_bakalari_api.const import EndPoint
+from async_bakalari_api.datastructure import Credentials
+from async_bakalari_api.exceptions import Ex
+import pytest
+from yarl import URL
+
+fs = "http://fake_server"
+
+
+def test_validator_cache_key_ignores_param_order():
+    """Keys are built from normalized query params."""
+
+    k1 = ValidatorCache.make_key("get", "u", {"a": 1, "b": 2}, "user")
+    k2 = ValidatorCache.make_key("GET", "u", {"b": 2, "a": 1}, "user")
+    k3 = ValidatorCache.make_key("GET", "u", {"b": 2, "a": 1}, "other")
+    assert k1 == k2
+    assert k1 != k3
+
+
+def test_validator_cache_store_requires_validator_and_evicts_lru():
+    """Only responses with validators are stored; oldest entries are evicted."""
+
+    cache = ValidatorCache(max_entries=2)
+    k1 = cache.make_key("GET", "u1")
+    k2 = cache.make_key("GET", "u2")
+    k3 = cache.make_key("GET", "u3")
+
+    assert cache.store(k1, {}, {"x": 1}) is False
+    assert cache.conditional_headers(k1) == {}
+
+    assert cache.store(k1, {hdrs.ETAG: '"1"'}, {"x": 1})
+    assert cache.store(k2, {hdrs.LAST_MODIFIED: "Mon, 01 Jan 2024 00:00:00 GMT"}, 2)
+    assert cache.conditional_headers(k1) == {hdrs.IF_NONE_MATCH: '"1"'}
+    assert cache.conditional_headers(k2) == {
+        hdrs.IF_MODIFIED_SINCE: "Mon, 01 Jan 2024 00:00:00 GMT"
+    }
+
+    # touch k1 so k2 becomes the least recently used entry
+    assert cache.get(k1) is not None
+    cache.store(k3, {hdrs.ETAG: '"3"'}, 3)
+    assert len(cache) == 2
+    assert cache.get(k2) is None
+
+    cache.invalidate(k1)
+    assert cache.get(k1) is None
+    cache.clear()
+    assert len(cache) == 0
+
+
+async def test_request_sends_validators_and_returns_cached_payload_on_304():
+    """Second request is conditional and 304 returns previously parsed payload."""
+
+    url = "https://example.com/api/3/marks"
+    cache = ValidatorCache()
+    payload = {"Subjects": [1, 2, 3]}
+
+    with aioresponses() as m:
+        m.get(url, status=200, payload=payload, headers={"ETag": '"v1"'})
+        m.get(url, status=304)
+        async with ApiClient(validator_cache=cache) as client:
+            first = await client.request(url, hdrs.METH_GET, cache_owner="u1")
+            second = await client.request(url, hdrs.METH_GET, cache_owner="u1")
+
+        assert first == payload
+        assert second == payload
+        calls = m.requests[("GET", URL(url))]
+        assert hdrs.IF_NONE_MATCH not in calls[0].kwargs["headers"]
+        assert calls[1].kwargs["headers"][hdrs.IF_NONE_MATCH] == '"v1"'
+
+
+async def test_request_304_without_cache_entry_raises():
+    """Unexpected 304 keeps raising BadRequestException."""
+
+    url = "https://example.com/api/3/marks"
+    with aioresponses() as m:
+        m.get(url, status=304)
+        async with ApiClient(validator_cache=ValidatorCache()) as client:
+            with pytest.raises(Ex.BadRequestException):
+                await client.request(url, hdrs.METH_GET)
+
+
+async def test_request_without_cache_sends_no_validators():
+    """Validator cache is opt-in."""
+
+    url = "https://example.com/api/3/marks"
+    with aioresponses() as m:
+        m.get(url, status=200, payload={}, headers={"ETag": '"v1"'})
+        m.get(url, status=200, payload={})
+        async with ApiClient() as client:
+            await client.request(url, hdrs.METH_GET)
+            await client.request(url, hdrs.METH_GET)
+
+        calls = m.requests[("GET", URL(url))]
+        assert hdrs.IF_NONE_MATCH not in calls[1].kwargs["headers"]
+
+
+async def test_send_auth_request_uses_validator_cache_per_user():
+    """Bakalari wires validator cache and keys entries by user."""
+
+    cache = ValidatorCache()
+    bakalari = Bakalari(fs, validator_cache=cache)
+    object.__setattr__(
+        bakalari,
+        "_credentials",
+        Credentials(access_token="at", refresh_token="rt", user_id="pupil"),
+    )
+    payload = {"Subjects": []}
+
+    with aioresponses() as m:
+        m.get(
+            fs + EndPoint.MARKS.endpoint,
+            status=200,
+            payload=payload,
+            headers={"ETag": '"m1"'},
+        )
+        m.get(fs + EndPoint.MARKS.endpoint, status=304)
+        assert await bakalari.send_auth_request(EndPoint.MARKS) == payload
+        assert await bakalari.send_auth_request(EndPoint.MARKS) == payload
+
+    key = cache.make_key("GET", fs + EndPoint.MARKS.endpoint, None, "pupil")
+    assert cache.get(key) is not None
+    await bakalari.close()
+
+
+def test_endpoint_ttl_defaults():
+    """Read endpoints carry TTL, mutating endpoints are not cacheable."""
+
+    assert EndPoint.TIMETABLE_PERMANENT.ttl == 86400
+    assert EndPoint.MARKS.ttl == 300
+    assert EndPoint.KOMENS_UNREAD_COUNT.ttl == 30
+    assert EndPoint.LOGIN.ttl == 0
+    assert EndPoint.KOMENS_MARK_READ.ttl == 0
+    assert EndPoint.SIGN_MARKS.ttl == 0
+
+
+def test_response_cache_key_and_ttl_overrides():
+    """Keys contain owner, endpoint, URL and params; TTL can be overridden."""
+
+    cache = ResponseCache(ttl_overrides={EndPoint.MARKS: 5})
+    assert cache.ttl_for(EndPoint.MARKS) == 5
+    assert cache.ttl_for(EndPoint.TIMETABLE_ACTUAL) == 300
+    assert (
+        ResponseCache.make_key(EndPoint.TIMETABLE_ACTUAL, "http://s/t", "u", {"d": 1})
+        == "u|TIMETABLE_ACTUAL|http://s/t|d=1"
+    )
+
+
+async def test_memory_backend_lru_bound():
+    """Memory backend evicts least recently used entries."""
+
+    backend = MemoryCacheBackend(max_entries=2)
+    await backend.set("a", CacheEntry(1, 0, 10))
+    await backend.set("b", CacheEntry(2, 0, 10))
+    assert await backend.get("a") is not None
+    await backend.set("c", CacheEntry(3, 0, 10))
+    assert len(backend) == 2
+    assert await backend.get("b") is None
+    await backend.delete("a")
+    assert await backend.get("a") is None
+    await backend.clear()
+    assert len(backend) == 0
+
+
+async def test_disk_backend_roundtrip(tmp_path):
+    """Disk backend persists JSON payloads and skips unserializable values."""
+
+    backend = DiskCacheBackend(str(tmp_path / "cache"))
+    await backend.set("k", CacheEntry({"x": [1, 2]}, 1.0, 2.0))
+    assert await DiskCacheBackend(str(tmp_path / "cache")).get("k") == CacheEntry(
+        {"x": [1, 2]}, 1.0, 2.0
+    )
+    assert await backend.get("missing") is None
+
+    await backend.set("bytes", CacheEntry(object(), 1.0, 2.0))
+    assert await backend.get("bytes") is None
+
+    await backend.delete("k")
+    await backend.delete("k")
+    assert await backend.get("k") is None
+
+    await backend.set("k2", CacheEntry(1, 1.0, 2.0))
+    await backend.clear()
+    assert await backend.get("k2") is None
+
+
+async def test_disk_backend_concurrent_writes_of_one_key(tmp_path):
+    """Concurrent writers of a key leave one complete entry and no temp files."""
+
+    backend = DiskCacheBackend(str(tmp_path / "cache"))
+    await asyncio.gather(
+        *(backend.set("k", CacheEntry({"v": [i] * 1000}, 1.0, 2.0)) for i in range(20))
+    )
+    entry = await backend.get("k")
+    assert entry is not None
+    assert len(set(entry.value["v"])) == 1
+    assert [p.suffix for p in (tmp_path / "cache").iterdir()] == [".json"]
+
+
+async def test_response_cache_fresh_hit_and_expiry(monkeypatch):
+    """Fresh entries are served from cache, expired entries are refetched."""
+
+    now = 1000.0
+    monkeypatch.setattr("async_bakalari_api.cache.time.time", lambda: now)
+    cache = ResponseCache()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await cache.get_or_fetch("k", 10, fetch) == 1
+    assert await cache.get_or_fetch("k", 10, fetch) == 1
+    now = 1011.0
+    assert await cache.get_or_fetch("k", 10, fetch) == 2
+    await cache.invalidate("k")
+    assert await cache.get_or_fetch("k", 10, fetch) == 3
+    await cache.clear()
+    assert await cache.get_or_fetch("k", 10, fetch) == 4
+
+
+async def test_response_cache_stale_while_revalidate(monkeypatch):
+    """Stale entry is returned immediately and refreshed in background once."""
+
+    now = 1000.0
+    monkeypatch.setattr("async_bakalari_api.cache.time.time", lambda: now)
+    cache = ResponseCache(stale_while_revalidate=60)
+    release = asyncio.Event()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        if calls > 1:
+            await release.wait()
+        return calls
+
+    assert await cache.get_or_fetch("k", 10, fetch) == 1
+    now = 1020.0
+    assert await cache.get_or_fetch("k", 10, fetch) == 1
+    assert await cache.get_or_fetch("k", 10, fetch) == 1
+    release.set()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert calls == 2
+    assert await cache.get_or_fetch("k", 10, fetch) == 2
+
+    # beyond the stale window the request waits for fresh data
+    now = 2000.0
+    assert await cache.get_or_fetch("k", 10, fetch) == 3
+
+
+async def test_response_cache_background_failure_is_logged(monkeypatch, caplog):
+    """Failed background refresh keeps stale entry and logs a warning."""
+
+    now = 1000.0
+    monkeypatch.setattr("async_bakalari_api.cache.time.time", lambda: now)
+    cache = ResponseCache(stale_while_revalidate=60)
+
+    async def ok():
+        return "old"
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    await cache.get_or_fetch("k", 10, ok)
+    now = 1015.0
+    assert await cache.get_or_fetch("k", 10, fail) == "old"
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert "Background refresh of k failed" in caplog.text
+    await cache.close()
+
+
+async def test_send_auth_request_uses_response_cache():
+    """Cached endpoints hit the server once, non cacheable endpoints always."""
+
+    bakalari = Bakalari(fs, response_cache=ResponseCache())
+    object.__setattr__(
+        bakalari,
+        "_credentials",
+        Credentials(access_token="at", refresh_token="rt", user_id="pupil"),
+    )
+
+    with aioresponses() as m:
+        m.get(fs + EndPoint.KOMENS_UNREAD_COUNT.endpoint, status=200, payload=3)
+        assert await bakalari.send_auth_request(EndPoint.KOMENS_UNREAD_COUNT) == 3
+        assert await bakalari.send_auth_request(EndPoint.KOMENS_UNREAD_COUNT) == 3
+        assert (
+            len(m.requests[("GET", URL(fs + EndPoint.KOMENS_UNREAD_COUNT.endpoint))])
+            == 1
+        )
+
+        # raw passthrough bypasses decoded response cache
+        m.get(fs + EndPoint.KOMENS_UNREAD_COUNT.endpoint, status=200, body=b"3")
+        raw = await bakalari.send_auth_request(EndPoint.KOMENS_UNREAD_COUNT, raw=True)
+        assert raw.body == b"3"
+        assert (
+            len(m.requests[("GET", URL(fs + EndPoint.KOMENS_UNREAD_COUNT.endpoint))])
+            == 2
+        )
+
+        m.put(fs + EndPoint.KOMENS_MARK_READ.endpoint + "/1/mark-as-read", status=204)
+        m.put(fs + EndPoint.KOMENS_MARK_READ.endpoint + "/1/mark-as-read", status=204)
+        await bakalari.send_auth_request(
+            EndPoint.KOMENS_MARK_READ, extend="/1/mark-as-read"
+        )
+        await bakalari.send_auth_request(
+            EndPoint.KOMENS_MARK_READ, extend="/1/mark-as-read"
+        )
+        assert (
+            len(
+                m.requests[
+                    (
+                        "PUT",
+                        URL(
+                            fs + EndPoint.KOMENS_MARK_READ.endpoint + "/1/mark-as-read"
+                        ),
+                    )
+                ]
+            )
+            == 2
+        )
+
+    await bakalari.close()
+
+
+async def test_shared_response_cache_is_isolated_per_server_and_owner():
+    """Accounts of different schools never see each other's responses."""
+
+    cache = ResponseCache(stale_while_revalidate=60)
+    url = EndPoint.KOMENS_UNREAD_COUNT.endpoint
+    a = Bakalari("http://a", Credentials(None, "a", "r"), response_cache=cache)
+    b = Bakalari("http://b", Credentials(None, "b", "r"), response_cache=cache)
+
+    with aioresponses() as m:
+        m.get("http://a" + url, payload={"who": "A"}, repeat=True)
+        m.get("http://b" + url, payload={"who": "B"}, repeat=True)
+        # Without user id or username nothing is cached.
+        assert await a.send_auth_request(EndPoint.KOMENS_UNREAD_COUNT) == {"who": "A"}
+        assert await a.send_auth_request(EndPoint.KOMENS_UNREAD_COUNT) == {"who": "A"}
+        assert len(m.requests[("GET", URL("http://a" + url))]) == 2
+
+        object.__setattr__(a, "_credentials", Credentials("u", "a", "r", "1"))
+        object.__setattr__(b, "_credentials", Credentials("u", "b", "r", "1"))
+        assert await a.send_auth_request(EndPoint.KOMENS_UNREAD_COUNT) == {"who": "A"}
+        assert await b.send_auth_request(EndPoint.KOMENS_UNREAD_COUNT) == {"who": "B"}
+        assert await b.send_auth_request(EndPoint.KOMENS_UNREAD_COUNT) == {"who": "B"}
+        assert len(m.requests[("GET", URL("http://b" + url))]) == 1
+
+    await a.close()
+    await b.close()
+
+
+async def test_closing_account_keeps_other_refreshes_of_shared_cache():
+    """Close cancels only background refreshes of the closed instance."""
+
+    cache = ResponseCache()
+    a = Bakalari(fs, Credentials("a", "at", "rt", "a"), response_cache=cache)
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+
+    cache._schedule_refresh("other", 10, slow)
+    with aioresponses() as m:
+        m.get(fs + EndPoint.KOMENS_UNREAD_COUNT.endpoint, payload=1)
+        await a.send_auth_request(EndPoint.KOMENS_UNREAD_COUNT)
+    (own,) = a._response_cache_keys
+    cache._schedule_refresh(own, 10, slow)
+    own_task = cache._refreshing[own]
+
+    await a.close()
+    assert own_task.cancelled()
+    assert "other" in cache._refreshing
+    release.set()
+    await cache.close()
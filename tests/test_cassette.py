@@ -0,0 +1,121 @@
+"""Tests for record/replay cassette transport."""
+
+from aioresponses import aioresponses
+from async_bakalari_api.bakalari import Bakalari
+from async_bakalari_api.cassette import (
+    Cassette,
+    CassetteMode,
+    recorded_latency,
+    uniform_latency,
+)
+from async_bakalari_api.const import EndPoint
+from async_bakalari_api.datastructure import Credentials
+from async_bakalari_api.exceptions import Ex
+from async_bakalari_api.komens import Komens
+import orjson
+import pytest
+
+fs = "http://fake_server"
+MARKS_URL = fs + EndPoint.MARKS.endpoint
+ATTACHMENT_URL = fs + EndPoint.KOMENS_ATTACHMENT.endpoint + "/1"
+BINARY = bytes(range(256)) * 4
+LOGIN_PAYLOAD = {
+    "bak:UserId": "user",
+    "access_token": "access",
+    "refresh_token": "refresh",
+}
+
+
+def make_bakalari(cassette: Cassette) -> Bakalari:
+    """Return Bakalari with credentials using cassette."""
+
+    return Bakalari(
+        fs,
+        credentials=Credentials(access_token="token", refresh_token="ref"),
+        cassette=cassette,
+    )
+
+
+async def test_record_then_replay_without_network(tmp_path):
+    """Recorded JSON and binary responses are served offline."""
+
+    path = tmp_path / "session.jsonl"
+    bakalari = make_bakalari(Cassette(path, CassetteMode.RECORD))
+    with aioresponses() as m:
+        m.get(MARKS_URL, payload={"Subjects": [1]})
+        m.get(
+            ATTACHMENT_URL,
+            body=BINARY,
+            headers={
+                "Content-Type": "application/octet-stream",
+                "Content-Disposition": "attachment; filename*=UTF-8''a.bin",
+            },
+        )
+        assert await bakalari.send_auth_request(EndPoint.MARKS) == {"Subjects": [1]}
+        recorded = await bakalari.send_auth_request(EndPoint.KOMENS_ATTACHMENT, "/1")
+    await bakalari.close()
+    assert recorded == ["a.bin", BINARY]
+
+    lines = [orjson.loads(line) for line in path.read_bytes().splitlines()]
+    assert [line["url"] for line in lines] == [MARKS_URL, ATTACHMENT_URL]
+    assert "body_b64" in lines[1]
+
+    bakalari = make_bakalari(Cassette(path))
+    assert await bakalari.send_auth_request(EndPoint.MARKS) == {"Subjects": [1]}
+    async with Komens(bakalari).stream_attachment("1", chunk_size=100) as stream:
+        assert stream.filename == "a.bin"
+        assert b"".join([chunk async for chunk in stream]) == BINARY
+    await bakalari.close()
+
+
+async def test_replay_matches_body_digest_and_serves_in_order(tmp_path):
+    """Login bodies are matched by digest, passwords are not stored."""
+
+    path = tmp_path / "cassettes"
+    bakalari = Bakalari(fs, cassette=Cassette(path, CassetteMode.RECORD))
+    with aioresponses() as m:
+        m.post(fs + EndPoint.LOGIN.endpoint, payload=LOGIN_PAYLOAD)
+        m.get(MARKS_URL, payload={"n": 1})
+        m.get(MARKS_URL, payload={"n": 2})
+        await bakalari.first_login("user", "secret")
+        await bakalari.send_auth_request(EndPoint.MARKS)
+        await bakalari.send_auth_request(EndPoint.MARKS)
+    await bakalari.close()
+
+    stored = (path / "fake_server.jsonl").read_text()
+    assert "secret" not in stored
+
+    cassette = Cassette(path)
+    bakalari = Bakalari(fs, cassette=cassette)
+    with pytest.raises(Ex.ReplayMiss):
+        await bakalari.first_login("user", "wrong")
+    credentials = await bakalari.first_login("user", "secret")
+    assert credentials.access_token == "access"
+    assert len(cassette) == 3
+    results = [(await bakalari.send_auth_request(EndPoint.MARKS))["n"] for _ in "abc"]
+    assert results == [1, 2, 2]
+    await bakalari.close()
+
+
+async def test_replay_simulates_latency(tmp_path, monkeypatch):
+    """Latency model decides replay delay."""
+
+    path = tmp_path / "session.jsonl"
+    cassette = Cassette(path, CassetteMode.RECORD)
+    bakalari = make_bakalari(cassette)
+    with aioresponses() as m:
+        m.get(MARKS_URL, payload={})
+        await bakalari.send_auth_request(EndPoint.MARKS)
+    await bakalari.close()
+
+    delays: list[float] = []
+
+    async def fake_sleep(delay: float):
+        delays.append(delay)
+
+    monkeypatch.setattr("async_bakalari_api.cassette.asyncio.sleep", fake_sleep)
+    for latency in (recorded_latency(0), uniform_latency(20, 20)):
+        bakalari = make_bakalari(Cassette(path, latency=latency))
+        await bakalari.send_auth_request(EndPoint.MARKS)
+        await bakalari.close()
+    assert delays == [0.0, 0.02]
@@ -0,0 +1,163 @@
+"""Tests for pluggable credential stores."""
+
+import asyncio
+import sqlite3
+import threading
+
+from aioresponses import aioresponses
+from async_bakalari_api.bakalari import Bakalari
+from async_bakalari_api.const import EndPoint
+from async_bakalari_api.credential_store import (
+    FileCredentialStore,
+    SQLiteCredentialStore,
+)
+from async_bakalari_api.datastructure import Credentials
+from async_bakalari_api.mock_server import MockBakalariServer, MockData
+from async_bakalari_api.persistence import CredentialWriter
+from async_bakalari_api.pool import BakalariPool
+import orjson
+import pytest
+
+fs = "http://fake_server"
+
+
+async def test_file_store_is_compatible_with_save_credentials(tmp_path):
+    """Files written by store and by Bakalari.save_credentials are interchangeable."""
+
+    credentials = Credentials("user", "a", "r", "id", 123.0)
+    Bakalari(fs, credentials=credentials).save_credentials(str(tmp_path / "old.json"))
+    store = FileCredentialStore(str(tmp_path), writer=CredentialWriter(delay=60))
+
+    assert await store.load("old.json") == credentials
+    await store.save("new.json", credentials)
+    assert await store.load("new.json") == credentials
+    await store.flush()
+    loaded = Bakalari(fs)
+    assert loaded.load_credentials(str(tmp_path / "new.json")) == credentials
+
+    assert set(await store.load_all()) == {"old.json", "new.json"}
+    await store.delete("old.json")
+    assert await store.load("old.json") is None
+    await store.close()
+
+
+async def test_sqlite_store_batches_upserts_in_wal_mode(tmp_path):
+    """Saves of many accounts are written in one transaction."""
+
+    path = str(tmp_path / "credentials.db")
+    store = SQLiteCredentialStore(path, batch_delay=60)
+    for i in range(100):
+        await store.save(f"acc{i}", Credentials(f"u{i}", f"a{i}", "r", None, None))
+    await store.save("acc0", Credentials("u0", "newer", "r", None, 1.5))
+    assert store.pending == 100
+    assert (await store.load("acc0")).access_token == "newer"
+
+    everything = await store.load_all()
+    assert store.pending == 0
+    assert len(everything) == 100
+    assert everything["acc0"].expires_at == 1.5
+    await store.delete("acc1")
+    assert await store.load("acc1") is None
+    await store.close()
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("SELECT COUNT(*) FROM credentials").fetchone()[0] == 99
+    reopened = SQLiteCredentialStore(path)
+    assert (await reopened.load("acc0")).access_token == "newer"
+    await reopened.close()
+
+
+async def test_sqlite_store_keeps_batch_when_upsert_fails(tmp_path, caplog):
+    """Failed batch stays queued without overwriting newer saves."""
+
+    store = SQLiteCredentialStore(str(tmp_path / "c.db"), batch_delay=0)
+    upsert = store._upsert
+    newer = Credentials("u", "newer", "r")
+
+    def failing_upsert(rows):
+        store._pending["acc0"] = newer  # saved while batch was written
+        raise sqlite3.OperationalError("database is locked")
+
+    store._upsert = failing_upsert
+    await store.save("acc0", Credentials("u", "old", "r"))
+    await store.save("acc1", Credentials("u", "a1", "r"))
+    await store._timer
+    assert "Unable to save credentials" in caplog.text
+    assert store.pending == 2
+    assert (await store.load("acc0")) is newer
+
+    with pytest.raises(sqlite3.OperationalError):
+        await store.flush()
+    assert store.pending == 2
+
+    store._upsert = upsert
+    await store.close()
+    reopened = SQLiteCredentialStore(str(tmp_path / "c.db"))
+    saved = await reopened.load_all()
+    assert {key: c.access_token for key, c in saved.items()} == {
+        "acc0": "newer",
+        "acc1": "a1",
+    }
+    await reopened.close()
+
+
+async def test_sqlite_store_writes_saves_queued_during_upsert(tmp_path):
+    """Save queued while batch is upserted is written by the same timer."""
+
+    store = SQLiteCredentialStore(str(tmp_path / "c.db"), batch_delay=0)
+    upsert = store._upsert
+    started = threading.Event()
+    proceed = threading.Event()
+
+    def slow_upsert(rows):
+        started.set()
+        proceed.wait(5)
+        upsert(rows)
+
+    store._upsert = slow_upsert
+    await store.save("acc0", Credentials("u", "a0", "r"))
+    await asyncio.to_thread(started.wait, 5)
+    await store.save("acc1", Credentials("u", "a1", "r"))
+    proceed.set()
+    await store._timer
+    assert store.pending == 0
+
+    reopened = SQLiteCredentialStore(str(tmp_path / "c.db"))
+    assert set(await reopened.load_all()) == {"acc0", "acc1"}
+    await reopened.close()
+    await store.close()
+
+
+async def test_bakalari_and_pool_save_refreshed_tokens_to_store(tmp_path):
+    """Auto-cached credentials go to the store under cache_filename / account id."""
+
+    store = SQLiteCredentialStore(str(tmp_path / "c.db"))
+    await store.save("me", Credentials(access_token="a", refresh_token="r"))
+    bakalari = Bakalari(
+        fs, auto_cache_credentials=True, cache_filename="me", credential_store=store
+    )
+    assert bakalari.credentials.access_token is None
+    assert (await bakalari.async_load_credentials()).refresh_token == "r"
+    with aioresponses() as m:
+        m.post(
+            fs + EndPoint.LOGIN.endpoint,
+            payload={"access_token": "new_a", "refresh_token": "new_r"},
+        )
+        await bakalari.refresh_access_token()
+    await bakalari.close()
+    assert (await store.load("me")).access_token == "new_a"
+
+    async with MockBakalariServer(MockData()) as server:
+        pool = BakalariPool(credential_store=store)
+        pool.register("kid", server.url, Credentials())
+        await pool.run("kid", lambda b: b.first_login("kid", "pass"))
+        await pool.close()
+    assert (await store.load_all())["kid"].username == "kid"
+    await store.close()
+
+    bakalari = Bakalari(fs, cache_filename=str(tmp_path / "plain.json"))
+    assert await bakalari.async_save_credentials()
+    assert orjson.loads((tmp_path / "plain.json").read_bytes())["username"] is None
+    assert await bakalari.async_load_credentials()
+    await bakalari.close()
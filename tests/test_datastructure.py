@@ -1,8 +1,10 @@
 """Test datastructures."""
 
+import base64
 import logging
 import os
 import tempfile
+import time
 
 from async_bakalari_api.bakalari import Credentials, Schools
 from async_bakalari_api.datastructure import UniqueTowns
@@ -338,3 +340,131 @@ def test_get_towns_partial_name():
     towns.towns_list.append("Town C")
     assert towns.get_towns_partial_name("own") == ["Town A", "Town B", "Town C"]
     assert towns.get_towns_partial_name("own A") == ["Town A"]
+
+
+def _jwt(claims: dict) -> str:
+    """Build unsigned JWT with given claims."""
+
+    def enc(data: dict) -> str:
+        return base64.urlsafe_b64encode(orjson.dumps(data)).rstrip(b"=").decode()
+
+    return f"{enc({'alg': 'none'})}.{enc(claims)}.sig"
+
+
+def test_credentials_expiration_from_expires_in_and_jwt():
+    """Expiration comes from `expires_in` first, then from JWT `exp` claim."""
+
+    before = time.time()
+    creds = Credentials.create({"access_token": _jwt({"exp": 1}), "expires_in": 3600})
+    assert creds.expires_at is not None
+    assert before + 3600 <= creds.expires_at <= time.time() + 3600
+
+    creds = Credentials.create({"access_token": _jwt({"exp": 2000})})
+    assert creds.expires_at == 2000.0
+    assert creds.expires_in(now=1500) == 500
+
+    for token in ("opaque", "a.!!!.c", _jwt({"sub": "x"}), None):
+        creds = Credentials.create({"access_token": token})
+        assert creds.expires_at is None
+        assert creds.expires_in() is None
+
+
+def test_credentials_expiration_roundtrip_json():
+    """Stored `expires_at` is restored from JSON credentials."""
+
+    data = {
+        "user_id": "id",
+        "access_token": "opaque",
+        "refresh_token": "rt",
+        "username": "u",
+        "expires_at": 1234.5,
+    }
+    creds = Credentials.create_from_json(data)
+    assert creds.expires_at == 1234.5
+    assert Credentials.create_from_json(orjson.loads(orjson.dumps(creds))) == creds
+
+
+def _directory() -> Schools:
+    schools = Schools()
+    schools.append_school("Základní škola Brno, Úvoz 55", "https://a", "Brno")
+    schools.append_school("Gymnázium Brno, Slovanské nám.", "https://b", "Brno")
+    schools.append_school("ZŠ a MŠ Šlapanice", "https://c", "Šlapanice")
+    schools.append_school("Základní umělecká škola Brno", "https://d", "Brno")
+    schools.append_school("Gymnázium Praha 5", "https://e", "Praha 5")
+    return schools
+
+
+def test_search_is_ranked_and_ignores_diacritics():
+    """Search matches word prefixes regardless of case and diacritics."""
+
+    schools = _directory()
+    assert [s.api_point for s in schools.search("zakl skola")] == [
+        "https://a",
+        "https://d",
+    ]
+    assert [s.api_point for s in schools.search("GYMNAZIUM")] == [
+        "https://e",
+        "https://b",
+    ]
+    assert [s.api_point for s in schools.search("gym", town="Brno")] == ["https://b"]
+    assert [s.api_point for s in schools.search("slap")] == ["https://c"]
+    assert len(schools.search("brno", limit=2)) == 2
+    assert schools.search("nothing") == []
+    assert schools.search("  ") == []
+
+
+def test_indexed_lookups_match_linear_scan():
+    """Indexed get_url, town and api point lookups keep their semantics."""
+
+    schools = _directory()
+    assert schools.get_url("Brno, Slovanské") == "https://b"
+    assert schools.get_url("ola Brno, Ú") == "https://a"
+    assert schools.get_url("Gymnázium") == "https://b"
+    assert schools.get_url("Praha 6") is False
+    assert schools.get_school_name_by_api_point("https://c") == "ZŠ a MŠ Šlapanice"
+    assert schools.get_school_name_by_api_point("https://x") is False
+    assert [s.api_point for s in schools.get_schools_by_town("Brno")] == [
+        "https://a",
+        "https://b",
+        "https://d",
+    ]
+    assert len(schools.get_schools_by_town("Brno, Šlapanice")) == 4
+
+
+async def test_compact_schools_match_list_schools(tmp_path):
+    """Columnar store answers like the list and saves the same file."""
+
+    plain = _directory()
+    compact = Schools(compact=True)
+    for school in plain.school_list:
+        compact.append_school(school.name, school.api_point, school.town)
+
+    assert list(compact.school_list) == plain.school_list
+    assert compact.school_list[-1] == plain.school_list[-1]
+    assert compact.school_list[1:3] == plain.school_list[1:3]
+    assert compact.search("gym") == plain.search("gym")
+    assert compact.get_url("Brno, Slovanské") == "https://b"
+    assert compact.get_schools_by_town("Brno") == plain.get_schools_by_town("Brno")
+    assert compact.get_school_name_by_api_point("https://c") == "ZŠ a MŠ Šlapanice"
+    # Town strings are shared between schools.
+    assert plain.school_list[0].town is plain.school_list[1].town
+
+    await plain.save_to_file(str(tmp_path / "plain.json"))
+    await compact.save_to_file(str(tmp_path / "compact.json"))
+    assert (tmp_path / "plain.json").read_bytes() == (
+        tmp_path / "compact.json"
+    ).read_bytes()
+
+
+def test_unique_towns_keep_order_after_removal():
+    """Public list and set stay in sync on append and removal."""
+
+    towns = UniqueTowns()
+    for town in ("A", "B", "A", "C"):
+        towns.append(town)
+    assert towns.list == ["A", "B", "C"]
+    del towns["B"]
+    del towns["X"]
+    assert towns[1] == "C"
+    assert towns.set == {"A", "C"}
+    assert list(towns) == ["A", "C"]
@@ -0,0 +1,78 @@
+"""Tests for streaming school directory."""
+
+import asyncio
+from contextlib import aclosing
+from urllib import parse
+
+from aioresponses import CallbackResult, aioresponses
+from async_bakalari_api.bakalari import Bakalari
+from async_bakalari_api.const import EndPoint
+from async_bakalari_api.exceptions import Ex
+from async_bakalari_api.mock_server import MockData, generate_town
+import pytest
+
+LIST_URL = EndPoint.SCHOOL_LIST.endpoint
+TOWNS = [{"name": name, "schoolCount": 2} for name in ("Slow", "Fast", "Broken")]
+
+
+def serve_town(m: aioresponses, town: str, delay: float = 0.0) -> list[bool]:
+    """Serve schools of town after `delay`, return list of cancelled flags."""
+
+    cancelled: list[bool] = []
+    payload = generate_town(MockData(schools_per_town=2), town, "https://x")
+
+    async def respond(_url, **_kwargs):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return CallbackResult(payload=payload)
+
+    m.get(f"{LIST_URL}/{parse.quote(town)}", callback=respond)
+    return cancelled
+
+
+async def test_schools_are_yielded_as_towns_arrive():
+    """Fast town comes first, failed town is reported and skipped."""
+
+    errors: dict[str, Exception] = {}
+    with aioresponses() as m:
+        m.get(LIST_URL, payload=TOWNS)
+        serve_town(m, "Slow", delay=0.05)
+        serve_town(m, "Fast")
+        m.get(f"{LIST_URL}/Broken", status=500)
+        async with Bakalari() as bakalari:
+            towns = [
+                school.town
+                async for school in bakalari.iter_schools(on_error=errors.__setitem__)
+            ]
+    assert towns == ["Fast", "Fast", "Slow", "Slow"]
+    assert list(errors) == ["Broken"]
+
+
+async def test_leaving_early_cancels_pending_towns():
+    """Stopping at first match cancels fetches of slower towns."""
+
+    with aioresponses() as m:
+        m.get(LIST_URL, payload=TOWNS[:2])
+        slow = serve_town(m, "Slow", delay=10)
+        serve_town(m, "Fast")
+        bakalari = Bakalari()
+        async with bakalari, aclosing(bakalari.iter_schools()) as schools:
+            async for school in schools:
+                if school.name.startswith("Základní škola 1"):
+                    break
+    assert school.town == "Fast"
+    assert slow == [True]
+
+
+async def test_missing_town_list_raises():
+    """Unavailable municipality list is an error, not an empty stream."""
+
+    with aioresponses() as m:
+        m.get(LIST_URL, status=500)
+        async with Bakalari() as bakalari:
+            with pytest.raises(Ex.InvalidResponse):
+                async for _school in bakalari.iter_schools():
+                    pass
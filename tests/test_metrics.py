@@ -0,0 +1,99 @@
+"""Tests for request metrics."""
+
+import asyncio
+import logging
+
+from aiohttp import hdrs
+from aioresponses import aioresponses
+from async_bakalari_api.api_client import ApiClient
+from async_bakalari_api.metrics import Histogram, InMemoryMetrics, NoopMetrics
+import pytest
+
+URL = "https://school-a.example/api/3/komens/attachment/abc123"
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    """Quantiles are estimated from cumulative buckets."""
+
+    histogram = Histogram((10, 20, 40))
+    assert histogram.quantile(0.5) == 0.0
+    for value in (1, 2, 3, 4, 15, 16, 30, 35, 38, 100):
+        histogram.observe(value)
+    assert histogram.count == 10
+    assert histogram.total == 244
+    assert histogram.quantile(0.4) == 10.0
+    assert histogram.quantile(0.5) == 15.0
+    assert histogram.quantile(0.99) == 40.0  # +Inf bucket
+
+
+def test_in_memory_metrics_select_and_export():
+    """Series are selected by label subset and exported as Prometheus text."""
+
+    metrics = InMemoryMetrics(buckets=(10, 100))
+    metrics.inc("req_total", {"host": "a", "status": "200"})
+    metrics.inc("req_total", {"host": "a", "status": "503"}, 2)
+    metrics.inc("req_total", {"host": "b", "status": "200"})
+    metrics.observe("lat_ms", {"host": "a"}, 5)
+    metrics.observe("lat_ms", {"host": "b"}, 50.5)
+
+    assert metrics.counter("req_total") == 4
+    assert metrics.counter("req_total", host="a") == 3
+    assert metrics.counter("req_total", host="a", status="503") == 2
+    assert metrics.histogram("lat_ms").count == 2
+    assert metrics.quantile("lat_ms", 0.5, host="a") == 5.0
+
+    text = metrics.to_prometheus()
+    assert "# TYPE req_total counter" in text
+    assert 'req_total{host="a",status="503"} 2' in text
+    assert "# TYPE lat_ms histogram" in text
+    assert 'lat_ms_bucket{host="b",le="100"} 1' in text
+    assert 'lat_ms_bucket{host="b",le="+Inf"} 1' in text
+    assert 'lat_ms_sum{host="b"} 50.5' in text
+    assert 'lat_ms_count{host="a"} 1' in text
+
+    metrics.reset()
+    assert metrics.to_prometheus() == ""
+
+
+async def test_api_client_records_metrics_by_host_and_endpoint():
+    """Requests are counted with endpoint labels stripped of ids."""
+
+    metrics = InMemoryMetrics()
+    with aioresponses() as m:
+        m.get(URL, payload={"ok": True})
+        m.get(URL, exception=TimeoutError())
+        async with ApiClient(metrics=metrics) as client:
+            await client.authorized_request(
+                URL,
+                hdrs.METH_GET,
+                credentials=type("C", (), {"access_token": "a"})(),
+                refresh_callback=lambda: asyncio.sleep(0),
+            )
+            with pytest.raises(Exception):  # noqa: B017
+                await client.request(URL, hdrs.METH_GET)
+
+    labels = {"host": "school-a.example", "endpoint": "/api/3/komens/attachment"}
+    assert metrics.counter("bakalari_requests_total", status="200", **labels) == 1
+    assert (
+        metrics.counter("bakalari_requests_total", status="timeout", retries="0") == 1
+    )
+    assert metrics.histogram("bakalari_request_latency_ms", **labels).count == 2
+    assert metrics.counter("bakalari_authorized_requests_total", error="") == 1
+
+
+async def test_noop_metrics_skip_log_extra_when_debug_disabled(
+    monkeypatch, caplog: pytest.LogCaptureFixture
+):
+    """Disabled metrics and logging do no work on the hot path."""
+
+    logger = logging.getLogger("async_bakalari_api.api_client")
+    caplog.set_level(logging.WARNING, logger=logger.name)
+    calls: list[str] = []
+    monkeypatch.setattr(logger, "debug", lambda *a, **k: calls.append("debug"))
+    assert NoopMetrics.enabled is False
+
+    with aioresponses() as m:
+        m.get(URL, payload={})
+        async with ApiClient() as client:
+            await client.request(URL, hdrs.METH_GET)
+    assert calls == []
@@ -0,0 +1,101 @@
+"""Tests for local mock Bakalari server."""
+
+from datetime import date
+
+from aiohttp import hdrs
+from async_bakalari_api.api_client import ApiClient
+from async_bakalari_api.bakalari import Bakalari
+from async_bakalari_api.exceptions import Ex
+from async_bakalari_api.komens import Komens
+from async_bakalari_api.marks import Marks
+from async_bakalari_api.mock_server import MockBakalariServer, MockData, MockFaults
+from async_bakalari_api.timetable import Timetable
+import pytest
+
+SMALL = MockData(
+    subjects=3, marks_per_subject=4, messages=6, attachment_size=10_000, towns=2
+)
+
+
+async def test_client_parses_all_generated_payloads(tmp_path):
+    """Generated payloads are accepted by Marks, Timetable and Komens."""
+
+    async with MockBakalariServer(SMALL, accounts={"user": "pass"}) as server:
+        bakalari = Bakalari(server.url)
+        with pytest.raises(Ex.InvalidLogin):
+            await bakalari.first_login("user", "wrong")
+        await bakalari.first_login("user", "pass")
+
+        marks = Marks(bakalari)
+        await marks.fetch_marks()
+        assert len(await marks.get_subjects()) == 3
+
+        week = await Timetable(bakalari).fetch_actual(date(2024, 9, 4))
+        assert min(day.date.date() for day in week.days) == date(2024, 9, 2)
+        assert len(week.days[0].atoms) == SMALL.atoms_per_day
+        await Timetable(bakalari).fetch_permanent()
+
+        komens = Komens(bakalari)
+        messages = await komens.fetch_messages()
+        assert messages.count_messages() == 6
+        assert await komens.count_unread_messages() == 4
+        await komens.message_mark_read("K1")
+        assert await komens.count_unread_messages() == 3
+        assert (await komens.message_get_single_message("K1")).read is True
+        assert len(await komens.fetch_noticeboard()) == SMALL.noticeboard
+
+        filename, size = await komens.download_attachment("K1-0", tmp_path)
+        assert filename == "příloha K1-0.pdf"
+        assert size == (tmp_path / filename).stat().st_size == 10_000
+        await bakalari.close()
+
+        async with ApiClient() as client:
+            towns = await client.request(server.municipality_url, hdrs.METH_GET)
+            town = await client.request(
+                f"{server.municipality_url}/{towns[1]['name']}", hdrs.METH_GET
+            )
+        assert len(town["schools"]) == SMALL.schools_per_town
+        assert server.requests["MARKS"] == 1
+        assert server.statuses[400] == 1
+
+
+async def test_expired_token_is_refreshed(clock):
+    """401 ID2019 after token lifetime makes client refresh and retry."""
+
+    faults = MockFaults(token_lifetime=600)
+    async with MockBakalariServer(SMALL, faults, clock=clock) as server:
+        bakalari = Bakalari(server.url)
+        credentials = await bakalari.first_login("user", "pass")
+        clock.now = 601
+        await Marks(bakalari).fetch_marks()
+        assert bakalari.credentials.access_token != credentials.access_token
+        assert bakalari.credentials.user_id == credentials.user_id
+        assert server.requests["LOGIN"] == 2
+        assert server.statuses[401] == 1
+
+        server.expire_tokens()
+        await Marks(bakalari).fetch_marks()
+        assert server.requests["LOGIN"] == 3
+        await bakalari.close()
+
+
+async def test_throttling_and_injected_errors(clock):
+    """Accounts over rate limit get 429; error rate injects 503."""
+
+    faults = MockFaults(rate_limit=2, rate_window=10)
+    async with MockBakalariServer(SMALL, faults, clock=clock) as server:
+        bakalari = Bakalari(server.url)
+        await bakalari.first_login("user", "pass")
+        marks = Marks(bakalari)
+        await marks.fetch_marks()
+        await Komens(bakalari).count_unread_messages()
+        with pytest.raises(Ex.TooManyRequests) as err:
+            await Komens(bakalari).count_unread_messages()
+        assert err.value.retry_after == 10
+        clock.now = 10
+        assert await Komens(bakalari).count_unread_messages() == 4
+
+        server.faults = MockFaults(error_rate=1.0)
+        with pytest.raises(Ex.ServiceUnavailable):
+            await Komens(bakalari).count_unread_messages()
+        await bakalari.close()
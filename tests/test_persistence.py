@@ -0,0 +1,151 @@
+"""Tests for atomic and debounced credential persistence."""
+
+import asyncio
+import os
+import threading
+
+from aioresponses import aioresponses
+from async_bakalari_api import persistence
+from async_bakalari_api.bakalari import Bakalari
+from async_bakalari_api.const import EndPoint
+from async_bakalari_api.datastructure import Credentials
+from async_bakalari_api.persistence import CredentialWriter, write_atomic
+import orjson
+import pytest
+
+fs = "http://fake_server"
+
+
+def test_write_atomic_replaces_file_and_cleans_up_on_failure(tmp_path, monkeypatch):
+    """Old content survives failed write, no temp files are left."""
+
+    target = tmp_path / "credentials.json"
+    write_atomic(str(target), b"old")
+    assert target.read_bytes() == b"old"
+    assert oct(target.stat().st_mode & 0o777) == "0o600"
+
+    def broken_replace(*_args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(persistence.os, "replace", broken_replace)
+    with pytest.raises(OSError):
+        write_atomic(str(target), b"new")
+    assert target.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["credentials.json"]
+
+
+async def test_writer_debounces_and_batches(tmp_path, monkeypatch):
+    """Repeated writes of many files end in one executor batch."""
+
+    batches: list[dict[str, bytes]] = []
+    real_batch = persistence._write_batch
+
+    def record_batch(batch):
+        batches.append(dict(batch))
+        return real_batch(batch)
+
+    monkeypatch.setattr(persistence, "_write_batch", record_batch)
+    writer = CredentialWriter(delay=0.01)
+    for i in range(10):
+        writer.schedule(str(tmp_path / f"acc{i % 3}.json"), f"v{i}".encode())
+    assert writer.pending == 3
+    await writer.close()
+
+    assert len(batches) == 1
+    assert (tmp_path / "acc0.json").read_bytes() == b"v9"
+    assert (tmp_path / "acc2.json").read_bytes() == b"v8"
+    assert await writer.write(str(tmp_path / "missing" / "x.json"), b"x") is False
+
+
+async def test_writer_writes_files_scheduled_during_flush(tmp_path, monkeypatch):
+    """Write scheduled while batch is being written gets its own timer round."""
+
+    started = threading.Event()
+    proceed = threading.Event()
+    real_batch = persistence._write_batch
+
+    def slow_batch(batch):
+        started.set()
+        proceed.wait(5)
+        return real_batch(batch)
+
+    monkeypatch.setattr(persistence, "_write_batch", slow_batch)
+    writer = CredentialWriter(delay=0.01)
+    writer.schedule(str(tmp_path / "a.json"), b"a")
+    await asyncio.to_thread(started.wait, 5)
+    writer.schedule(str(tmp_path / "b.json"), b"b")
+    proceed.set()
+    for _ in range(100):
+        if (tmp_path / "b.json").exists():
+            break
+        await asyncio.sleep(0.01)
+    assert (tmp_path / "b.json").read_bytes() == b"b"
+    assert writer.pending == 0
+
+
+async def test_writer_keeps_failed_files_pending(tmp_path):
+    """Failed write is retried by next flush unless newer data replaced it."""
+
+    target = tmp_path / "missing" / "x.json"
+    writer = CredentialWriter(delay=60)
+    assert await writer.write(str(target), b"x") is False
+    assert writer.peek(str(target)) == b"x"
+    target.parent.mkdir()
+    assert await writer.flush() is True
+    assert target.read_bytes() == b"x"
+    assert writer.pending == 0
+
+
+async def test_refresh_saves_credentials_off_the_refresh_path(tmp_path):
+    """Refreshed tokens are written by the writer, not under refresh lock."""
+
+    cache = tmp_path / "credentials.json"
+    seed = Bakalari(fs, credentials=Credentials(access_token="a", refresh_token="r"))
+    assert seed.save_credentials(str(cache))
+    bakalari = Bakalari(
+        fs,
+        auto_cache_credentials=True,
+        cache_filename=str(cache),
+        credential_writer=CredentialWriter(delay=60),
+    )
+    with aioresponses() as m:
+        m.post(
+            fs + EndPoint.LOGIN.endpoint,
+            payload={"access_token": "new_a", "refresh_token": "new_r"},
+        )
+        await bakalari.refresh_access_token()
+    assert orjson.loads(cache.read_bytes())["access_token"] == "a"
+
+    await bakalari.close()
+    assert orjson.loads(cache.read_bytes())["access_token"] == "new_a"
+
+    loaded = Bakalari(fs)
+    assert (await loaded.async_load_credentials(str(cache))).refresh_token == "new_r"
+    assert await loaded.async_load_credentials(str(tmp_path / "nope")) is False
+    assert await loaded.async_save_credentials() is False
+    assert await loaded.async_save_credentials(str(tmp_path / "copy.json"))
+    await loaded.close()
+
+
+async def test_context_exit_writes_refreshed_credentials(tmp_path):
+    """Rotated refresh token is on disk after leaving the context manager."""
+
+    cache = tmp_path / "credentials.json"
+    seed = Bakalari(fs, credentials=Credentials(access_token="a", refresh_token="r1"))
+    assert seed.save_credentials(str(cache))
+    with aioresponses() as m:
+        m.post(
+            fs + EndPoint.LOGIN.endpoint,
+            payload={"access_token": "a2", "refresh_token": "r2"},
+        )
+        async with Bakalari(
+            fs,
+            auto_cache_credentials=True,
+            cache_filename=str(cache),
+            credential_writer=CredentialWriter(delay=60),
+        ) as bakalari:
+            await bakalari.refresh_access_token()
+            assert orjson.loads(cache.read_bytes())["refresh_token"] == "r1"
+
+    saved = orjson.loads(cache.read_bytes())
+    assert (saved["access_token"], saved["refresh_token"]) == ("a2", "r2")
@@ -0,0 +1,123 @@
+"""Tests for multi-account pool."""
+
+import asyncio
+from contextlib import aclosing
+
+from async_bakalari_api.datastructure import Credentials
+from async_bakalari_api.marks import Marks
+from async_bakalari_api.mock_server import MockBakalariServer, MockData
+from async_bakalari_api.pool import BakalariPool, FetchKind
+import pytest
+
+SMALL = MockData(subjects=2, marks_per_subject=2, messages=3)
+
+
+async def test_fetch_all_respects_global_and_per_host_limits():
+    """Concurrency is bounded globally and per school host."""
+
+    pool = BakalariPool(max_concurrency=4, max_per_host=3)
+    for i in range(12):
+        host = "http://school-a" if i % 2 else "http://school-b"
+        pool.register(f"acc{i}", host, Credentials())
+
+    running: dict[str, int] = {}
+    peaks = {"total": 0, "http://school-a": 0, "http://school-b": 0}
+
+    async def fetch(bakalari):
+        host = bakalari.server
+        running[host] = running.get(host, 0) + 1
+        peaks[host] = max(peaks[host], running[host])
+        peaks["total"] = max(peaks["total"], sum(running.values()))
+        await asyncio.sleep(0.01)
+        running[host] -= 1
+        return host
+
+    results = [result async for result in pool.fetch_all(fetch)]
+    await pool.close()
+
+    assert sorted(r.account_id for r in results) == sorted(f"acc{i}" for i in range(12))
+    assert all(r.ok for r in results)
+    assert peaks["total"] == 4
+    assert peaks["http://school-a"] <= 3
+    assert peaks["http://school-b"] <= 3
+
+
+async def test_fetch_all_against_mock_server_yields_errors_per_account():
+    """Kinds map to module fetches; failing account does not stop others."""
+
+    async with MockBakalariServer(SMALL) as server:
+        pool = BakalariPool(max_per_host=2)
+        for i in range(5):
+            pool.register(f"acc{i}", server.url, Credentials())
+            await pool.run(f"acc{i}", lambda b, i=i: b.first_login(f"user{i}", "pass"))
+        pool.register("broken", server.url, Credentials(access_token="x"))
+
+        results = {r.account_id: r async for r in pool.fetch_all(FetchKind.MARKS)}
+        assert isinstance(results["acc0"].value, Marks)
+        assert not results["broken"].ok
+        assert sum(r.ok for r in results.values()) == 5
+
+        counts = [r.value async for r in pool.fetch_all("unread_count", ["acc1"])]
+        assert counts == [2]
+        await pool.close()
+
+
+async def test_clients_are_lazy_and_evicted_keeping_credentials(clock):
+    """Instances are created on use, evicted by LRU and idle timeout."""
+
+    async with MockBakalariServer(SMALL) as server:
+        pool = BakalariPool(max_clients=2, idle_timeout=60, clock=clock)
+        for i in range(3):
+            pool.register(f"acc{i}", server.url, Credentials())
+        assert pool.live_clients == 0
+
+        for i in range(3):
+            await pool.run(f"acc{i}", lambda b, i=i: b.first_login(f"user{i}", "p"))
+        assert pool.live_clients == 2
+        # Evicted instance handed its fresh tokens back to the pool.
+        assert pool.credentials("acc0").access_token
+        await pool.run("acc0", lambda b: Marks(b).fetch_marks())
+        assert pool.live_clients == 2
+        clock.now = 61
+        assert await pool.evict_idle() == 2
+        assert pool.live_clients == 0
+
+        pool.register("acc1", server.url, Credentials(access_token="new"))
+        assert pool.credentials("acc1").access_token == "new"
+        assert (await pool.unregister("acc1")).access_token == "new"
+        assert "acc1" not in pool
+        await pool.close()
+
+
+async def test_leaving_iteration_early_cancels_pending_fetches():
+    """Breaking out of fetch_all cancels fetches still running."""
+
+    pool = BakalariPool(max_concurrency=10)
+    for i in range(5):
+        pool.register(f"acc{i}", "http://school", Credentials())
+    cancelled = 0
+
+    async def fetch(_bakalari):
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+
+    fast = {"done": False}
+
+    async def first_fast(bakalari):
+        if not fast["done"]:
+            fast["done"] = True
+            return "fast"
+        return await fetch(bakalari)
+
+    async with aclosing(pool.fetch_all(first_fast)) as results:
+        async for result in results:
+            assert result.value == "fast"
+            break
+    assert cancelled == 4
+    await pool.close()
+    with pytest.raises(KeyError):
+        await pool.run("missing", first_fast)
@@ -0,0 +1,105 @@
+"""Tests for client-side rate limiter."""
+
+import asyncio
+
+from aiohttp import hdrs
+from aioresponses import aioresponses
+from async_bakalari_api.api_client import ApiClient
+from async_bakalari_api.ratelimit import RateLimit, RateLimiter, TokenBucket
+import pytest
+
+URL_A = "https://school-a.example/api/3/marks"
+URL_B = "https://school-b.example/api/3/marks"
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    """Sleep in rate limiter advances fake clock instead of waiting."""
+
+    fake = clock
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay: float):
+        fake.now += delay
+        await real_sleep(0)
+
+    monkeypatch.setattr("async_bakalari_api.ratelimit.asyncio.sleep", fake_sleep)
+    return fake
+
+
+def test_rate_limit_validation():
+    """Rate and burst must be positive."""
+
+    with pytest.raises(ValueError):
+        RateLimit(rate=0)
+    with pytest.raises(ValueError):
+        RateLimit(burst=0)
+
+
+async def test_bucket_allows_burst_then_paces(clock):
+    """Burst is immediate, further requests wait 1/rate each."""
+
+    bucket = TokenBucket(RateLimit(rate=2, burst=2), clock)
+    assert await bucket.acquire() == 0
+    assert await bucket.acquire() == 0
+    assert bucket.wait_time() == 0.5
+    assert await bucket.acquire() == pytest.approx(0.5)
+    clock.now += 10
+    assert bucket.wait_time() == 0  # refilled, capped by burst
+
+
+async def test_bucket_serves_waiters_in_order(clock):
+    """Queued requests complete in arrival order."""
+
+    bucket = TokenBucket(RateLimit(rate=1, burst=1), clock)
+    order: list[int] = []
+
+    async def worker(i: int):
+        await bucket.acquire()
+        order.append(i)
+
+    tasks = [asyncio.create_task(worker(i)) for i in range(5)]
+    await asyncio.sleep(0)
+    assert bucket.waiting == 4
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2, 3, 4]
+    assert clock.now == pytest.approx(4)
+
+
+async def test_limiter_per_host_and_global_cap(clock):
+    """Hosts have own buckets, global cap is shared."""
+
+    limiter = RateLimiter(
+        RateLimit(rate=1, burst=1),
+        global_limit=RateLimit(rate=1, burst=2),
+        host_limits={"fast": RateLimit(rate=100, burst=100)},
+        clock=clock,
+    )
+    assert await limiter.acquire("a") == 0
+    assert await limiter.acquire("b") == 0
+    assert limiter.wait_time("fast") == pytest.approx(1)  # global bucket empty
+    assert limiter.wait_times()["a"] == pytest.approx(1)
+    assert await limiter.acquire("fast") == pytest.approx(1)
+
+    unlimited = RateLimiter(None)
+    assert await unlimited.acquire("x") == 0
+    assert unlimited.wait_times() == {}
+
+
+async def test_api_client_waits_for_rate_limiter(clock):
+    """Requests are queued per host instead of failing."""
+
+    limiter = RateLimiter(RateLimit(rate=1, burst=1), clock=clock)
+    with aioresponses() as m:
+        m.get(URL_A, payload={"a": 1}, repeat=True)
+        m.get(URL_B, payload={"b": 1})
+        async with ApiClient(rate_limiter=limiter) as client:
+            assert client.rate_limit_wait_times() == {}
+            await client.request(URL_A, hdrs.METH_GET)
+            await client.request(URL_B, hdrs.METH_GET)
+            assert clock.now == 0
+            assert client.rate_limit_wait_times()["school-a.example"] == 1
+            await client.request(URL_A, hdrs.METH_GET)
+            assert clock.now == pytest.approx(1)
+
+    assert ApiClient().rate_limit_wait_times() == {}
@@ -0,0 +1,136 @@
+"""Tests for retry policy."""
+
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+import logging
+
+from aiohttp import hdrs
+from aioresponses import aioresponses
+from async_bakalari_api.api_client import ApiClient
+from async_bakalari_api.exceptions import Ex
+from async_bakalari_api.retry import RetryPolicy, parse_retry_after
+import pytest
+from yarl import URL
+
+URL_MARKS = "https://example.com/api/3/marks"
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Record retry delays instead of sleeping."""
+
+    delays: list[float] = []
+
+    async def fake_sleep(delay: float):
+        delays.append(delay)
+
+    monkeypatch.setattr("async_bakalari_api.api_client.asyncio.sleep", fake_sleep)
+    return delays
+
+
+def test_parse_retry_after():
+    """Retry-After accepts delay seconds or HTTP date."""
+
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after(" 7 ") == 7.0
+    assert parse_retry_after("not a date") is None
+    future = format_datetime(datetime.now(UTC) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(future) <= 30  # type: ignore[operator]
+    assert parse_retry_after("Mon, 01 Jan 2001 00:00:00") == 0.0
+
+
+def test_backoff_is_bounded_full_jitter():
+    """Backoff is between 0 and capped exponential delay."""
+
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+    for attempt in range(6):
+        assert 0 <= policy.backoff(attempt) <= min(5, 2**attempt)
+
+
+def test_retry_delay_rules():
+    """Only transient errors of idempotent methods are retried."""
+
+    policy = RetryPolicy(max_attempts=3, max_retry_after=10)
+    busy = Ex.TooManyRequests("busy", status=429, retry_after=3)
+    assert policy.retry_delay(hdrs.METH_GET, 0, busy) == 3
+    assert policy.retry_delay(hdrs.METH_GET, 2, busy) is None
+    assert policy.retry_delay(hdrs.METH_POST, 0, busy) is None
+    assert (
+        policy.retry_delay(
+            hdrs.METH_GET, 0, Ex.TooManyRequests("x", status=429, retry_after=60)
+        )
+        is None
+    )
+    assert (
+        policy.retry_delay(hdrs.METH_GET, 0, Ex.TransientServerError("x", status=500))
+        is None
+    )
+    assert policy.retry_delay(hdrs.METH_GET, 0, Ex.TimeoutException("t")) is not None
+    assert policy.retry_delay(hdrs.METH_GET, 0, Ex.BadRequestException("b")) is None
+    no_header = RetryPolicy(respect_retry_after=False, base_delay=0)
+    assert no_header.retry_delay(hdrs.METH_PUT, 0, busy) == 0
+
+
+async def test_request_maps_transient_statuses():
+    """429 and 503 map to dedicated exceptions carrying Retry-After."""
+
+    with aioresponses() as m:
+        m.get(URL_MARKS, status=429, headers={"Retry-After": "5"})
+        m.get(URL_MARKS, status=503)
+        async with ApiClient() as client:
+            with pytest.raises(Ex.TooManyRequests) as exc:
+                await client.request(URL_MARKS, hdrs.METH_GET)
+            assert exc.value.retry_after == 5.0
+            assert exc.value.status == 429
+            with pytest.raises(Ex.ServiceUnavailable) as exc2:
+                await client.request(URL_MARKS, hdrs.METH_GET)
+            assert isinstance(exc2.value, Ex.BadRequestException)
+            assert exc2.value.retry_after is None
+
+
+async def test_request_retries_honoring_retry_after(
+    no_sleep, caplog: pytest.LogCaptureFixture, monkeypatch
+):
+    """Transient failures are retried and retries land in metrics."""
+
+    monkeypatch.setattr(logging.getLogger("async_bakalari_api"), "propagate", True)
+    caplog.set_level(logging.DEBUG, logger="async_bakalari_api.api_client")
+    with aioresponses() as m:
+        m.get(URL_MARKS, status=429, headers={"Retry-After": "2"})
+        m.get(URL_MARKS, status=503)
+        m.get(URL_MARKS, status=200, payload={"ok": True})
+        async with ApiClient(retry_policy=RetryPolicy(base_delay=0.1)) as client:
+            assert await client.request(URL_MARKS, hdrs.METH_GET) == {"ok": True}
+
+    assert no_sleep[0] == 2.0
+    assert 0 <= no_sleep[1] <= 0.2
+    retries = [
+        getattr(r, "retries", None) for r in caplog.records if r.msg == "api_request"
+    ]
+    assert retries == [0, 1, 2]
+
+
+async def test_request_gives_up_after_max_attempts(no_sleep):
+    """Last transient error is raised when attempts are exhausted."""
+
+    with aioresponses() as m:
+        m.get(URL_MARKS, exception=TimeoutError(), repeat=True)
+        async with ApiClient(retry_policy=RetryPolicy(max_attempts=2)) as client:
+            with pytest.raises(Ex.TimeoutException):
+                await client.request(URL_MARKS, hdrs.METH_GET)
+        assert len(m.requests[("GET", URL(URL_MARKS))]) == 2
+    assert len(no_sleep) == 1
+
+
+async def test_login_post_is_never_replayed(no_sleep):
+    """Non idempotent POST is not retried."""
+
+    url = "https://example.com/api/login"
+    with aioresponses() as m:
+        m.post(url, status=503, repeat=True)
+        async with ApiClient(retry_policy=RetryPolicy()) as client:
+            with pytest.raises(Ex.ServiceUnavailable):
+                await client.request(url, hdrs.METH_POST, data="x")
+        assert len(m.requests[("POST", URL(url))]) == 1
+    assert no_sleep == []
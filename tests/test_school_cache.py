@@ -0,0 +1,157 @@
+"""Tests for persistent school directory cache."""
+
+import asyncio
+from urllib import parse
+
+from aioresponses import aioresponses
+from async_bakalari_api.bakalari import Bakalari
+from async_bakalari_api.const import EndPoint
+from async_bakalari_api.mock_server import MockData, generate_town, generate_towns
+from async_bakalari_api.school_cache import SchoolDirectoryCache
+from yarl import URL
+
+LIST_URL = EndPoint.SCHOOL_LIST.endpoint
+DATA = MockData(towns=4, schools_per_town=3)
+
+
+def town_url(town: str) -> str:
+    """Return school list URL of town."""
+    return f"{LIST_URL}/{parse.quote(town)}"
+
+
+def mock_directory(m: aioresponses, towns: list[dict]) -> None:
+    """Serve municipality list and schools of every town."""
+
+    m.get(LIST_URL, payload=towns, repeat=True)
+    for town in towns:
+        payload = generate_town(
+            MockData(schools_per_town=town["schoolCount"]), town["name"], "https://x"
+        )
+        m.get(town_url(town["name"]), payload=payload, repeat=True)
+
+
+def town_requests(m: aioresponses) -> dict[str, int]:
+    """Return number of requests per town."""
+
+    return {
+        parse.unquote(url.path.rsplit("/", 1)[1]): len(calls)
+        for (_method, url), calls in m.requests.items()
+        if url != URL(LIST_URL)
+    }
+
+
+async def test_second_start_is_served_from_disk(tmp_path, clock):
+    """Fresh cache answers without any request."""
+
+    path = str(tmp_path / "schools.json")
+    with aioresponses() as m:
+        mock_directory(m, generate_towns(DATA))
+        async with Bakalari(school_cache=SchoolDirectoryCache(path, clock=clock)) as b:
+            schools = await b.schools_list()
+        assert len(schools) == 12
+        assert len(town_requests(m)) == 4
+
+    cache = SchoolDirectoryCache(path, clock=clock)
+    with aioresponses():
+        async with Bakalari(school_cache=cache) as b:
+            schools = await b.schools_list(town="Město 1")
+            assert b._schools_refresh_task is None
+    assert [school.town for school in schools.school_list] == ["Město 1"] * 3
+    assert len(cache) == 12
+
+
+async def test_only_stale_and_changed_towns_are_refetched(tmp_path, clock):
+    """Expired list is re-checked in background, unchanged towns are kept."""
+
+    cache = SchoolDirectoryCache(str(tmp_path / "s.json"), ttl=100, clock=clock)
+    towns = generate_towns(DATA)
+    with aioresponses() as m:
+        mock_directory(m, towns)
+        async with Bakalari(school_cache=cache) as b:
+            await b.schools_list()
+
+    clock.now = 101
+    towns[1]["schoolCount"] = 5
+    changed = [*towns[:3], {"name": "Nové Město", "schoolCount": 1}]
+    with aioresponses() as m:
+        mock_directory(m, changed)
+        async with Bakalari(school_cache=cache) as b:
+            stale = await b.schools_list()
+            assert len(stale) == 12
+            await b._schools_refresh_task
+        assert town_requests(m) == {"Město 1": 1, "Nové Město": 1}
+    assert len(cache) == 3 + 5 + 3 + 1
+    assert "Město 3" not in cache.towns
+
+
+async def test_filtered_first_start_fetches_matching_towns_first(tmp_path, clock):
+    """Missing towns of filter are fetched before returning, rest later."""
+
+    cache = SchoolDirectoryCache(str(tmp_path / "s.json"), clock=clock)
+    with aioresponses() as m:
+        mock_directory(m, generate_towns(DATA))
+        async with Bakalari(school_cache=cache) as b:
+            schools = await b.schools_list(town="Město 2", recursive=False)
+            assert len(schools) == 3
+            assert town_requests(m) == {"Město 2": 1}
+            await b._schools_refresh_task
+        assert len(town_requests(m)) == 4
+
+    with aioresponses() as m:
+        m.get(LIST_URL, status=500)
+        async with Bakalari(
+            school_cache=SchoolDirectoryCache(str(tmp_path / "none.json"))
+        ) as b:
+            assert await b.schools_list() is None
+
+
+async def test_failed_town_backs_off_and_refreshes_do_not_overlap(tmp_path, clock):
+    """Failing town is not re-fetched on every call; refreshes are serialized."""
+
+    cache = SchoolDirectoryCache(str(tmp_path / "s.json"), retry_after=600, clock=clock)
+    towns = generate_towns(DATA)
+    with aioresponses() as m:
+        m.get(town_url(towns[0]["name"]), status=500, repeat=True)
+        mock_directory(m, towns)
+        async with Bakalari(school_cache=cache) as b:
+            first, second = await asyncio.gather(b.schools_list(), b.schools_list())
+            assert len(first) == len(second) == 9
+            assert b._schools_refresh_task is None
+            assert len(await b.schools_list()) == 9
+        assert town_requests(m) == {town["name"]: 1 for town in towns}
+
+    clock.now = 601
+    with aioresponses() as m:
+        mock_directory(m, towns)
+        async with Bakalari(school_cache=cache) as b:
+            assert len(await b.schools_list()) == 12
+        assert town_requests(m) == {towns[0]["name"]: 1}
+    assert len(cache) == 12
+
+
+async def test_stale_cache_is_refreshed_by_short_lived_runs(tmp_path, clock):
+    """Run awaiting refresh leaves fresh cache although background one is cancelled."""
+
+    path = str(tmp_path / "s.json")
+    towns = generate_towns(DATA)
+    with aioresponses() as m:
+        mock_directory(m, towns)
+        async with Bakalari(school_cache=SchoolDirectoryCache(path, clock=clock)) as b:
+            await b.schools_list()
+
+    clock.now = 10**6
+    towns[0]["schoolCount"] = 5
+    with aioresponses() as m:
+        mock_directory(m, towns)
+        cache = SchoolDirectoryCache(path, ttl=100, clock=clock)
+        async with Bakalari(school_cache=cache) as b:
+            assert len(await b.schools_list()) == 12
+            assert cache.needs_refresh()
+            await b.refresh_schools()
+
+    cache = SchoolDirectoryCache(path, ttl=100, clock=clock)
+    with aioresponses():
+        async with Bakalari(school_cache=cache) as b:
+            assert len(await b.schools_list()) == 14
+            assert not cache.needs_refresh()
+            assert b._schools_refresh_task is None
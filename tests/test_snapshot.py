@@ -0,0 +1,74 @@
+"""Tests for binary school directory snapshot."""
+
+from async_bakalari_api.datastructure import Schools
+from async_bakalari_api.snapshot import (
+    SchoolSnapshot,
+    build_snapshot,
+    is_snapshot,
+    save_snapshot,
+)
+import pytest
+
+
+def _directory() -> Schools:
+    schools = Schools()
+    schools.append_school("Základní škola Brno, Úvoz 55", "https://a", "Brno")
+    schools.append_school("Gymnázium Brno, Slovanské nám.", "https://b", "Brno")
+    schools.append_school("ZŠ a MŠ Šlapanice", "https://c", "Šlapanice")
+    schools.append_school("Základní umělecká škola Brno", "https://d", "Brno")
+    schools.append_school("Gymnázium Praha 5", "https://e", "Praha 5")
+    schools.append_school("Gymnázium Praha 5", "https://a", "Praha 5")
+    return schools
+
+
+async def test_snapshot_answers_like_schools(tmp_path):
+    """Memory-mapped snapshot gives the same answers as loaded Schools."""
+
+    schools = _directory()
+    path = str(tmp_path / "schools.bin")
+    assert await save_snapshot(schools, path)
+    assert is_snapshot(path)
+
+    with SchoolSnapshot.open(path) as snapshot:
+        assert len(snapshot) == len(schools)
+        assert list(snapshot) == schools.school_list
+        assert snapshot[-1] == schools.school_list[-1]
+        assert snapshot[1:3] == schools.school_list[1:3]
+        for query in ("zakl skola", "GYMNAZIUM", "gym praha", "slap", "nic", ""):
+            assert snapshot.search(query) == schools.search(query)
+        assert snapshot.search("gym", town="Brno") == schools.search("gym", town="Brno")
+        for name in ("Brno, Slovanské", "Gymnázium", "Š", "Praha 6", "a\0b"):
+            assert snapshot.get_url(name) == schools.get_url(name)
+        assert snapshot.get_url(idx=2) == "https://c"
+        assert snapshot.get_url(idx=9) is False
+        assert snapshot.get_schools_by_town("Brno, Šlapanice") == (
+            schools.get_schools_by_town("Brno, Šlapanice")
+        )
+        assert snapshot.get_school_name_by_api_point("https://a") == (
+            schools.get_school_name_by_api_point("https://a")
+        )
+        assert snapshot.get_school_name_by_api_point("https://x") is False
+        assert snapshot.get_all_towns() == schools.get_all_towns()
+        assert snapshot.istown("Šlapanice")
+        assert snapshot.get_towns_partial_name("Pra") == ["Praha 5"]
+        assert snapshot.to_schools(compact=True).search("zs") == schools.search("zs")
+        first = snapshot[0]
+    assert first.name == "Základní škola Brno, Úvoz 55"
+
+
+def test_invalid_snapshot_is_rejected(tmp_path):
+    """Foreign or truncated data raises ValueError."""
+
+    data = build_snapshot(_directory())
+    with pytest.raises(ValueError):
+        SchoolSnapshot(b"[]" + data)
+    with pytest.raises(ValueError):
+        SchoolSnapshot(data[: len(data) // 2])
+
+    path = tmp_path / "schools.json"
+    path.write_bytes(b'[{"name": "x"}]')
+    assert not is_snapshot(str(path))
+    assert not is_snapshot(str(tmp_path / "missing"))
+    with pytest.raises(ValueError):
+        SchoolSnapshot.open(str(path))
+    assert len(SchoolSnapshot(build_snapshot(Schools()))) == 0
@@ -0,0 +1,123 @@
+"""Tests for streaming attachment download."""
+
+import aiofiles
+from aioresponses import aioresponses
+from async_bakalari_api.bakalari import Bakalari
+from async_bakalari_api.const import EndPoint
+from async_bakalari_api.datastructure import Credentials
+from async_bakalari_api.exceptions import Ex
+from async_bakalari_api.komens import Komens
+import pytest
+
+fs = "http://fake_server"
+URL = fs + EndPoint.KOMENS_ATTACHMENT.endpoint + "/1"
+BODY = b"0123456789" * 100
+HEADERS = {
+    "Content-type": "application/octet-stream",
+    "Content-Disposition": "attachment; filename*=UTF-8''report%20card.pdf",
+}
+
+
+def make_komens() -> tuple[Bakalari, Komens]:
+    """Return Bakalari with credentials and its Komens."""
+
+    bakalari = Bakalari(
+        server=fs,
+        credentials=Credentials(access_token="token", refresh_token="ref_token"),
+    )
+    return bakalari, Komens(bakalari)
+
+
+async def test_stream_attachment_yields_chunks_and_reports_progress():
+    """Body is iterated in chunks with progress callback."""
+
+    bakalari, komens = make_komens()
+    progress: list[int] = []
+
+    async def on_progress(received: int, _total: int | None):
+        progress.append(received)
+
+    with aioresponses() as m:
+        m.get(URL, body=BODY, headers=HEADERS)
+        async with komens.stream_attachment(
+            "1", chunk_size=300, buffer_chunks=1, progress=on_progress
+        ) as stream:
+            assert stream.filename == "report card.pdf"
+            chunks = [chunk async for chunk in stream]
+
+    assert b"".join(chunks) == BODY
+    assert max(len(c) for c in chunks) <= 300
+    assert progress[-1] == len(BODY)
+    assert progress == sorted(progress)
+    await bakalari.close()
+
+
+async def test_download_attachment_to_path_directory_and_file_object(tmp_path):
+    """Attachment is written to path, into directory, or async file object."""
+
+    bakalari, komens = make_komens()
+    with aioresponses() as m:
+        m.get(URL, body=BODY, headers=HEADERS, repeat=True)
+
+        target = tmp_path / "out.bin"
+        assert await komens.download_attachment("1", target) == (
+            "report card.pdf",
+            len(BODY),
+        )
+        assert target.read_bytes() == BODY
+        assert not (tmp_path / "out.bin.part").exists()
+
+        filename, _ = await komens.download_attachment("1", str(tmp_path))
+        assert (tmp_path / filename).read_bytes() == BODY
+
+        async with aiofiles.open(tmp_path / "via_file", "wb") as file:
+            await komens.download_attachment("1", file)
+        assert (tmp_path / "via_file").read_bytes() == BODY
+    await bakalari.close()
+
+
+async def test_download_attachment_size_limit_removes_partial_file(tmp_path):
+    """Exceeding size limit raises and leaves no partial file."""
+
+    bakalari, komens = make_komens()
+    target = tmp_path / "big.bin"
+    with aioresponses() as m:
+        m.get(URL, body=BODY, headers=HEADERS)
+        with pytest.raises(Ex.AttachmentTooLarge):
+            await komens.download_attachment("1", target, chunk_size=100, max_size=500)
+    assert list(tmp_path.iterdir()) == []
+    await bakalari.close()
+
+
+async def test_stream_attachment_maps_errors_and_refreshes_token():
+    """Error statuses map to exceptions; expired token is refreshed once."""
+
+    bakalari, komens = make_komens()
+    refreshed: list[bool] = []
+
+    async def fake_refresh():
+        refreshed.append(True)
+        object.__setattr__(
+            bakalari,
+            "_credentials",
+            Credentials(access_token="new", refresh_token="ref_token"),
+        )
+        return bakalari.credentials
+
+    object.__setattr__(bakalari, "refresh_access_token", fake_refresh)
+    with aioresponses() as m:
+        m.get(URL, status=404)
+        with pytest.raises(Ex.BadRequestException):
+            async with komens.stream_attachment("1"):
+                pass
+
+        m.get(
+            URL,
+            status=401,
+            headers={"WWW-Authenticate": "Bearer error_uri=ID2019"},
+        )
+        m.get(URL, body=b"abc", headers=HEADERS)
+        async with komens.stream_attachment("1") as stream:
+            assert [chunk async for chunk in stream] == [b"abc"]
+        assert refreshed == [True]
+    await bakalari.close()
@@ -0,0 +1,148 @@
+"""Tests for tracing hooks."""
+
+from aiohttp import hdrs, web
+from aiohttp.test_utils import TestServer
+from aioresponses import aioresponses
+from async_bakalari_api.api_client import ApiClient
+from async_bakalari_api.bakalari import Bakalari
+from async_bakalari_api.const import EndPoint
+from async_bakalari_api.datastructure import Credentials
+from async_bakalari_api.marks import Marks
+from async_bakalari_api.tracing import (
+    NOOP_TRACER,
+    InMemorySpanExporter,
+    Tracer,
+    tracer_of,
+)
+from async_bakalari_api.transport import SessionRegistry
+
+fs = "http://fake_server"
+
+
+def test_sampling_is_decided_per_trace():
+    """Unsampled root suppresses its children; sampled spans nest."""
+
+    exporter = InMemorySpanExporter()
+    draws = iter([0.9, 0.1])
+    tracer = Tracer(exporter, sample_rate=0.5, rng=lambda: next(draws))
+
+    with tracer.span("root") as root:
+        assert root is None
+        with tracer.span("child") as child:
+            assert child is None
+    assert exporter.spans == []
+
+    with tracer.span("root", kind="test"), tracer.span("child"):
+        tracer.record("phase", 1.0, 1.5)
+    assert exporter.names() == ["phase", "child", "root"]
+    phase, child_span, root_span = exporter.spans
+    assert root_span.parent_id is None
+    assert root_span.attributes == {"kind": "test"}
+    assert child_span.parent_id == root_span.span_id
+    assert phase.parent_id == child_span.span_id
+    assert phase.duration_ms == 500
+    assert {s.trace_id for s in exporter.spans} == {root_span.span_id}
+
+
+def test_errors_are_recorded_and_exporter_failures_swallowed():
+    """Span records error class; broken exporter does not break caller."""
+
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter)
+    try:
+        with tracer.span("boom"):
+            raise ValueError("x")
+    except ValueError:
+        pass
+    assert exporter.spans[0].attributes["error"] == "ValueError"
+
+    def broken(_span):
+        raise RuntimeError("exporter down")
+
+    with Tracer(broken).span("ok"):
+        pass
+    tracer.record("orphan", 0, 1)  # no parent span -> dropped
+    assert exporter.names() == ["boom"]
+
+
+def test_tracer_of_defaults_to_noop():
+    """Objects without tracer get the no-op tracer."""
+
+    assert tracer_of(object()) is NOOP_TRACER
+    assert NOOP_TRACER.trace_config() is None
+    with NOOP_TRACER.span("x") as span:
+        assert span is None
+
+
+async def test_api_client_emits_http_phase_spans():
+    """Connection, TTFB, body read and decode spans share request trace."""
+
+    async def handler(_request):
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/api/3/marks", handler)
+    exporter = InMemorySpanExporter()
+    async with TestServer(app) as server, ApiClient(tracer=Tracer(exporter)) as client:
+        url = str(server.make_url("/api/3/marks"))
+        assert await client.request(url, hdrs.METH_GET) == {"ok": True}
+        assert await client.request(url, hdrs.METH_GET) == {"ok": True}
+
+    names = exporter.names()
+    assert names.count("http.request") == 2
+    for name in ("http.connection_acquire", "http.ttfb", "http.read_body"):
+        assert name in names
+    assert "json.decode" in names
+    acquired = [s for s in exporter.spans if s.name == "http.connection_acquire"]
+    assert [s.attributes["reused"] for s in acquired] == [False, True]
+    request_ids = {s.span_id for s in exporter.spans if s.name == "http.request"}
+    assert {
+        s.parent_id for s in exporter.spans if s.name != "http.request"
+    } <= request_ids
+
+
+async def test_registry_sessions_carry_tracer_hooks():
+    """Shared session of traced client emits phase spans, untraced is separate."""
+
+    async def handler(_request):
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/api/3/marks", handler)
+    exporter = InMemorySpanExporter()
+    registry = SessionRegistry()
+    async with (
+        TestServer(app) as server,
+        ApiClient(session_registry=registry, tracer=Tracer(exporter)) as traced,
+        ApiClient(session_registry=registry) as plain,
+    ):
+        url = str(server.make_url("/api/3/marks"))
+        assert await traced.request(url, hdrs.METH_GET) == {"ok": True}
+        assert await plain.request(url, hdrs.METH_GET) == {"ok": True}
+        assert len(registry) == 2
+        assert registry.refcounts() == {server.host: 2}
+        assert registry.pool_stats()[server.host].limit == 200
+
+    assert exporter.names().count("http.connection_acquire") == 1
+    assert len(registry) == 0
+
+
+async def test_marks_build_models_span():
+    """Model building of marks is traced under the caller span."""
+
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter)
+    bakalari = Bakalari(
+        fs,
+        credentials=Credentials(access_token="t", refresh_token="r"),
+        tracer=tracer,
+    )
+    with aioresponses() as m:
+        m.get(fs + EndPoint.MARKS.endpoint, payload={"MarkOptions": [], "Subjects": []})
+        with tracer.span("poll"):
+            await Marks(bakalari).fetch_marks()
+    await bakalari.close()
+
+    names = exporter.names()
+    assert "marks.build_models" in names
+    assert names[-1] == "poll"
@@ -0,0 +1,200 @@
+"""Tests for transport configuration and pool statistics."""
+
+import asyncio
+from collections import namedtuple
+from types import SimpleNamespace
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from aioresponses import aioresponses
+from async_bakalari_api.api_client import ApiClient
+from async_bakalari_api.bakalari import Bakalari
+from async_bakalari_api.const import EndPoint
+from async_bakalari_api.datastructure import Credentials
+from async_bakalari_api.transport import (
+    PoolStats,
+    SessionRegistry,
+    TransportConfig,
+    pool_stats,
+)
+
+FS = "http://fake_server"
+Key = namedtuple("Key", "host port")
+
+
+async def test_transport_config_creates_tuned_connector():
+    """Connector reflects configured limits and keep-alive."""
+
+    cfg = TransportConfig(
+        limit=50,
+        limit_per_host=4,
+        keepalive_timeout=30,
+        ttl_dns_cache=300,
+        happy_eyeballs_delay=None,
+    )
+    connector = cfg.create_connector()
+    try:
+        assert connector.limit == 50
+        assert connector.limit_per_host == 4
+        assert connector.force_close is False
+    finally:
+        await connector.close()
+
+    connector = TransportConfig(force_close=True).create_connector()
+    try:
+        assert connector.force_close is True
+    finally:
+        await connector.close()
+
+
+async def test_api_client_uses_transport_and_reports_pool_stats():
+    """Owned session uses configured connector; stats are None without session."""
+
+    client = ApiClient(transport=TransportConfig(limit=7, limit_per_host=3))
+    assert client.pool_stats() is None
+    async with client:
+        stats = client.pool_stats()
+        assert stats is not None
+        assert stats.limit == 7
+        assert stats.limit_per_host == 3
+        assert stats.acquired == 0
+        assert stats.utilization == 0
+    assert client.pool_stats() is None
+
+
+async def test_bakalari_pool_stats_delegates_to_client():
+    """Bakalari exposes pool stats of its client."""
+
+    async with Bakalari("http://fake_server", transport=TransportConfig(limit=9)) as b:
+        stats = b.pool_stats()
+        assert stats is not None
+        assert stats.limit == 9
+
+
+def test_pool_stats_counts_connector_internals():
+    """Acquired, idle and waiting connections are summarized per host."""
+
+    connector = SimpleNamespace(
+        limit=10,
+        limit_per_host=0,
+        _acquired={1, 2, 3},
+        _conns={Key("a", 443): [1, 2]},
+        _waiters={Key("a", 443): [1]},
+        _acquired_per_host={
+            Key("a", 443): {1, 2},
+            Key("a", 80): {3},
+            Key("b", 443): set(),
+        },
+    )
+    stats = pool_stats(connector)  # type: ignore[arg-type]
+    assert stats == PoolStats(
+        limit=10,
+        limit_per_host=0,
+        acquired=3,
+        idle=2,
+        waiting=1,
+        acquired_per_host={"a": 3},
+    )
+    assert stats.utilization == 0.3
+    assert PoolStats(0, 0, 5, 0, 0).utilization == 0.0
+
+
+async def test_pool_stats_of_real_connector_with_open_response():
+    """Held response counts as acquired, per host only with host limit."""
+
+    release = asyncio.Event()
+
+    async def handler(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        await response.write(b"x")
+        await release.wait()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    async with TestServer(app) as server:
+        url = server.make_url("/")
+        for limit_per_host, per_host in ((2, {server.host: 1}), (0, {})):
+            connector = aiohttp.TCPConnector(limit_per_host=limit_per_host)
+            async with aiohttp.ClientSession(connector=connector) as session:
+                async with session.get(url) as response:
+                    await response.content.readexactly(1)
+                    stats = pool_stats(connector)
+                    assert stats.acquired == 1
+                    assert stats.acquired_per_host == per_host
+                    release.set()
+                    await response.read()
+                release.clear()
+                assert pool_stats(connector).acquired == 0
+
+
+async def test_session_registry_refcounts_shared_sessions():
+    """Sessions are shared per host and closed with the last release."""
+
+    registry = SessionRegistry()
+    s1 = await registry.acquire("school-a")
+    s2 = await registry.acquire("school-a")
+    s3 = await registry.acquire("school-b")
+    assert s1 is s2
+    assert s1 is not s3
+    assert registry.refcounts() == {"school-a": 2, "school-b": 1}
+    assert set(registry.pool_stats()) == {"school-a", "school-b"}
+
+    await registry.release("school-a")
+    assert not s1.closed
+    await registry.release("school-a", s3)  # foreign session is ignored
+    assert registry.refcounts()["school-a"] == 1
+    await registry.release("school-a", s1)
+    assert s1.closed
+    assert len(registry) == 1
+    await registry.release("unknown")
+
+    await registry.close()
+    assert s3.closed
+    assert len(registry) == 0
+
+
+async def test_session_registry_replaces_closed_session():
+    """Closed session is not handed out again."""
+
+    registry = SessionRegistry()
+    s1 = await registry.acquire("h")
+    await s1.close()
+    s2 = await registry.acquire("h")
+    assert s2 is not s1
+    assert registry.refcounts() == {"h": 1}
+    await registry.close()
+
+
+def test_session_registry_default_is_singleton():
+    """Default registry is process-wide."""
+
+    assert SessionRegistry.default() is SessionRegistry.default()
+
+
+async def test_bakalari_instances_share_registry_sessions():
+    """Closing one account keeps shared session open for the others."""
+
+    registry = SessionRegistry()
+    b1 = Bakalari(FS, session_registry=registry)
+    b2 = Bakalari(FS, session_registry=registry)
+    b1_creds = Credentials(access_token="a1", refresh_token="r1", user_id="1")
+    b2_creds = Credentials(access_token="a2", refresh_token="r2", user_id="2")
+    object.__setattr__(b1, "_credentials", b1_creds)
+    object.__setattr__(b2, "_credentials", b2_creds)
+
+    with aioresponses() as m:
+        m.get(FS + EndPoint.MARKS.endpoint, payload={"n": 1}, repeat=True)
+        async with b1, b2:
+            assert await b1.send_auth_request(EndPoint.MARKS) == {"n": 1}
+            assert await b2.send_auth_request(EndPoint.MARKS) == {"n": 1}
+            assert registry.refcounts() == {"fake_server": 2}
+            assert b1.pool_stats() is None
+
+            await b1.close()
+            assert registry.refcounts() == {"fake_server": 1}
+            assert await b2.send_auth_request(EndPoint.MARKS) == {"n": 1}
+
+    assert len(registry) == 0